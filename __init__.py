@@ -7,10 +7,16 @@ License: MIT
 Repository: https://github.com/yourusername/Worldlabs-Comfy
 """
 
+import os
+
+# Node modules only declare class metadata at import time; requests, numpy,
+# PIL, webbrowser and the API clients load when a node first executes.
 from .worldlabs_comfyui_nodes import NODE_CLASS_MAPPINGS as MAIN_NODES
 from .worldlabs_comfyui_nodes import NODE_DISPLAY_NAME_MAPPINGS as MAIN_DISPLAY_NAMES
 from .worldlabs_viewer_node import NODE_CLASS_MAPPINGS as VIEWER_NODES
 from .worldlabs_viewer_node import NODE_DISPLAY_NAME_MAPPINGS as VIEWER_DISPLAY_NAMES
+from .worldlabs_job_queue import register_routes
+from .worldlabs_profiling import instrument_nodes
 
 
 # Merge all node mappings
@@ -24,21 +30,17 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     **VIEWER_DISPLAY_NAMES,
 }
 
+# Per-invocation profiling (WORLDLABS_PROFILE or a node's profile input); a pass-through when off
+instrument_nodes(NODE_CLASS_MAPPINGS)
+
 # Web directory for any web assets (currently none needed)
 WEB_DIRECTORY = None
 
 __all__ = ['NODE_CLASS_MAPPINGS', 'NODE_DISPLAY_NAME_MAPPINGS', 'WEB_DIRECTORY']
 
+# HTTP routes (e.g. GET /worldlabs/queue) when loaded by the ComfyUI server
+register_routes()
+
 
-print("\n" + "=" * 60)
-print("World Labs ComfyUI Nodes loaded successfully!")
-print("=" * 60)
-print("Available nodes:")
-print("  • World Labs API Key")
-print("  • Generate World (World Labs)")
-print("  • World Info (World Labs)")
-print("  • Download Asset (World Labs)")
-print("  • 3D Viewer (World Labs)")
-print("\nMake sure to set your WORLDLABS_API_KEY environment variable")
-print("or enter it directly in the WorldLabsAPIKey node.")
-print("=" * 60 + "\n")
+if os.getenv("WORLDLABS_VERBOSE", "") == "1":
+    print(f"[WorldLabs] Loaded {len(NODE_CLASS_MAPPINGS)} nodes: {', '.join(NODE_DISPLAY_NAME_MAPPINGS.values())}")
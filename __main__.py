@@ -0,0 +1,11 @@
+"""
+World Labs ComfyUI Nodes - Command Line Entry Point
+Run `python -m Worldlabs-Comfy --help` from ComfyUI's custom_nodes directory
+"""
+
+import sys
+
+from .worldlabs_batch import main
+
+
+sys.exit(main())
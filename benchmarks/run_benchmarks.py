@@ -0,0 +1,398 @@
+"""
+World Labs ComfyUI Nodes - Benchmarks
+Micro-benchmarks for the per-invocation hot paths, checked against a stored baseline
+
+Run from the repository root:
+    python benchmarks/run_benchmarks.py                     # compare with benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --filter encode     # only matching cases
+    python benchmarks/run_benchmarks.py --update-baseline   # record this machine's results
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import contextlib
+import subprocess
+import tracemalloc
+import importlib.util
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, "baseline.json")
+PACKAGE_NAME = "worldlabs_comfy"
+
+DEFAULT_TOLERANCE = 0.25         # allowed slowdown before a case fails (fraction)
+DEFAULT_MEMORY_TOLERANCE = 0.10  # allowed peak memory growth before a case fails (fraction)
+DEFAULT_RETRIES = 2              # re-measurements of a regressed case before it counts
+SEED = 1234
+IMAGE_SIZES = {"1k": (1024, 512), "4k": (4096, 2048), "8k": (8192, 4096)}
+DOWNLOAD_SIZE = 64 * 1024 * 1024
+IMPORT_RUNS = 5
+REPEATS = {"1k": 20, "4k": 5, "8k": 3}
+# Multiples of the tolerance for noisier cases: the download shares the CPU with the local
+# file server, the page builders take under a microsecond, and import time depends on disk caches
+NOISY_CASES = {
+    "download_asset_64mb": 2.0,
+    "viewer_html_splat": 4.0,
+    "viewer_html_mesh": 4.0,
+    "viewer_html_panorama": 4.0,
+    "viewer_html_tiled_panorama": 2.0,
+    "package_import": 2.0,
+}
+TILE_CONFIG = {
+    "base": "base.jpg",
+    "levels": [
+        {"width": 2048 << level, "cols": 4 << level, "rows": 2 << level, "zoomRange": [level * 30, level * 30 + 30]}
+        for level in range(4)
+    ],
+}
+
+
+def load_package():
+    """
+    Import the repository as a package the way ComfyUI loads custom nodes
+    (its directory name need not be a valid module name)
+    """
+    if PACKAGE_NAME in sys.modules:
+        return sys.modules[PACKAGE_NAME]
+
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE_NAME, os.path.join(REPO_DIR, "__init__.py"), submodule_search_locations=[REPO_DIR]
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE_NAME] = package
+    spec.loader.exec_module(package)
+    return package
+
+
+def synthetic_image(width, height):
+    """
+    Reproducible [1, H, W, 3] float32 image in 0-1: smooth gradients plus
+    seeded noise, so JPEG work is closer to a photo than flat color or pure noise
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(SEED)
+    x = np.linspace(0.0, 1.0, width, dtype=np.float32)[None, :]
+    image = np.empty((1, height, width, 3), dtype=np.float32)
+
+    # Row blocks keep the temporary noise small for 8K inputs
+    block = 256
+    for top in range(0, height, block):
+        y = np.linspace(top / height, min(top + block, height) / height, min(block, height - top),
+                        endpoint=False, dtype=np.float32)[:, None]
+        rows = image[0, top:top + block]
+        rows[..., 0] = 0.15 + 0.7 * x
+        rows[..., 1] = 0.5 + 0.35 * np.sin(12.0 * y + 3.0 * x)
+        rows[..., 2] = 0.2 + 0.6 * y
+        rows += rng.standard_normal(rows.shape, dtype=np.float32) * 0.04
+        np.clip(rows, 0.0, 1.0, out=rows)
+
+    return image
+
+
+class PayloadServer:
+    """Local HTTP server answering every GET with the same in-memory payload"""
+
+    def __init__(self, payload):
+        body = payload
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                view = memoryview(body)
+                for start in range(0, len(body), 1 << 20):
+                    self.wfile.write(view[start:start + (1 << 20)])
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# ---------------------------------------------------------------------------
+# Cases: each returns (run, repeat, calls per run, cleanup or None, extra info)
+# ---------------------------------------------------------------------------
+
+def case_encode(size):
+    def setup():
+        nodes = load_package().worldlabs_comfyui_nodes
+        image = synthetic_image(*IMAGE_SIZES[size])
+        generator = nodes.WorldLabsGenerateWorld()
+        return lambda: generator.convert_image_to_bytes(image), REPEATS[size], 1, None, {}
+    return setup
+
+
+def case_decode(size):
+    def setup():
+        nodes = load_package().worldlabs_comfyui_nodes
+        generator = nodes.WorldLabsGenerateWorld()
+        jpeg = generator.convert_image_to_bytes(synthetic_image(*IMAGE_SIZES[size]))
+        return lambda: generator.convert_bytes_to_image(jpeg), REPEATS[size], 1, None, {
+            "jpeg_bytes": len(jpeg)
+        }
+    return setup
+
+
+def case_download():
+    package = load_package()
+    nodes = package.worldlabs_comfyui_nodes
+    output_dir = tempfile.mkdtemp(prefix="worldlabs-bench-")
+    package.worldlabs_state.set_output_directory(output_dir)
+
+    import numpy as np
+    server = PayloadServer(np.random.default_rng(SEED).bytes(DOWNLOAD_SIZE))
+    downloader = nodes.WorldLabsDownloadAsset()
+    counter = iter(range(1 << 30))
+
+    def run():
+        index = next(counter)
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            (file_path,) = downloader.download_asset(f"{server.url}/asset_{index}.spz", f"asset_{index}", "")
+        os.remove(file_path)
+
+    def cleanup():
+        server.close()
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    return run, 5, 1, cleanup, {"bytes": DOWNLOAD_SIZE}
+
+
+def case_viewer(kind):
+    def setup():
+        # The tiles node subclasses the viewer, so it has every page builder
+        viewer = load_package().worldlabs_viewer_node.WorldLabsPanoramaTiles()
+        url = "https://cdn.example.com/worlds/0123456789abcdef/splats_500k.spz"
+        builders = {
+            "splat": lambda: viewer.create_splat_viewer_html(url, "Benchmark World", "https://marble.example.com/w"),
+            "mesh": lambda: viewer.create_mesh_viewer_html(url, "Benchmark World"),
+            "panorama": lambda: viewer.create_panorama_viewer_html(url, "Benchmark World"),
+            "tiled_panorama": lambda: viewer.create_tiled_panorama_viewer_html("tiles", TILE_CONFIG, "Benchmark World"),
+        }
+        return builders[kind], 5, 20000, None, {}
+    return setup
+
+
+def case_import():
+    """Package import in a fresh interpreter (what ComfyUI pays at startup)"""
+    code = (
+        "import importlib.util, sys, time\n"
+        f"spec = importlib.util.spec_from_file_location({PACKAGE_NAME!r}, {os.path.join(REPO_DIR, '__init__.py')!r}, "
+        f"submodule_search_locations=[{REPO_DIR!r}])\n"
+        "module = importlib.util.module_from_spec(spec)\n"
+        f"sys.modules[{PACKAGE_NAME!r}] = module\n"
+        "start = time.perf_counter()\n"
+        "spec.loader.exec_module(module)\n"
+        "print(time.perf_counter() - start)\n"
+    )
+
+    # Timed inside the child so interpreter startup isn't counted
+    def run():
+        result = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+        return float(result.stdout.strip().splitlines()[-1])
+
+    run.reports_seconds = True
+    return run, IMPORT_RUNS, 1, None, {"peak_memory": "not measured (separate process)"}
+
+
+CASES = {}
+for _size in IMAGE_SIZES:
+    CASES[f"encode_jpeg_{_size}"] = case_encode(_size)
+for _size in IMAGE_SIZES:
+    CASES[f"decode_image_{_size}"] = case_decode(_size)
+CASES["download_asset_64mb"] = case_download
+for _kind in ("splat", "mesh", "panorama", "tiled_panorama"):
+    CASES[f"viewer_html_{_kind}"] = case_viewer(_kind)
+CASES["package_import"] = case_import
+
+
+# ---------------------------------------------------------------------------
+# Measurement and comparison
+# ---------------------------------------------------------------------------
+
+def measure(setup):
+    """Best-of-N seconds per call and tracemalloc peak bytes of one extra run"""
+    run, repeat, calls, cleanup, extra = setup()
+    try:
+        self_timed = getattr(run, "reports_seconds", False)
+        # Untimed warm-up: lazy imports, first-use caches and .pyc compilation stay out of the samples
+        run()
+        samples = []
+        for _ in range(repeat):
+            if self_timed:
+                samples.append(run())
+                continue
+            start = time.perf_counter()
+            for _ in range(calls):
+                run()
+            samples.append((time.perf_counter() - start) / calls)
+
+        peak = None
+        if not self_timed:
+            tracemalloc.start()
+            try:
+                run()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        result = {"seconds": min(samples), "median_seconds": sorted(samples)[len(samples) // 2], "peak_bytes": peak}
+        if "bytes" in extra:
+            result["mb_per_s"] = round(extra["bytes"] / result["seconds"] / 1e6, 1)
+        result.update({key: value for key, value in extra.items() if key != "bytes"})
+        return result
+    finally:
+        if cleanup is not None:
+            cleanup()
+
+
+def machine_info():
+    import numpy
+    import PIL
+
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "pillow": PIL.__version__,
+    }
+
+
+def compare(name, result, baseline, tolerance, memory_tolerance):
+    """'ok', 'new', or a description of the regression"""
+    reference = baseline.get(name)
+    if reference is None:
+        return "new"
+
+    problems = []
+    tolerance *= NOISY_CASES.get(name, 1.0)
+    if result["seconds"] > reference["seconds"] * (1 + tolerance):
+        problems.append(f"time +{(result['seconds'] / reference['seconds'] - 1) * 100:.0f}%")
+    if result["peak_bytes"] and reference.get("peak_bytes") and \
+            result["peak_bytes"] > reference["peak_bytes"] * (1 + memory_tolerance):
+        problems.append(f"memory +{(result['peak_bytes'] / reference['peak_bytes'] - 1) * 100:.0f}%")
+
+    return "REGRESSED: " + ", ".join(problems) if problems else "ok"
+
+
+def format_seconds(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f} ms"
+    return f"{seconds:.2f} s"
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run the World Labs node micro-benchmarks")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Allowed slowdown as a fraction (default: {DEFAULT_TOLERANCE})")
+    parser.add_argument("--memory-tolerance", type=float, default=DEFAULT_MEMORY_TOLERANCE,
+                        help=f"Allowed peak memory growth as a fraction (default: {DEFAULT_MEMORY_TOLERANCE})")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help="Re-measure a regressed case this many times before failing it, keeping the "
+                             "best time, so a burst of background load isn't reported; with --update-baseline "
+                             f"the median of 1 + this many measurements is recorded (default: {DEFAULT_RETRIES})")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Write this run's results to the baseline instead of comparing")
+    parser.add_argument("--output", default="", help="Also write this run's results to a JSON file")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # Keep benchmark state (asset cache, SQLite) out of the real state directory
+    state_dir = tempfile.mkdtemp(prefix="worldlabs-bench-state-")
+    os.environ["WORLDLABS_STATE_DIR"] = state_dir
+    os.environ.pop("WORLDLABS_PROFILE", None)
+
+    try:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            baseline = stored.get("cases", {})
+            if not args.update_baseline and stored.get("machine", {}).get("platform") != platform.platform():
+                print(f"Note: the baseline was recorded on {stored.get('machine', {}).get('platform')}; "
+                      f"timings from other machines aren't directly comparable")
+
+        names = [name for name in CASES if args.filter in name]
+        results = {}
+        failures = 0
+
+        format_bytes = load_package().worldlabs_profiling.format_bytes
+        print(f"{'case':<28} {'time':>10} {'baseline':>10} {'peak memory':>12}  status")
+        for name in names:
+            if args.update_baseline:
+                # A typical run, not the luckiest, so later comparisons aren't against an outlier
+                runs = sorted((measure(CASES[name]) for _ in range(1 + args.retries)), key=lambda r: r["seconds"])
+                result = runs[len(runs) // 2]
+            else:
+                result = measure(CASES[name])
+            status = "recorded" if args.update_baseline else compare(
+                name, result, baseline, args.tolerance, args.memory_tolerance
+            )
+            for _ in range(args.retries if status.startswith("REGRESSED") else 0):
+                retry = measure(CASES[name])
+                if retry["seconds"] < result["seconds"]:
+                    result = {**result, "seconds": retry["seconds"], "median_seconds": retry["median_seconds"]}
+                status = compare(name, result, baseline, args.tolerance, args.memory_tolerance)
+                if not status.startswith("REGRESSED"):
+                    break
+            results[name] = result
+
+            failures += status.startswith("REGRESSED")
+
+            reference = baseline.get(name, {}).get("seconds")
+            peak = format_bytes(result["peak_bytes"]) if result["peak_bytes"] is not None else "-"
+            print(f"{name:<28} {format_seconds(result['seconds']):>10} "
+                  f"{format_seconds(reference) if reference else '-':>10} {peak:>12}  {status}")
+
+        document = {"machine": machine_info(), "cases": results}
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(document, f, indent=2)
+
+        if args.update_baseline:
+            # Keep cases that weren't run this time
+            merged = {**baseline, **results}
+            with open(args.baseline, "w", encoding="utf-8") as f:
+                json.dump({"machine": machine_info(), "cases": merged}, f, indent=2)
+                f.write("\n")
+            print(f"Baseline written to {args.baseline}")
+            return 0
+
+        if failures:
+            print(f"{failures} case(s) regressed beyond tolerance")
+            return 1
+        return 0
+    finally:
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
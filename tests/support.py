@@ -0,0 +1,41 @@
+"""
+World Labs ComfyUI Nodes - Test support
+Loads the repository as a package with its persistent state in a temporary directory
+"""
+
+import os
+import sys
+import atexit
+import shutil
+import tempfile
+import importlib.util
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = "worldlabs_comfy"
+
+# Set before the package loads: SQLite state and outputs never touch the checkout
+TEMP_DIR = tempfile.mkdtemp(prefix="worldlabs-tests-")
+os.environ["WORLDLABS_STATE_DIR"] = os.path.join(TEMP_DIR, "state")
+os.environ["WORLDLABS_OUTPUT_DIR"] = os.path.join(TEMP_DIR, "output")
+atexit.register(shutil.rmtree, TEMP_DIR, ignore_errors=True)
+
+
+def load_package():
+    """Import the repository the way ComfyUI loads custom nodes (the directory name need not be a module name)"""
+    if PACKAGE_NAME in sys.modules:
+        return sys.modules[PACKAGE_NAME]
+
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE_NAME, os.path.join(REPO_DIR, "__init__.py"), submodule_search_locations=[REPO_DIR]
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE_NAME] = package
+    spec.loader.exec_module(package)
+    return package
+
+
+def load_module(name):
+    """A package submodule, e.g. load_module("worldlabs_job_queue")"""
+    load_package()
+    return importlib.import_module(f"{PACKAGE_NAME}.{name}")
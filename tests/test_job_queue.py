@@ -0,0 +1,178 @@
+"""
+World Labs ComfyUI Nodes - Job scheduler tests
+Dispatch order, per-owner limits, cancellation and restart handling
+"""
+
+import time
+import threading
+import unittest
+
+from support import load_module
+
+job_queue = load_module("worldlabs_job_queue")
+progress = load_module("worldlabs_progress")
+
+TIMEOUT = 10
+
+
+class SchedulerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        self.schedulers = []
+        self.addCleanup(self.shutdown)
+
+    def shutdown(self):
+        self.release.set()
+        for scheduler in self.schedulers:
+            scheduler.executor.shutdown(wait=True)
+
+    def scheduler(self, **kwargs):
+        scheduler = job_queue.JobScheduler(**kwargs)
+        self.schedulers.append(scheduler)
+        return scheduler
+
+    def blocking_job(self, started=None):
+        """A job that runs until the test releases it"""
+        def run():
+            if started is not None:
+                started.set()
+            self.release.wait(TIMEOUT)
+            return "blocked"
+        return run
+
+    def recording_job(self, order, name):
+        def run():
+            order.append(name)
+            return name
+        return run
+
+
+class DispatchOrderTest(SchedulerTestCase):
+    def test_fair_share_between_owners(self):
+        scheduler = self.scheduler(max_workers=1, per_owner_limit=1)
+        order = []
+        _, blocker = scheduler.submit(self.blocking_job(), owner="alice")
+        futures = [
+            scheduler.submit(self.recording_job(order, name), owner=owner)[1]
+            for owner, name in (("alice", "a1"), ("alice", "a2"), ("bob", "b1"))
+        ]
+
+        self.release.set()
+        for future in [blocker] + futures:
+            future.result(TIMEOUT)
+        # bob has not been served yet, so his job goes ahead of alice's earlier ones
+        self.assertEqual(order, ["b1", "a1", "a2"])
+
+    def test_priority_before_fair_share(self):
+        scheduler = self.scheduler(max_workers=1, per_owner_limit=1)
+        order = []
+        _, blocker = scheduler.submit(self.blocking_job(), owner="alice")
+        futures = [
+            scheduler.submit(self.recording_job(order, "b1"), owner="bob")[1],
+            scheduler.submit(self.recording_job(order, "a1"), owner="alice", priority=5)[1],
+        ]
+
+        self.release.set()
+        for future in [blocker] + futures:
+            future.result(TIMEOUT)
+        self.assertEqual(order, ["a1", "b1"])
+
+    def test_per_owner_limit(self):
+        scheduler = self.scheduler(max_workers=4, per_owner_limit=2)
+        for _ in range(3):
+            scheduler.submit(self.blocking_job(), owner="alice")
+        self.assertEqual(scheduler.get_counts(), {"max_concurrent": 4, "in_flight": 2, "queue_depth": 1})
+
+        # Another owner still gets a worker while alice is at her limit
+        scheduler.submit(self.blocking_job(), owner="bob")
+        self.assertEqual(scheduler.get_counts()["in_flight"], 3)
+
+        queued = [job for job in scheduler.get_status() if job["status"] == "queued"]
+        self.assertEqual([(job["owner"], job["queue_position"]) for job in queued], [("alice", 1)])
+
+
+class JobLifecycleTest(SchedulerTestCase):
+    def test_results_and_history(self):
+        scheduler = self.scheduler(max_workers=2)
+        job_id, future = scheduler.submit(lambda: ("world", "w-123"), model="Marble 0.1-mini",
+                                          world_id_of=lambda result: result[1])
+        self.assertEqual(future.result(TIMEOUT), ("world", "w-123"))
+
+        status = scheduler.get_job_status(job_id)
+        self.assertEqual((status["status"], status["world_id"]), ("done", "w-123"))
+
+    def test_failure_is_recorded_and_raised(self):
+        scheduler = self.scheduler(max_workers=2)
+
+        def fail():
+            raise RuntimeError("boom")
+
+        job_id, future = scheduler.submit(fail)
+        with self.assertRaises(RuntimeError):
+            future.result(TIMEOUT)
+        status = scheduler.get_job_status(job_id)
+        self.assertEqual((status["status"], status["error"]), ("failed", "boom"))
+
+    def test_cancelled_job_is_recorded_as_cancelled(self):
+        scheduler = self.scheduler(max_workers=2)
+
+        def cancelled():
+            raise progress.OperationCancelled("Cancelled")
+
+        job_id, future = scheduler.submit(cancelled)
+        with self.assertRaises(progress.OperationCancelled):
+            future.result(TIMEOUT)
+        self.assertEqual(scheduler.get_job_status(job_id)["status"], "cancelled")
+
+    def test_cancel_only_drops_queued_jobs(self):
+        scheduler = self.scheduler(max_workers=1)
+        started = threading.Event()
+        running_id, _ = scheduler.submit(self.blocking_job(started))
+        queued_id, queued = scheduler.submit(self.blocking_job())
+        self.assertTrue(started.wait(TIMEOUT))
+
+        self.assertFalse(scheduler.cancel(running_id))
+        self.assertTrue(scheduler.cancel(queued_id))
+        self.assertFalse(scheduler.cancel(queued_id))
+        with self.assertRaises(progress.OperationCancelled):
+            queued.result(TIMEOUT)
+        self.assertEqual(scheduler.get_job_status(queued_id)["status"], "cancelled")
+        self.assertEqual(scheduler.get_counts()["queue_depth"], 0)
+
+    def test_restart_marks_unfinished_jobs_abandoned(self):
+        scheduler = self.scheduler(max_workers=1)
+        started = threading.Event()
+        running_id, _ = scheduler.submit(self.blocking_job(started))
+        queued_id, _ = scheduler.submit(self.blocking_job())
+        self.assertTrue(started.wait(TIMEOUT))
+
+        # A new process opening the same database can't resume in-memory jobs
+        restarted = self.scheduler(max_workers=1)
+        for job_id in (running_id, queued_id):
+            self.assertEqual(restarted.get_job_status(job_id)["status"], "abandoned")
+
+
+class PruneTest(SchedulerTestCase):
+    def test_prune_keeps_recent_history_window(self):
+        scheduler = self.scheduler(history_days=1)
+        old = time.time() - 3 * 86400
+        model = f"prune-test-{time.time()}"
+        rows = [
+            (f"{model}-{n}", "owner", model, status, old - n, old - n + 5, old - n + 10)
+            for n, status in enumerate(["done"] * (job_queue.HISTORY_WINDOW + 5) + ["failed"] * 3)
+        ]
+        scheduler.conn.executemany(
+            "INSERT INTO jobs (job_id, owner, model, status, enqueued_at, started_at, finished_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+        scheduler.prune()
+        remaining = scheduler.conn.execute(
+            "SELECT status, COUNT(*) FROM jobs WHERE model = ? GROUP BY status", (model,)
+        ).fetchall()
+        self.assertEqual({row[0]: row[1] for row in remaining}, {"done": job_queue.HISTORY_WINDOW})
+
+
+if __name__ == "__main__":
+    unittest.main()
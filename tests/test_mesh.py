@@ -0,0 +1,135 @@
+"""
+World Labs ComfyUI Nodes - Mesh tests
+GLB writer/reader round-trips (with KHR_mesh_quantization) and quadric simplification
+"""
+
+import json
+import struct
+import unittest
+
+import numpy as np
+
+from support import load_module
+
+mesh_module = load_module("worldlabs_mesh")
+
+
+def uv_sphere(radius=2.0, rings=48, segments=96, center=(1.0, -3.0, 0.5)):
+    """Closed sphere mesh with 2 * segments * (rings - 1) triangles"""
+    theta = np.linspace(0, np.pi, rings + 1)[1:-1]
+    phi = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+    t, p = np.meshgrid(theta, phi, indexing="ij")
+    body = np.stack([np.sin(t) * np.cos(p), np.sin(t) * np.sin(p), np.cos(t)], axis=-1).reshape(-1, 3)
+    positions = np.concatenate([[[0, 0, 1]], body, [[0, 0, -1]]]) * radius + np.asarray(center)
+
+    def ring(r):
+        return 1 + r * segments + np.arange(segments)
+
+    triangles = [np.stack([np.zeros(segments, int), ring(0), np.roll(ring(0), -1)], axis=1)]
+    for r in range(rings - 2):
+        a, b = ring(r), ring(r + 1)
+        triangles.append(np.stack([a, b, np.roll(b, -1)], axis=1))
+        triangles.append(np.stack([a, np.roll(b, -1), np.roll(a, -1)], axis=1))
+    bottom = len(positions) - 1
+    last = ring(rings - 2)
+    triangles.append(np.stack([np.full(segments, bottom), np.roll(last, -1), last], axis=1))
+
+    return mesh_module.MeshData(positions.astype(np.float32), np.concatenate(triangles).astype(np.int64))
+
+
+class GlbTest(unittest.TestCase):
+    def test_quantized_round_trip(self):
+        mesh = uv_sphere()
+        data = mesh_module.write_glb(mesh, quantize=True)
+        gltf, _ = mesh_module.parse_glb(data)
+        self.assertEqual(gltf["extensionsRequired"], ["KHR_mesh_quantization"])
+        self.assertEqual(gltf["accessors"][gltf["meshes"][0]["primitives"][0]["attributes"]["POSITION"]]
+                         ["componentType"], 5123)
+
+        decoded = mesh_module.read_glb(data)
+        np.testing.assert_array_equal(decoded.triangles, mesh.triangles)
+        extent = float((mesh.positions.max(axis=0) - mesh.positions.min(axis=0)).max())
+        np.testing.assert_allclose(decoded.positions, mesh.positions, atol=extent / 65535 + 1e-5)
+
+    def test_quantized_normals(self):
+        mesh = uv_sphere()
+        data = mesh_module.write_glb(mesh, quantize=True)
+        gltf, binary = mesh_module.parse_glb(data)
+        attributes = gltf["meshes"][0]["primitives"][0]["attributes"]
+        self.assertTrue(gltf["accessors"][attributes["NORMAL"]]["normalized"])
+
+        normals = mesh_module.read_accessor(gltf, binary, attributes["NORMAL"])
+        expected = mesh_module.vertex_normals(mesh.positions, mesh.triangles)
+        np.testing.assert_allclose(normals, expected, atol=0.5 / 127 + 1e-4)
+        # Outward on a sphere
+        outward = mesh.positions - mesh.positions.mean(axis=0)
+        self.assertTrue(np.all(np.sum(normals * outward, axis=1) > 0))
+
+    def test_float_round_trip_is_exact(self):
+        mesh = uv_sphere()
+        decoded = mesh_module.read_glb(mesh_module.write_glb(mesh, quantize=False, normals=False))
+        np.testing.assert_array_equal(decoded.positions, mesh.positions)
+        np.testing.assert_array_equal(decoded.triangles, mesh.triangles)
+
+    def test_chunks_are_aligned(self):
+        data = mesh_module.write_glb(uv_sphere(rings=5, segments=7))
+        magic, version, length = struct.unpack_from("<III", data, 0)
+        self.assertEqual((magic, version, length), (mesh_module.GLB_MAGIC, 2, len(data)))
+        json_length, json_type = struct.unpack_from("<II", data, 12)
+        self.assertEqual(json_type, mesh_module.CHUNK_JSON)
+        self.assertEqual(json_length % 4, 0)
+        json.loads(data[20:20 + json_length])
+        self.assertEqual(struct.unpack_from("<II", data, 20 + json_length)[1], mesh_module.CHUNK_BIN)
+
+    def test_large_meshes_use_32_bit_indices(self):
+        rng = np.random.default_rng(0)
+        count = 70000
+        mesh = mesh_module.MeshData(
+            rng.random((count, 3), dtype=np.float32), rng.integers(0, count, (count, 3)).astype(np.int64)
+        )
+        data = mesh_module.write_glb(mesh, normals=False)
+        gltf, _ = mesh_module.parse_glb(data)
+        indices = gltf["accessors"][gltf["meshes"][0]["primitives"][0]["indices"]]
+        self.assertEqual(indices["componentType"], 5125)
+        np.testing.assert_array_equal(mesh_module.read_glb(data).triangles, mesh.triangles)
+
+    def test_compressed_input_is_rejected(self):
+        gltf = {"asset": {"version": "2.0"}, "extensionsRequired": ["KHR_draco_mesh_compression"]}
+        json_bytes = json.dumps(gltf).encode("utf-8")
+        json_bytes += b" " * (-len(json_bytes) % 4)
+        data = struct.pack("<III", mesh_module.GLB_MAGIC, 2, 20 + len(json_bytes)) + \
+            struct.pack("<II", len(json_bytes), mesh_module.CHUNK_JSON) + json_bytes
+        with self.assertRaises(ValueError):
+            mesh_module.read_glb(data)
+
+
+class SimplifyTest(unittest.TestCase):
+    def test_meets_target_and_keeps_the_surface(self):
+        mesh = uv_sphere(radius=2.0)
+        simplified, resolution = mesh_module.simplify(mesh, 1000)
+        self.assertGreater(resolution, 0)
+        self.assertLessEqual(simplified.triangle_count, 1000)
+        self.assertGreater(simplified.triangle_count, 250)
+        self.assertLess(simplified.triangles.max(), simplified.vertex_count)
+
+        # Quadric placement keeps vertices on the sphere, within a fraction of a grid cell
+        radii = np.linalg.norm(simplified.positions - np.array([1.0, -3.0, 0.5]), axis=1)
+        cell = 4.0 / resolution
+        self.assertLess(np.abs(radii - 2.0).max(), 0.25 * cell)
+
+    def test_under_target_is_unchanged(self):
+        mesh = uv_sphere(rings=6, segments=8)
+        simplified, resolution = mesh_module.simplify(mesh, 10000)
+        self.assertEqual(resolution, 0)
+        self.assertEqual(simplified.triangle_count, mesh.triangle_count)
+        self.assertEqual(
+            sorted(map(tuple, np.round(simplified.positions, 5))), sorted(map(tuple, np.round(mesh.positions, 5)))
+        )
+
+    def test_impossible_target(self):
+        with self.assertRaises(ValueError):
+            mesh_module.simplify(uv_sphere(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
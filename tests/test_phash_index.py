@@ -0,0 +1,127 @@
+"""
+World Labs ComfyUI Nodes - Perceptual hash index tests
+Near-duplicate lookup by Hamming distance, parameter isolation, forget and persistence
+"""
+
+import os
+import itertools
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from support import load_module
+
+phash = load_module("worldlabs_phash")
+phash_index = load_module("worldlabs_phash_index")
+
+# Every test uses its own parameters key, so entries from other tests in the shared table never match
+_keys = itertools.count(1)
+
+
+def new_params():
+    return phash_index.parameters_key("Marble 0.1-mini", False, f"phash index test {next(_keys)}")
+
+
+def flip_bits(value, count):
+    """value with its lowest count bits inverted (Hamming distance count)"""
+    return int(value) ^ ((1 << count) - 1)
+
+
+def synthetic_image(seed, height=240, width=320):
+    """Blocky random colors plus mild noise: strong low-frequency structure, like a photo's layout"""
+    rng = np.random.default_rng(seed)
+    blocks = rng.random((6, 8, 3))
+    image = np.kron(blocks, np.ones((height // 6, width // 8, 1)))
+    return np.clip(image + rng.normal(0, 0.02, image.shape), 0, 1).astype(np.float32)
+
+
+class FindTest(unittest.TestCase):
+    def setUp(self):
+        self.index = phash_index.PerceptualHashIndex()
+        self.params = new_params()
+        self.base = 0x8F3A_5C71_0E24_B9D6
+
+    def test_threshold_is_inclusive(self):
+        self.index.add(self.base, self.params, "world-a")
+        self.assertEqual(self.index.find(self.base, self.params), ("world-a", 0))
+        self.assertEqual(self.index.find(flip_bits(self.base, 6), self.params, threshold=6), ("world-a", 6))
+        self.assertIsNone(self.index.find(flip_bits(self.base, 7), self.params, threshold=6))
+        self.assertEqual(self.index.find(flip_bits(self.base, 7), self.params, threshold=8), ("world-a", 7))
+
+    def test_closest_match_wins(self):
+        self.index.add(flip_bits(self.base, 5), self.params, "far")
+        self.index.add(flip_bits(self.base, 2), self.params, "near")
+        self.index.add(flip_bits(self.base, 4), self.params, "middle")
+        self.assertEqual(self.index.find(self.base, self.params), ("near", 2))
+
+    def test_latest_entry_wins_ties(self):
+        self.index.add(self.base, self.params, "first")
+        self.index.add(self.base, self.params, "regenerated")
+        self.assertEqual(self.index.find(self.base, self.params), ("regenerated", 0))
+
+    def test_other_parameters_never_match(self):
+        self.index.add(self.base, self.params, "world-a")
+        self.assertIsNone(self.index.find(self.base, new_params(), threshold=64))
+
+    def test_forget(self):
+        self.index.add(self.base, self.params, "gone")
+        self.index.add(flip_bits(self.base, 3), self.params, "kept")
+        self.index.forget("gone")
+        self.assertEqual(self.index.find(self.base, self.params), ("kept", 3))
+
+        # Also removed from the table, so a new process doesn't bring it back
+        reloaded = phash_index.PerceptualHashIndex()
+        self.assertEqual(reloaded.find(self.base, self.params), ("kept", 3))
+
+    def test_persists_high_bit_hashes(self):
+        high = (1 << 63) | 0x1234
+        self.index.add(high, self.params, "high")
+        reloaded = phash_index.PerceptualHashIndex()
+        self.assertEqual(reloaded.find(high, self.params), ("high", 0))
+
+
+class PerceptualHashTest(unittest.TestCase):
+    def test_near_duplicates_are_within_default_threshold(self):
+        image = synthetic_image(1)
+        original = phash.perceptual_hashes(image)[0]
+
+        brighter = np.clip(image * 1.08 + 0.02, 0, 1)
+        halved = image.reshape(120, 2, 160, 2, 3).mean(axis=(1, 3))
+        renoised = np.clip(image + np.random.default_rng(99).normal(0, 0.02, image.shape), 0, 1)
+        for variant in (brighter, halved, renoised):
+            distance = int(phash.hamming_distances(np.array([original]), phash.perceptual_hashes(variant)[0])[0])
+            self.assertLessEqual(distance, phash_index.DEFAULT_THRESHOLD)
+
+        other = phash.perceptual_hashes(synthetic_image(20))[0]
+        distance = int(phash.hamming_distances(np.array([original]), other)[0])
+        self.assertGreater(distance, phash_index.DEFAULT_THRESHOLD)
+
+    def test_batch_matches_single_images(self):
+        batch = np.stack([synthetic_image(seed) for seed in range(3)])
+        singles = [phash.perceptual_hashes(image)[0] for image in batch]
+        np.testing.assert_array_equal(phash.perceptual_hashes(batch), singles)
+
+
+class SettingsTest(unittest.TestCase):
+    def test_default_threshold_from_env(self):
+        with mock.patch.dict(os.environ, {"WORLDLABS_SIMILARITY_THRESHOLD": "10"}):
+            self.assertEqual(phash_index.get_default_threshold(), 10)
+        with mock.patch.dict(os.environ, {"WORLDLABS_SIMILARITY_THRESHOLD": "many"}), mock.patch("builtins.print"):
+            self.assertEqual(phash_index.get_default_threshold(), phash_index.DEFAULT_THRESHOLD)
+
+    def test_parse_reuse_mode(self):
+        self.assertEqual(phash_index.parse_reuse_mode(" AUTO "), "auto")
+        self.assertEqual(phash_index.parse_reuse_mode(""), "suggest")
+        with mock.patch("builtins.print"):
+            self.assertEqual(phash_index.parse_reuse_mode("always"), "suggest")
+
+    def test_parameters_key(self):
+        key = phash_index.parameters_key("Marble 0.1-mini", False, " prompt ")
+        self.assertEqual(key, phash_index.parameters_key("Marble 0.1-mini", False, "prompt"))
+        self.assertNotEqual(key, phash_index.parameters_key("Marble 0.1-mini", True, "prompt"))
+        self.assertNotEqual(key, phash_index.parameters_key("Marble 0.1-plus", False, "prompt"))
+
+
+if __name__ == "__main__":
+    unittest.main()
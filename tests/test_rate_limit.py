@@ -0,0 +1,152 @@
+"""
+World Labs ComfyUI Nodes - Rate limiter tests
+Token buckets, retry decisions and Retry-After handling with a stubbed requests module
+"""
+
+import os
+import time
+import unittest
+from unittest import mock
+from email.utils import formatdate
+
+from support import load_module
+
+rate_limit = load_module("worldlabs_rate_limit")
+
+
+class FakeResponse:
+    def __init__(self, status_code, retry_after=None):
+        self.status_code = status_code
+        self.headers = {"Retry-After": retry_after} if retry_after is not None else {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeRequests:
+    """Stands in for the requests module, replaying canned responses"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, time.monotonic()))
+        return self.responses.pop(0)
+
+
+class ShouldRetryTest(unittest.TestCase):
+    def test_idempotent_methods_retry_throttling_and_server_errors(self):
+        for status in (429, 502, 503, 504):
+            self.assertTrue(rate_limit.RateLimiter.should_retry("GET", FakeResponse(status)), status)
+        self.assertFalse(rate_limit.RateLimiter.should_retry("GET", FakeResponse(500)))
+        self.assertFalse(rate_limit.RateLimiter.should_retry("GET", FakeResponse(404)))
+
+    def test_post_only_retries_429_with_retry_after(self):
+        self.assertTrue(rate_limit.RateLimiter.should_retry("POST", FakeResponse(429, "1")))
+        self.assertFalse(rate_limit.RateLimiter.should_retry("POST", FakeResponse(429)))
+        for status in (502, 503, 504):
+            self.assertFalse(rate_limit.RateLimiter.should_retry("post", FakeResponse(status, "1")), status)
+
+
+class ParseRetryAfterTest(unittest.TestCase):
+    def test_delta_seconds(self):
+        self.assertEqual(rate_limit.parse_retry_after("3"), 3.0)
+        self.assertEqual(rate_limit.parse_retry_after(" 1.5 "), 1.5)
+        self.assertEqual(rate_limit.parse_retry_after("-4"), 0.0)
+
+    def test_http_date(self):
+        delay = rate_limit.parse_retry_after(formatdate(time.time() + 30, usegmt=True))
+        self.assertAlmostEqual(delay, 30, delta=2)
+        self.assertEqual(rate_limit.parse_retry_after(formatdate(time.time() - 30, usegmt=True)), 0.0)
+
+    def test_missing_or_invalid_uses_default(self):
+        self.assertEqual(rate_limit.parse_retry_after(None, default=7), 7)
+        self.assertEqual(rate_limit.parse_retry_after("", default=7), 7)
+        self.assertEqual(rate_limit.parse_retry_after("soon", default=7), 7)
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_burst_then_refill_rate(self):
+        bucket = rate_limit.TokenBucket("test", rate=20.0, burst=2)
+        self.assertLess(bucket.acquire() + bucket.acquire(), 0.02)
+        self.assertGreaterEqual(bucket.acquire(), 0.03)
+
+    def test_throttle_halves_rate_and_recover_restores_it(self):
+        bucket = rate_limit.TokenBucket("test", rate=16.0, burst=4)
+        bucket.throttle(0.0)
+        self.assertEqual(bucket.rate, 8.0)
+        self.assertEqual(bucket.tokens, 0.0)
+
+        for _ in range(10):
+            bucket.throttle(0.0)
+        self.assertEqual(bucket.rate, bucket.min_rate)
+
+        for _ in range(20):
+            bucket.recover()
+        self.assertEqual(bucket.rate, 16.0)
+
+    def test_throttle_blocks_until_retry_after(self):
+        bucket = rate_limit.TokenBucket("test", rate=100.0, burst=5)
+        bucket.throttle(0.2)
+        self.assertGreaterEqual(bucket.acquire(), 0.15)
+
+
+class RequestRetryTest(unittest.TestCase):
+    def request(self, method, *responses, max_retries=5):
+        limiter = rate_limit.RateLimiter({"test": (100.0, 10)}, max_retries=max_retries)
+        fake = FakeRequests(*responses)
+        with mock.patch.object(rate_limit, "requests", fake):
+            response = limiter.request("test", method, "https://example.invalid/x")
+        return limiter, fake, response
+
+    def test_server_errors_wait_before_retrying(self):
+        limiter, fake, response = self.request(
+            "GET", FakeResponse(502, "0.2"), FakeResponse(504, "0.2"), FakeResponse(200)
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(fake.calls), 3)
+        gaps = [later[2] - earlier[2] for earlier, later in zip(fake.calls, fake.calls[1:])]
+        self.assertTrue(all(gap >= 0.18 for gap in gaps), gaps)
+        # 502/504 are not throttling: the bucket keeps its rate
+        self.assertEqual(limiter.buckets["test"].rate, 100.0)
+
+    def test_post_server_error_is_not_resent(self):
+        _, fake, response = self.request("POST", FakeResponse(502, "0"), FakeResponse(200))
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(len(fake.calls), 1)
+
+    def test_post_429_with_retry_after_is_resent_and_throttles(self):
+        limiter, fake, response = self.request("POST", FakeResponse(429, "0.1"), FakeResponse(200))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(fake.calls), 2)
+        self.assertEqual(limiter.buckets["test"].throttled, 1)
+
+    def test_retries_are_bounded(self):
+        responses = [FakeResponse(503, "0") for _ in range(3)]
+        _, fake, response = self.request("GET", *responses, max_retries=2)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(fake.calls), 3)
+        self.assertTrue(all(r.closed for r in responses[:2]))
+
+
+class FromEnvTest(unittest.TestCase):
+    def build(self, value):
+        with mock.patch.dict(os.environ, {"WORLDLABS_RATE_OPERATIONS": value}):
+            with mock.patch("builtins.print"):
+                return rate_limit.RateLimiter.from_env().buckets["operations"]
+
+    def test_valid_override(self):
+        bucket = self.build("0.5,3")
+        self.assertEqual((bucket.base_rate, bucket.capacity), (0.5, 3.0))
+
+    def test_invalid_overrides_keep_defaults(self):
+        default = rate_limit.DEFAULT_BUCKETS["operations"]
+        for value in ("0,2", "-1,2", "abc", "1,abc", "1,0"):
+            bucket = self.build(value)
+            self.assertEqual((bucket.base_rate, bucket.capacity), default, value)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+World Labs ComfyUI Nodes - Splat format tests
+PLY and SPZ round-trips within each field's quantization step
+"""
+
+import io
+import gzip
+import struct
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from support import load_module
+
+splat = load_module("worldlabs_splat")
+
+
+def random_splats(count=500, sh_degree=3, seed=0, extent=5.0):
+    rng = np.random.default_rng(seed)
+    return splat.SplatData(
+        positions=rng.uniform(-extent, extent, (count, 3)).astype(np.float32),
+        scales=rng.uniform(-8.0, 2.0, (count, 3)).astype(np.float32),
+        rotations=splat.normalize_quaternions(rng.normal(size=(count, 4))),
+        opacities=rng.uniform(-4.0, 4.0, count).astype(np.float32),
+        colors=rng.uniform(-1.5, 1.5, (count, 3)).astype(np.float32),
+        sh=rng.uniform(-0.9, 0.9, (count, splat.SH_DIMENSIONS[sh_degree], 3)).astype(np.float32),
+    )
+
+
+def round_trip_spz(splats, **options):
+    buffer = io.BytesIO()
+    result = splat.write_spz(splats, buffer, **options)
+    return splat.read_spz(buffer.getvalue()), buffer.getvalue(), result
+
+
+class PlyTest(unittest.TestCase):
+    def test_round_trip_is_exact(self):
+        splats = random_splats()
+        buffer = io.BytesIO()
+        splat.write_ply(splats, buffer)
+        decoded = splat.read_ply(buffer.getvalue())
+
+        for field in ("positions", "scales", "opacities", "colors", "sh"):
+            np.testing.assert_array_equal(getattr(decoded, field), getattr(splats, field), err_msg=field)
+        np.testing.assert_allclose(decoded.rotations, splats.rotations, atol=1e-6)
+
+    def test_rejects_ascii_ply(self):
+        with self.assertRaises(ValueError):
+            splat.read_ply(b"ply\nformat ascii 1.0\nelement vertex 0\nend_header\n")
+
+
+class SpzTest(unittest.TestCase):
+    def assert_within_quantization(self, decoded, splats, fractional_bits, rotation_dot):
+        self.assertEqual(decoded.count, splats.count)
+        np.testing.assert_allclose(decoded.positions, splats.positions, atol=0.5 / (1 << fractional_bits) + 1e-6)
+        np.testing.assert_allclose(decoded.scales, splats.scales, atol=0.5 / 16 + 1e-5)
+        np.testing.assert_allclose(decoded.colors, splats.colors, atol=0.5 / (255 * splat.COLOR_SCALE) + 1e-5)
+        np.testing.assert_allclose(splat.sigmoid(decoded.opacities), splat.sigmoid(splats.opacities),
+                                   atol=0.5 / 255 + 1e-5)
+        # q and -q are the same rotation
+        dots = np.abs(np.sum(decoded.rotations * splats.rotations, axis=1))
+        self.assertGreaterEqual(dots.min(), rotation_dot)
+
+        sh1 = splats.sh[:, :3]
+        rest = splats.sh[:, 3:]
+        np.testing.assert_allclose(decoded.sh[:, :3], sh1, atol=(1 << (8 - splat.SH1_BITS)) / 256 + 1 / 128)
+        np.testing.assert_allclose(decoded.sh[:, 3:], rest, atol=(1 << (8 - splat.SH_REST_BITS)) / 256 + 1 / 128)
+
+    def test_round_trip_v2(self):
+        splats = random_splats()
+        decoded, _, result = round_trip_spz(splats, rotation_bits=8)
+        self.assertEqual(result, (splat.DEFAULT_FRACTIONAL_BITS, 3, 2))
+        self.assert_within_quantization(decoded, splats, splat.DEFAULT_FRACTIONAL_BITS, rotation_dot=0.98)
+
+    def test_round_trip_v3(self):
+        splats = random_splats()
+        decoded, _, result = round_trip_spz(splats, rotation_bits=10)
+        self.assertEqual(result, (splat.DEFAULT_FRACTIONAL_BITS, 3, 3))
+        self.assert_within_quantization(decoded, splats, splat.DEFAULT_FRACTIONAL_BITS, rotation_dot=0.999)
+
+    def test_header_and_deterministic_output(self):
+        splats = random_splats(count=10)
+        _, data, _ = round_trip_spz(splats, rotation_bits=10)
+        self.assertEqual(data, splat.encode_spz(splats, rotation_bits=10))
+
+        magic, version, count, sh_degree, fractional_bits, flags, reserved = struct.unpack_from(
+            "<IIIBBBB", gzip.decompress(data), 0
+        )
+        self.assertEqual((magic, version, count, sh_degree, fractional_bits, flags, reserved),
+                         (splat.SPZ_MAGIC, 3, 10, 3, splat.DEFAULT_FRACTIONAL_BITS, 0, 0))
+
+    def test_fractional_bits_shrink_to_fit_large_scenes(self):
+        splats = random_splats(extent=3000.0)
+        with mock.patch("builtins.print"):
+            decoded, _, (fractional_bits, _, _) = round_trip_spz(splats)
+        self.assertEqual(fractional_bits, splat.max_fractional_bits(splats))
+        self.assertLess(fractional_bits, splat.DEFAULT_FRACTIONAL_BITS)
+        np.testing.assert_allclose(decoded.positions, splats.positions, atol=0.5 / (1 << fractional_bits) + 1e-3)
+
+    def test_sh_degree_truncation_and_flags(self):
+        splats = random_splats(sh_degree=3)
+        splats.antialiased = True
+        decoded, _, (_, sh_degree, _) = round_trip_spz(splats, sh_degree=1)
+        self.assertEqual((sh_degree, decoded.sh_degree), (1, 1))
+        self.assertTrue(decoded.antialiased)
+
+    def test_degree_zero(self):
+        splats = random_splats(sh_degree=0)
+        decoded, _, _ = round_trip_spz(splats)
+        self.assertEqual(decoded.sh.shape, (splats.count, 0, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+World Labs ComfyUI Nodes - Voxel tests
+Distance transform against brute force, SDF signs, interior filling and the .npy cache
+"""
+
+import os
+import unittest
+
+import numpy as np
+
+from support import TEMP_DIR, load_module
+from test_mesh import uv_sphere
+
+voxels = load_module("worldlabs_voxels")
+mesh_module = load_module("worldlabs_mesh")
+
+
+def brute_force_squared_distance(sites):
+    """Squared distance from every voxel to every site, minimized"""
+    points = np.argwhere(sites)
+    grid = np.indices(sites.shape).reshape(sites.ndim, -1).T
+    distances = ((grid[:, None, :] - points[None, :, :]) ** 2).sum(axis=-1).min(axis=1)
+    return distances.reshape(sites.shape).astype(np.float64)
+
+
+def hollow_box(size=10, hole=False):
+    occupancy = np.zeros((size, size, size), dtype=bool)
+    occupancy[2:-2, 2:-2, 2:-2] = True
+    occupancy[3:-3, 3:-3, 3:-3] = False
+    if hole:
+        occupancy[size // 2, size // 2, 2] = False
+    return occupancy
+
+
+class DistanceTransformTest(unittest.TestCase):
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(0)
+        for shape, density in (((12, 15, 9), 0.01), ((7, 20, 11), 0.1), ((1, 30, 4), 0.05)):
+            sites = rng.random(shape) < density
+            sites[0, 0, 0] = True
+            np.testing.assert_array_equal(
+                voxels.squared_distance_transform(sites), brute_force_squared_distance(sites), err_msg=str(shape)
+            )
+
+    def test_single_site_is_euclidean(self):
+        sites = np.zeros((9, 9, 9), dtype=bool)
+        sites[4, 4, 4] = True
+        distance = voxels.distance_transform(sites)
+        self.assertAlmostEqual(distance[0, 0, 0], np.sqrt(48))
+        self.assertAlmostEqual(distance[4, 4, 8], 4.0)
+
+    def test_no_sites(self):
+        self.assertTrue(np.isinf(voxels.distance_transform(np.zeros((3, 3, 3), dtype=bool))).all())
+
+
+class SignedDistanceTest(unittest.TestCase):
+    def test_signs_and_scale(self):
+        occupancy = np.zeros((9, 9, 9), dtype=bool)
+        occupancy[2:7, 2:7, 2:7] = True
+        sdf = voxels.signed_distance(occupancy, voxel_size=0.5)
+        self.assertTrue((sdf[occupancy] < 0).all())
+        self.assertTrue((sdf[~occupancy] > 0).all())
+        self.assertAlmostEqual(float(sdf[4, 4, 4]), -1.5)  # three voxels from the nearest free voxel
+        self.assertAlmostEqual(float(sdf[4, 4, 0]), 1.0)   # two voxels from the nearest occupied voxel
+
+    def test_fill_enclosed(self):
+        filled = voxels.fill_enclosed(hollow_box())
+        self.assertTrue(filled[5, 5, 5])
+        self.assertFalse(filled[0, 0, 0])
+        # A leak into the interior keeps it empty
+        self.assertFalse(voxels.fill_enclosed(hollow_box(hole=True))[5, 5, 5])
+
+
+class VoxelizeTest(unittest.TestCase):
+    def test_sphere(self):
+        mesh = uv_sphere(radius=2.0, center=(0.0, 0.0, 0.0))
+        grid = voxels.voxelize(mesh, 32, fill_interior=True)
+        # 32 voxels span the mesh, plus the boundary voxel and one of padding per side
+        self.assertEqual(grid.shape, (35, 35, 35))
+
+        centre, outside = grid.sample([[0.0, 0.0, 0.0], [2.3, 2.3, 2.3]])
+        self.assertLess(centre, -1.5)
+        self.assertGreater(outside, 1.5)
+
+        # Every vertex lies in an occupied voxel
+        i, j, k = grid.voxel_indices(mesh.positions).T
+        self.assertTrue(grid.occupancy[i, j, k].all())
+
+    def test_cache_round_trip(self):
+        mesh_path = os.path.join(TEMP_DIR, "voxel_test_sphere.glb")
+        with open(mesh_path, "wb") as f:
+            f.write(mesh_module.write_glb(uv_sphere(rings=12, segments=24)))
+
+        first = voxels.build_voxel_caches(mesh_path, [8, 16], workers=1)
+        self.assertEqual([summary["cached"] for summary in first], [False, False])
+        second = voxels.build_voxel_caches(mesh_path, [16, 8], workers=1)
+        self.assertEqual([(summary["resolution"], summary["cached"]) for summary in second], [(16, True), (8, True)])
+
+        grid = voxels.load_voxel_cache(mesh_path, 16)
+        self.assertEqual(list(grid.shape), second[0]["shape"])
+        self.assertEqual(int(np.count_nonzero(grid.occupancy)), second[0]["occupied"])
+
+        # A changed source invalidates the cache
+        os.utime(mesh_path, ns=(0, 0))
+        self.assertIsNone(voxels.load_voxel_cache(mesh_path, 16))
+
+    def test_parse_resolutions(self):
+        self.assertEqual(voxels.parse_resolutions("64, 128;64"), [64, 128])
+        for text in ("", "abc", "1", str(voxels.MAX_RESOLUTION + 1)):
+            with self.assertRaises(ValueError):
+                voxels.parse_resolutions(text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,270 @@
+"""
+World Labs ComfyUI Nodes - Asset Cache
+Local cache of downloaded world assets with background prefetch and shared in-flight transfers
+"""
+
+import os
+import time
+import shutil
+import hashlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from .worldlabs_state import get_state_dir, env_int
+from .worldlabs_rate_limit import get_rate_limiter
+from .worldlabs_world import WorldData
+
+
+DEFAULT_PREFETCH_POLICY = "thumbnail"
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_MB = 4096  # cache size budget; least recently used files are evicted beyond it
+EVICTION_GRACE = 60    # seconds a file is protected from eviction after its last use
+CHUNK_SIZE = 1024 * 1024
+
+# Names accepted in a prefetch policy, e.g. "thumbnail + pano + splat_100k"
+PREFETCH_ASSETS = ("thumbnail", "pano", "splat_100k", "splat_500k", "splat_full", "mesh")
+
+
+def guess_asset_extension(url):
+    """Determine the file extension of an asset from its URL"""
+    url_lower = url.lower()
+    if '.spz' in url_lower:
+        return '.spz'
+    elif '.ply' in url_lower:
+        return '.ply'
+    elif '.glb' in url_lower or '.gltf' in url_lower:
+        return '.glb'
+    elif '.png' in url_lower:
+        return '.png'
+    elif '.jpg' in url_lower or '.jpeg' in url_lower:
+        return '.jpg'
+    elif '.webp' in url_lower:
+        return '.webp'
+    return '.bin'
+
+
+def copy_from_cache(cache_path, file_path):
+    """
+    Copy a cached asset into place. Never hard-linked: editing the output
+    file in place would otherwise change the cached copy too.
+    """
+    part_path = file_path + ".part"
+    try:
+        shutil.copyfile(cache_path, part_path)
+        os.replace(part_path, file_path)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+
+
+def file_sha256(path):
+    """SHA-256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_prefetch_policy(policy):
+    """Parse "thumbnail + pano, splat_100k" into a list of asset names"""
+    names = []
+    for part in policy.replace("+", ",").split(","):
+        name = part.strip().lower().replace(" ", "_")
+        if not name or name == "none":
+            continue
+        if name not in PREFETCH_ASSETS:
+            print(f"[WorldLabs] Warning: Unknown prefetch asset '{name}' (expected one of {', '.join(PREFETCH_ASSETS)})")
+            continue
+        if name not in names:
+            names.append(name)
+    return names
+
+
+class AssetCache:
+    """
+    Content cache for asset URLs, keyed by URL without its query string so
+    re-signed links to the same file hit the cache. fetch() starts (or joins)
+    a background download and returns a Future resolving to the local path.
+
+    Cached files are read-only to callers. After each download the directory
+    (including files other nodes keep beside cached assets, e.g. voxel grids)
+    is trimmed to max_bytes, least recently used first. Use is tracked in the
+    access time, set on every hit, so modification times stay meaningful.
+    """
+
+    def __init__(self, cache_dir, max_workers=DEFAULT_WORKERS, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="worldlabs-asset")
+        self.lock = threading.Lock()
+        self.evict_lock = threading.Lock()
+        self.in_flight = {}
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build a cache using WORLDLABS_ASSET_CACHE_DIR / WORLDLABS_PREFETCH_WORKERS /
+        WORLDLABS_ASSET_CACHE_MB (0 = unlimited) overrides
+        """
+        cache_dir = os.getenv("WORLDLABS_ASSET_CACHE_DIR", "") or os.path.join(get_state_dir(), "asset_cache")
+        return cls(
+            cache_dir,
+            max_workers=env_int("WORLDLABS_PREFETCH_WORKERS", DEFAULT_WORKERS, 1),
+            max_bytes=env_int("WORLDLABS_ASSET_CACHE_MB", DEFAULT_MAX_MB, 0) * 1024 * 1024,
+        )
+
+    def cache_path(self, url):
+        parts = urlsplit(url)
+        key = hashlib.sha256(f"{parts.netloc}{parts.path}".encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.cache_dir, key + guess_asset_extension(parts.path or url))
+
+    def lookup(self, url):
+        """Future for a cached or in-flight asset, or None if it was never requested"""
+        path = self.cache_path(url)
+
+        with self.lock:
+            future = self.in_flight.get(path)
+            if future is not None:
+                return future
+
+        if self._touch(path):
+            future = Future()
+            future.set_result(path)
+            return future
+
+        return None
+
+    def fetch(self, url):
+        """Future resolving to the local path of url, downloading it if needed"""
+        path = self.cache_path(url)
+
+        with self.lock:
+            future = self.in_flight.get(path)
+            if future is not None:
+                return future
+
+            if self._touch(path):
+                future = Future()
+                future.set_result(path)
+                return future
+
+            future = self.executor.submit(self._download, url, path)
+            self.in_flight[path] = future
+
+        return future
+
+    def _download(self, url, path):
+        part_path = path + ".part"
+
+        try:
+            with get_rate_limiter().request("assets", "GET", url, stream=True) as response:
+                if response.status_code != 200:
+                    raise Exception(f"Failed to download asset: {response.status_code} - {response.text}")
+
+                with open(part_path, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        if chunk:
+                            f.write(chunk)
+
+            os.replace(part_path, path)
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+        finally:
+            with self.lock:
+                self.in_flight.pop(path, None)
+
+        self.evict(keep=path)
+        return path
+
+    def _touch(self, path):
+        """Mark a cached file as used now; False if it isn't cached"""
+        try:
+            os.utime(path, (time.time(), os.stat(path).st_mtime))
+            return True
+        except OSError:
+            return False
+
+    def evict(self, keep=None):
+        """
+        Delete least recently used files until the cache fits max_bytes.
+        In-flight downloads, keep, and files used within EVICTION_GRACE
+        seconds are never removed, so the budget can be exceeded briefly.
+        """
+        if self.max_bytes <= 0 or not self.evict_lock.acquire(blocking=False):
+            return
+
+        try:
+            with self.lock:
+                protected = set(self.in_flight)
+            if keep is not None:
+                protected.add(keep)
+
+            entries = []
+            total = 0
+            with os.scandir(self.cache_dir) as scan:
+                for entry in scan:
+                    if not entry.is_file(follow_symlinks=False) or entry.name.endswith(".part"):
+                        continue
+                    stat = entry.stat(follow_symlinks=False)
+                    total += stat.st_size
+                    entries.append((stat.st_atime, stat.st_size, entry.path))
+
+            if total <= self.max_bytes:
+                return
+
+            cutoff = time.time() - EVICTION_GRACE
+            removed = 0
+            freed = 0
+            for last_used, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path in protected or last_used > cutoff:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue  # e.g. still open on Windows
+                total -= size
+                removed += 1
+                freed += size
+
+            if removed:
+                print(
+                    f"[WorldLabs] Asset cache: evicted {removed} files ({freed / 2 ** 20:.0f} MiB), "
+                    f"{total / 2 ** 20:.0f} MiB in use of {self.max_bytes / 2 ** 20:.0f} MiB"
+                )
+        finally:
+            self.evict_lock.release()
+
+    def prefetch(self, world_data, policy):
+        """Start background downloads for the assets named in policy; returns {name: Future}"""
+        urls = WorldData.coerce(world_data).asset_urls
+        futures = {}
+
+        for name in parse_prefetch_policy(policy):
+            if name in urls:
+                futures[name] = self.fetch(urls[name])
+
+        if futures:
+            print(f"[WorldLabs] Prefetching in background: {', '.join(futures)}")
+
+        return futures
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_asset_cache():
+    """Process-wide asset cache, created on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AssetCache.from_env()
+        return _cache
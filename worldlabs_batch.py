@@ -0,0 +1,216 @@
+"""
+World Labs ComfyUI Nodes - Headless Batch Runner
+Generates worlds for a folder or glob of images without starting ComfyUI
+
+Usage (from the directory containing this package):
+    python -m Worldlabs-Comfy ./images --output-dir ./worlds --parallel 4
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .worldlabs_lazy import lazy_import
+from .worldlabs_state import set_output_directory, get_output_directory
+from .worldlabs_upload import get_upload_pool
+from .worldlabs_progress import check_cancelled
+
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
+
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".bmp", ".tif", ".tiff")
+MANIFEST_VERSION = 1
+ASSET_CHOICES = ("splat_100k", "splat_500k", "splat_full", "mesh", "pano", "thumbnail")
+
+
+def collect_images(inputs):
+    """Expand files, directories and glob patterns into a sorted list of image paths"""
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            candidates = [os.path.join(item, name) for name in os.listdir(item)]
+        else:
+            candidates = glob.glob(item, recursive=True) or [item]
+
+        for path in candidates:
+            if os.path.isfile(path) and path.lower().endswith(IMAGE_EXTENSIONS):
+                paths.add(os.path.abspath(path))
+
+    return sorted(paths)
+
+
+def load_image(path):
+    """Load an image file as a ComfyUI-style [1, H, W, C] float32 array"""
+    with Image.open(path) as pil_image:
+        image_np = np.asarray(pil_image.convert("RGB"), dtype=np.float32) / 255.0
+    return image_np[np.newaxis]
+
+
+class BatchManifest:
+    """
+    Results manifest written after every completed image, so an interrupted
+    run can resume: images already marked "done" are skipped.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data = {"version": MANIFEST_VERSION, "results": {}}
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.data = json.load(f)
+
+    def is_done(self, image_path):
+        return self.data["results"].get(image_path, {}).get("status") == "done"
+
+    def update(self, image_path, entry):
+        with self.lock:
+            self.data["results"][image_path] = entry
+            self.data["updated_at"] = time.time()
+
+            # Write atomically so an interruption never leaves a truncated manifest
+            part_path = self.path + ".part"
+            with open(part_path, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, indent=2)
+            os.replace(part_path, self.path)
+
+
+def process_image(image_path, args, assets, cancel):
+    """
+    Generate one world and download its assets; returns the manifest entry.
+    Setting cancel (threading.Event) stops the generation and skips the remaining steps.
+    """
+    from .worldlabs_comfyui_nodes import WorldLabsGenerateWorld, WorldLabsFetchAllAssets
+    from .worldlabs_viewer_node import WorldLabsViewer
+
+    display_name = os.path.splitext(os.path.basename(image_path))[0]
+    start_time = time.time()
+
+    world_data, world_id, marble_url, _ = WorldLabsGenerateWorld().generate_world(
+        load_image(image_path),
+        display_name,
+        args.model,
+        args.panorama,
+        args.poll_interval,
+        args.max_wait_time,
+        api_key=args.api_key,
+        text_prompt=args.text_prompt,
+        owner=args.owner,
+        prefetch=" + ".join(assets) or "none",
+        reuse_similar=args.reuse_similar,
+        cancel=cancel,
+    )
+
+    entry = {
+        "status": "done",
+        "world_id": world_id,
+        "display_name": display_name,
+        "marble_url": marble_url,
+        "world": world_data.to_compact(),
+        "duration": round(time.time() - start_time, 1),
+        "assets": [],
+        "viewers": [],
+    }
+
+    if assets:
+        check_cancelled(cancel)
+        selection = {name: name in assets for name in ASSET_CHOICES}
+        manifest_json, _ = WorldLabsFetchAllAssets().fetch_all(
+            world_data, subfolder=args.subfolder, filename_prefix=f"{display_name}_{world_id[:8]}", **selection
+        )
+        entry["assets"] = json.loads(manifest_json)
+
+    for viewer_type in args.viewer:
+        check_cancelled(cancel)
+        entry["viewers"].append(WorldLabsViewer().write_viewer(world_data, args.viewer_quality, viewer_type))
+
+    return entry
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m Worldlabs-Comfy",
+        description="Generate World Labs worlds for a batch of images without starting ComfyUI."
+    )
+    parser.add_argument("inputs", nargs="+", help="Image files, directories or glob patterns")
+    parser.add_argument("--output-dir", default="worldlabs_output", help="Directory for assets, viewers and the manifest")
+    parser.add_argument("--manifest", default="", help="Manifest path (default: <output-dir>/manifest.json)")
+    parser.add_argument("--parallel", type=int, default=2, help="Concurrent generations (default: 2)")
+    parser.add_argument("--model", default="Marble 0.1-mini", choices=["Marble 0.1-plus", "Marble 0.1-mini"])
+    parser.add_argument("--panorama", action="store_true", help="Inputs are 360° panoramas")
+    parser.add_argument("--text-prompt", default="", help="Text prompt applied to every image")
+    parser.add_argument("--poll-interval", type=int, default=0, help="Seconds between status checks (0 = auto)")
+    parser.add_argument("--max-wait-time", type=int, default=0, help="Timeout in seconds (0 = auto)")
+    parser.add_argument("--assets", default="splat_100k,mesh,pano",
+                        help=f"Comma-separated assets to download ({', '.join(ASSET_CHOICES)}, or none)")
+    parser.add_argument("--subfolder", default="worldlabs", help="Subfolder of the output directory for assets")
+    parser.add_argument("--viewer", action="append", default=[], choices=["splat", "mesh", "panorama"],
+                        help="Also write an HTML viewer of this type (repeatable)")
+    parser.add_argument("--viewer-quality", default="100k", choices=["100k", "500k", "full_res"])
+    parser.add_argument("--reuse-similar", default="", choices=["suggest", "auto", "off"],
+                        help="Reuse worlds of near-duplicate earlier inputs (default: WORLDLABS_REUSE_SIMILAR or suggest)")
+    parser.add_argument("--owner", default="batch", help="Scheduler owner tag for these jobs")
+    parser.add_argument("--api-key", default="", help="API key (default: WORLDLABS_API_KEY)")
+    parser.add_argument("--no-resume", action="store_true", help="Regenerate images already done in the manifest")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    parallel = max(1, args.parallel)
+
+    # Let this run's owner use the whole requested parallelism
+    os.environ.setdefault("WORLDLABS_SCHEDULER_PER_OWNER", str(parallel))
+    os.environ.setdefault("WORLDLABS_MAX_CONCURRENT_GENERATIONS", str(parallel))
+
+    set_output_directory(args.output_dir)
+    output_dir = get_output_directory()
+    manifest = BatchManifest(args.manifest or os.path.join(output_dir, "manifest.json"))
+
+    assets = [name.strip() for name in args.assets.split(",") if name.strip() and name.strip() != "none"]
+    unknown = [name for name in assets if name not in ASSET_CHOICES]
+    if unknown:
+        print(f"[WorldLabs] Unknown assets: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    images = collect_images(args.inputs)
+    pending = [path for path in images if args.no_resume or not manifest.is_done(path)]
+    print(
+        f"[WorldLabs] {len(images)} images found, {len(images) - len(pending)} already done, "
+        f"{len(pending)} to generate ({parallel} at a time)"
+    )
+    if len(pending) > 1:
+        get_upload_pool().set_batch_mode()
+
+    failures = 0
+    # Shared by every job: set on Ctrl+C so running generations stop instead of finishing
+    cancel = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="worldlabs-batch")
+    try:
+        futures = {executor.submit(process_image, path, args, assets, cancel): path for path in pending}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                entry = future.result()
+                print(f"[WorldLabs] ✓ {os.path.basename(path)} -> {entry['world_id']}")
+            except Exception as e:
+                failures += 1
+                entry = {"status": "failed", "error": str(e)}
+                print(f"[WorldLabs] ✗ {os.path.basename(path)}: {e}")
+            manifest.update(path, entry)
+    except KeyboardInterrupt:
+        print("\n[WorldLabs] Interrupted; completed results are in the manifest. Re-run to resume.")
+        cancel.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+        return 130
+
+    executor.shutdown()
+    print(f"[WorldLabs] Manifest: {manifest.path}")
+    return 1 if failures else 0
@@ -0,0 +1,160 @@
+"""
+World Labs ComfyUI Nodes - World Catalog
+Local SQLite catalog of generated worlds for fast load-by-ID and metadata search
+"""
+
+import json
+import time
+import threading
+
+from .worldlabs_state import connect
+from .worldlabs_world import WorldData
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS worlds (
+    world_id TEXT PRIMARY KEY,
+    display_name TEXT NOT NULL DEFAULT '',
+    model TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL,
+    duration REAL,
+    world_json TEXT NOT NULL,
+    parameters_json TEXT NOT NULL DEFAULT '{}',
+    thumbnail_path TEXT NOT NULL DEFAULT '',
+    asset_paths_json TEXT NOT NULL DEFAULT '{}',
+    source TEXT NOT NULL DEFAULT 'generated'
+);
+CREATE INDEX IF NOT EXISTS worlds_model ON worlds (model, created_at);
+CREATE INDEX IF NOT EXISTS worlds_created ON worlds (created_at);
+CREATE INDEX IF NOT EXISTS worlds_display_name ON worlds (display_name COLLATE NOCASE, created_at);
+"""
+
+
+def escape_like(text):
+    """Escape LIKE wildcards so text matches literally (use with ESCAPE '\\')"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class WorldCatalog:
+    """
+    Catalog of every world this installation has generated or fetched.
+    Stores the full world response alongside generation parameters, duration
+    and local file paths, indexed by model, creation date and display name.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.conn = connect()
+        self.conn.executescript(SCHEMA)
+
+    def record_world(self, world, parameters=None, duration=None, source="generated"):
+        """Insert or refresh a world, keeping previously recorded local paths"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO worlds (world_id, display_name, model, created_at, duration, world_json, "
+                "parameters_json, source) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(world_id) DO UPDATE SET display_name = excluded.display_name, "
+                "model = excluded.model, world_json = excluded.world_json, "
+                "duration = COALESCE(excluded.duration, worlds.duration), "
+                "parameters_json = CASE WHEN excluded.parameters_json = '{}' "
+                "THEN worlds.parameters_json ELSE excluded.parameters_json END",
+                (
+                    world.world_id,
+                    world.display_name,
+                    world.model,
+                    time.time(),
+                    duration,
+                    json.dumps(world.to_dict(), separators=(",", ":")),
+                    json.dumps(parameters or {}, separators=(",", ":")),
+                    source,
+                )
+            )
+
+    def set_thumbnail_path(self, world_id, path):
+        with self.lock:
+            self.conn.execute("UPDATE worlds SET thumbnail_path = ? WHERE world_id = ?", (path, world_id))
+
+    def add_asset_paths(self, world_id, paths):
+        """Merge {asset name: local path} into the world's recorded asset paths"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT asset_paths_json FROM worlds WHERE world_id = ?", (world_id,)
+            ).fetchone()
+            if row is None:
+                return
+            asset_paths = json.loads(row[0])
+            asset_paths.update(paths)
+            self.conn.execute(
+                "UPDATE worlds SET asset_paths_json = ? WHERE world_id = ?",
+                (json.dumps(asset_paths, separators=(",", ":")), world_id)
+            )
+
+    def _entry(self, row):
+        return {
+            "world_id": row["world_id"],
+            "display_name": row["display_name"],
+            "model": row["model"],
+            "created_at": row["created_at"],
+            "duration": row["duration"],
+            "parameters": json.loads(row["parameters_json"]),
+            "thumbnail_path": row["thumbnail_path"],
+            "asset_paths": json.loads(row["asset_paths_json"]),
+            "source": row["source"],
+        }
+
+    def get(self, world_id_or_name):
+        """
+        Resolve a world ID, or failing that the most recent world with that
+        display name (case-insensitive); returns (WorldData, entry) or None
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT * FROM worlds WHERE world_id = ?", (world_id_or_name,)
+            ).fetchone()
+            if row is None:
+                row = self.conn.execute(
+                    "SELECT * FROM worlds WHERE display_name = ? COLLATE NOCASE "
+                    "ORDER BY created_at DESC LIMIT 1",
+                    (world_id_or_name,)
+                ).fetchone()
+
+        if row is None:
+            return None
+
+        return WorldData.from_response(json.loads(row["world_json"])), self._entry(row)
+
+    def search(self, name_contains="", model="", since=None, limit=50):
+        """Catalog entries matching the filters, newest first"""
+        clauses = []
+        params = []
+        if name_contains:
+            clauses.append("display_name LIKE ? ESCAPE '\\'")
+            params.append(f"%{escape_like(name_contains)}%")
+        if model:
+            clauses.append("model = ?")
+            params.append(model)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT * FROM worlds {where} ORDER BY created_at DESC LIMIT ?",
+                params + [int(limit)]
+            ).fetchall()
+
+        return [self._entry(row) for row in rows]
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    """Process-wide world catalog, created on first use"""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = WorldCatalog()
+        return _catalog
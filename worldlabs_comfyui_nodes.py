@@ -6,10 +6,39 @@ Implements API integration for generating 3D worlds from images
 import os
 import time
 import io
-import requests
-import numpy as np
-from PIL import Image
-import folder_paths
+import json
+import threading
+from urllib.parse import quote
+
+from .worldlabs_lazy import lazy_import
+from .worldlabs_rate_limit import get_rate_limiter
+from .worldlabs_job_queue import get_scheduler
+from .worldlabs_durations import get_duration_store, MIN_POLL_INTERVAL
+from .worldlabs_upload import JpegEncodeStream, get_upload_pool
+from .worldlabs_media_index import get_media_index, image_content_hash
+from .worldlabs_operations import get_operation_registry
+from .worldlabs_asset_cache import (
+    DEFAULT_PREFETCH_POLICY, copy_from_cache, file_sha256, get_asset_cache, guess_asset_extension
+)
+from .worldlabs_world import WorldData, looks_like_world_id
+from .worldlabs_catalog import get_catalog
+from .worldlabs_phash import format_hash, perceptual_hashes, select_keyframes
+from .worldlabs_phash_index import get_default_threshold, get_phash_index, parameters_key, parse_reuse_mode
+from .worldlabs_mesh import read_glb, simplify, write_glb
+from .worldlabs_compose import Transform, compose_meshes, compose_splats
+from .worldlabs_voxels import build_voxel_caches, load_voxel_cache, parse_resolutions
+from .worldlabs_splat import DEFAULT_FRACTIONAL_BITS, load_splats, write_ply, write_spz
+from .worldlabs_state import get_output_directory
+from .worldlabs_progress import (
+    CancellableReader, Progress, cancellable_chunks, check_cancelled, is_cancellation, wait_for
+)
+from .worldlabs_viewer_node import WorldLabsViewer
+from .worldlabs_profiling import profile_call
+
+# Heavy dependencies load when a node first executes, keeping ComfyUI startup fast
+requests = lazy_import("requests")
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
 
 
 # API Configuration
@@ -80,13 +109,13 @@ class WorldLabsGenerateWorld:
                 }),
                 "poll_interval": ("INT", {
                     "default": 15,
-                    "min": 5,
+                    "min": 0,
                     "max": 60,
                     "step": 1
                 }),
                 "max_wait_time": ("INT", {
                     "default": 600,
-                    "min": 60,
+                    "min": 0,
                     "max": 1800,
                     "step": 10
                 }),
@@ -100,6 +129,45 @@ class WorldLabsGenerateWorld:
                     "default": "",
                     "multiline": True
                 }),
+                "owner": ("STRING", {
+                    "default": "",
+                    "multiline": False,
+                    "placeholder": "Queue owner (defaults to WORLDLABS_OWNER)"
+                }),
+                "priority": ("INT", {
+                    "default": 0,
+                    "min": -10,
+                    "max": 10,
+                    "step": 1
+                }),
+                "timeout_percentile": ("FLOAT", {
+                    "default": 0.95,
+                    "min": 0.5,
+                    "max": 1.0,
+                    "step": 0.01
+                }),
+                "prefetch": ("STRING", {
+                    "default": "",
+                    "multiline": False,
+                    "placeholder": "e.g. thumbnail + pano + splat_100k (defaults to WORLDLABS_PREFETCH)"
+                }),
+                "reuse_similar": ([
+                    "suggest",
+                    "auto",
+                    "off"
+                ], {
+                    "default": "suggest"
+                }),
+                # -1 uses WORLDLABS_SIMILARITY_THRESHOLD (default 6)
+                "similarity_threshold": ("INT", {
+                    "default": -1,
+                    "min": -1,
+                    "max": 32,
+                    "step": 1
+                }),
+                "profile": ("BOOLEAN", {
+                    "default": False
+                }),
             }
         }
 
@@ -130,17 +198,31 @@ class WorldLabsGenerateWorld:
         Input: [B, H, W, C] float32 tensor with values 0.0-1.0
         Output: JPEG bytes
         """
+        return self.encode_jpeg(self.convert_image_to_pil(image_tensor))
+
+    def convert_image_to_array(self, image_tensor):
+        """
+        Convert ComfyUI image tensor to a uint8 array
+        Input: [B, H, W, C] float32 tensor with values 0.0-1.0 (first image is used)
+        Output: [H, W, C] uint8 array
+        """
         # Take first image if batch
         if len(image_tensor.shape) == 4:
             image_tensor = image_tensor[0]
 
+        # Torch tensors inside ComfyUI, plain NumPy arrays in headless runs
+        if hasattr(image_tensor, "cpu"):
+            image_tensor = image_tensor.cpu().numpy()
+
         # Convert from float [0, 1] to uint8 [0, 255]
-        image_np = (image_tensor.cpu().numpy() * 255).astype(np.uint8)
+        return (image_tensor * 255).astype(np.uint8)
 
-        # Convert to PIL Image
-        pil_image = Image.fromarray(image_np)
+    def convert_image_to_pil(self, image_tensor):
+        """Convert ComfyUI image tensor to a PIL image"""
+        return Image.fromarray(self.convert_image_to_array(image_tensor))
 
-        # Convert to JPEG bytes
+    def encode_jpeg(self, pil_image):
+        """Encode a PIL image to JPEG bytes"""
         buffer = io.BytesIO()
         pil_image.save(buffer, format="JPEG", quality=95)
         buffer.seek(0)
@@ -180,7 +262,7 @@ class WorldLabsGenerateWorld:
         }
 
         print(f"[WorldLabs] Preparing upload for {filename}...")
-        response = requests.post(url, json=payload, headers=headers)
+        response = get_rate_limiter().request("media_assets", "POST", url, json=payload, headers=headers)
 
         if response.status_code != 200:
             raise Exception(f"Failed to prepare upload: {response.status_code} - {response.text}")
@@ -203,9 +285,18 @@ class WorldLabsGenerateWorld:
 
         return media_asset_id, upload_url, required_headers
 
-    def upload_image(self, upload_url, image_bytes, required_headers=None):
-        """Step 2: Upload image to signed URL"""
-        print(f"[WorldLabs] Uploading image ({len(image_bytes)} bytes)...")
+    def upload_image(self, upload_url, image_bytes, required_headers=None, cancel=None, progress=None):
+        """
+        Step 2: Upload image to signed URL (bytes, or an iterable of chunks to stream).
+        The body is read in blocks that check for cancellation, so Cancel aborts mid-transfer.
+        """
+        on_progress = progress.update_bytes if progress is not None else None
+        if isinstance(image_bytes, bytes):
+            print(f"[WorldLabs] Uploading image ({len(image_bytes)} bytes)...")
+            body = CancellableReader(image_bytes, cancel, on_progress)
+        else:
+            print("[WorldLabs] Streaming image upload while encoding...")
+            body = cancellable_chunks(image_bytes, cancel, on_progress)
 
         # Build headers
         headers = {"Content-Type": "image/jpeg"}
@@ -214,7 +305,7 @@ class WorldLabsGenerateWorld:
 
         response = requests.put(
             upload_url,
-            data=image_bytes,
+            data=body,
             headers=headers
         )
 
@@ -253,7 +344,7 @@ class WorldLabsGenerateWorld:
             print(f"[WorldLabs] Text prompt: {text_prompt}")
         print(f"[WorldLabs] Panorama mode: {is_panorama}")
 
-        response = requests.post(url, json=payload, headers=headers)
+        response = get_rate_limiter().request("generate", "POST", url, json=payload, headers=headers)
 
         if response.status_code != 200:
             raise Exception(f"Failed to start generation: {response.status_code} - {response.text}")
@@ -277,62 +368,75 @@ class WorldLabsGenerateWorld:
 
         return operation_id
 
-    def poll_operation(self, api_key, operation_id, poll_interval, max_wait_time):
-        """Step 4: Poll for completion"""
+    def get_operation(self, api_key, operation_id):
+        """Fetch the current status of an operation"""
         url = f"{BASE_URL}/operations/{operation_id}"
         headers = {
             "WLT-Api-Key": api_key
         }
 
-        start_time = time.time()
-        last_progress = -1
-
-        while True:
-            elapsed = time.time() - start_time
+        response = get_rate_limiter().request("operations", "GET", url, headers=headers)
 
-            if elapsed > max_wait_time:
-                raise TimeoutError(
-                    f"World generation timed out after {max_wait_time} seconds. "
-                    f"Operation ID: {operation_id}"
-                )
-
-            response = requests.get(url, headers=headers)
-
-            if response.status_code != 200:
-                raise Exception(f"Failed to poll operation: {response.status_code} - {response.text}")
+        if response.status_code != 200:
+            raise Exception(f"Failed to poll operation: {response.status_code} - {response.text}")
 
-            data = response.json()
+        return response.json()
 
-            # Show progress if available
-            if "progress" in data and data["progress"] != last_progress:
-                last_progress = data["progress"]
-                print(f"[WorldLabs] Progress: {last_progress}%")
+    def poll_operation(self, api_key, operation_id, poll_interval, max_wait_time, first_poll_delay=0, cancel=None,
+                       progress=None):
+        """
+        Step 4: Poll for completion (one shared poller per operation across all waiters).
+        The wait gives up within a fraction of a second of a cancellation.
+        """
+        # Nothing to see before the fastest typical completion
+        if first_poll_delay > 0:
+            print(f"[WorldLabs] First status check in {int(first_poll_delay)}s...")
+
+        data = get_operation_registry().wait(
+            operation_id,
+            lambda: self.get_operation(api_key, operation_id),
+            poll_interval,
+            max_wait_time,
+            first_poll_delay,
+            cancel=cancel,
+            on_progress=progress.update if progress is not None else None
+        )
 
-            if data.get("done", False):
-                print("[WorldLabs] Generation complete!")
+        print("[WorldLabs] Generation complete!")
 
-                # Check if there's an actual error (not None)
-                error = data.get("error")
-                if error is not None and error:
-                    raise Exception(f"Generation failed: {error}")
+        # Check if there's an actual error (not None)
+        error = data.get("error")
+        if error is not None and error:
+            raise Exception(f"Generation failed: {error}")
 
-                # Check if we have response data
-                if "response" not in data or data["response"] is None:
-                    raise Exception(
-                        f"Generation completed but no response data received. "
-                        f"Full response: {data}"
-                    )
+        # Check if we have response data
+        if "response" not in data or data["response"] is None:
+            raise Exception(
+                f"Generation completed but no response data received. "
+                f"Full response: {data}"
+            )
 
-                return data["response"]
+        # Validate once here; downstream nodes use the parsed WorldData
+        return WorldData.from_response(data["response"])
 
-            print(f"[WorldLabs] Waiting... ({int(elapsed)}s elapsed)")
-            time.sleep(poll_interval)
+    def load_cached_thumbnail(self, future, cancel=None):
+        """Wait (cancellably) for a prefetched thumbnail and convert it to a ComfyUI image"""
+        try:
+            with open(wait_for(future, cancel), "rb") as f:
+                return self.convert_bytes_to_image(f.read())
+        except Exception as e:
+            if is_cancellation(e):
+                raise
+            print(f"[WorldLabs] Warning: Failed to download thumbnail: {e}")
+            # Return blank image
+            blank = np.zeros((256, 256, 3), dtype=np.float32)
+            return np.expand_dims(blank, axis=0)
 
     def download_thumbnail(self, thumbnail_url):
         """Download thumbnail and convert to ComfyUI image"""
         print("[WorldLabs] Downloading thumbnail...")
 
-        response = requests.get(thumbnail_url)
+        response = get_rate_limiter().request("assets", "GET", thumbnail_url)
 
         if response.status_code != 200:
             print(f"[WorldLabs] Warning: Failed to download thumbnail: {response.status_code}")
@@ -342,52 +446,273 @@ class WorldLabsGenerateWorld:
 
         return self.convert_bytes_to_image(response.content)
 
-    def generate_world(self, image, display_name, model, is_panorama, poll_interval, max_wait_time,
-                      api_key="", text_prompt=""):
-        """Main function to orchestrate world generation"""
-        try:
-            # Get API key
-            actual_api_key = self.get_api_key(api_key)
+    def resolve_timing(self, model, is_panorama, width, height, poll_interval, max_wait_time,
+                       timeout_percentile=0.95):
+        """
+        Resolve (first_poll, poll_interval, max_wait_time); inputs set to 0 ("auto")
+        are derived from historical durations for this model/panorama/resolution class.
+        An explicit poll_interval is raised to at least MIN_POLL_INTERVAL seconds.
+        """
+        if poll_interval > 0:
+            poll_interval = max(MIN_POLL_INTERVAL, poll_interval)
+        if poll_interval > 0 and max_wait_time > 0:
+            return 0, poll_interval, max_wait_time
+
+        auto_first, auto_interval, auto_wait = get_duration_store().get_timing(
+            model, is_panorama, width, height, timeout_percentile
+        )
 
-            # Convert image to bytes
-            image_bytes = self.convert_image_to_bytes(image)
+        first_poll = auto_first if poll_interval <= 0 else 0
+        poll_interval = auto_interval if poll_interval <= 0 else poll_interval
+        max_wait_time = auto_wait if max_wait_time <= 0 else max_wait_time
 
-            # Step 1: Prepare upload
-            media_asset_id, upload_url, required_headers = self.prepare_upload(actual_api_key)
+        print(
+            f"[WorldLabs] Auto timing: first poll {first_poll}s, "
+            f"every {poll_interval}s, timeout {max_wait_time}s"
+        )
+
+        return first_poll, poll_interval, max_wait_time
+
+    def upload_input_image(self, api_key, pil_image, cancel=None, progress=None):
+        """
+        Steps 1-2: encode and upload the input image, returning (media_asset_id, image_bytes).
+        The prepare_upload round-trip (or a pre-provisioned slot) runs concurrently
+        with JPEG encoding; with WORLDLABS_STREAM_UPLOAD=1 the PUT also streams
+        chunks while encoding is still in progress.
+        """
+        slot = get_upload_pool().acquire(api_key, self.prepare_upload)
+
+        if os.getenv("WORLDLABS_STREAM_UPLOAD", "") == "1":
+            stream = JpegEncodeStream(pil_image, quality=95)
+            media_asset_id, upload_url, required_headers = wait_for(slot, cancel)
+            self.upload_image(upload_url, stream, required_headers, cancel, progress)
+            image_bytes = stream.getvalue()
+        else:
+            image_bytes = self.encode_jpeg(pil_image)
+            media_asset_id, upload_url, required_headers = wait_for(slot, cancel)
+            self.upload_image(upload_url, image_bytes, required_headers, cancel, progress)
+
+        return media_asset_id, image_bytes
 
-            # Step 2: Upload image
-            self.upload_image(upload_url, image_bytes, required_headers)
+    def run_generation(self, api_key, media_asset_id, display_name, model, is_panorama, poll_interval,
+                       max_wait_time, text_prompt="", image_size=(0, 0), timeout_percentile=0.95,
+                       reupload=None, prefetch=DEFAULT_PREFETCH_POLICY, cancel=None, progress=None):
+        """
+        Generate and poll one world from an uploaded media asset; runs on a scheduler worker.
+        If starting from a reused asset fails, reupload() provides a fresh media_asset_id.
+        Stops with OperationCancelled once cancel is set.
+        """
+        # The waiting node may have been cancelled while this job was queued
+        check_cancelled(cancel)
+
+        width, height = image_size
+        first_poll, poll_interval, max_wait_time = self.resolve_timing(
+            model, is_panorama, width, height, poll_interval, max_wait_time, timeout_percentile
+        )
 
-            # Step 3: Start generation
+        # Step 3: Start generation
+        try:
             operation_id = self.start_generation(
-                actual_api_key,
+                api_key,
                 media_asset_id,
                 display_name,
                 model,
                 is_panorama,
                 text_prompt
             )
+        except Exception as e:
+            if reupload is None:
+                raise
+            print(f"[WorldLabs] Reused media asset was rejected ({e}), uploading again...")
+            operation_id = self.start_generation(
+                api_key,
+                reupload(),
+                display_name,
+                model,
+                is_panorama,
+                text_prompt
+            )
 
-            # Step 4: Poll for completion
+        # Step 4: Poll for completion
+        generation_start = time.time()
+        if progress is not None:
+            progress.update(0)
+        try:
             world_data = self.poll_operation(
-                actual_api_key,
+                api_key,
                 operation_id,
                 poll_interval,
-                max_wait_time
+                max_wait_time,
+                first_poll,
+                cancel=cancel,
+                progress=progress
+            )
+        except TimeoutError:
+            # Slow generations must still count towards the auto timeout
+            get_duration_store().record(
+                model, is_panorama, width, height, time.time() - generation_start, timed_out=True
+            )
+            raise
+        duration = time.time() - generation_start
+        get_duration_store().record(model, is_panorama, width, height, duration)
+
+        get_catalog().record_world(
+            world_data,
+            parameters={
+                "model": model,
+                "is_panorama": is_panorama,
+                "text_prompt": text_prompt,
+                "display_name": display_name,
+                "media_asset_id": media_asset_id,
+                "image_size": [width, height],
+            },
+            duration=duration,
+        )
+
+        # Extract key information
+        world_id = world_data.world_id
+        marble_url = world_data.marble_url
+
+        # Start background downloads into the asset cache before anything else
+        prefetched = get_asset_cache().prefetch(world_data, prefetch)
+
+        # Download thumbnail
+        thumbnail_url = world_data.asset_url("thumbnail")
+        if "thumbnail" in prefetched:
+            thumbnail = self.load_cached_thumbnail(prefetched["thumbnail"], cancel)
+            if prefetched["thumbnail"].exception() is None:
+                get_catalog().set_thumbnail_path(world_id, prefetched["thumbnail"].result())
+        elif thumbnail_url:
+            thumbnail = self.download_thumbnail(thumbnail_url)
+        else:
+            # Create blank thumbnail
+            blank = np.zeros((256, 256, 3), dtype=np.float32)
+            thumbnail = np.expand_dims(blank, axis=0)
+
+        return (world_data, world_id, marble_url, thumbnail)
+
+    def find_similar_world(self, phash, params_key, threshold, reuse_similar):
+        """
+        Look for a cataloged world generated from a near-duplicate input with the same
+        parameters; returns the Load World outputs when reuse_similar is "auto", else None
+        """
+        index = get_phash_index()
+        match = index.find(phash, params_key, threshold)
+        if match is None:
+            return None
+
+        world_id, distance = match
+        if get_catalog().get(world_id) is None:
+            index.forget(world_id)
+            return None
+
+        if reuse_similar != "auto":
+            print(
+                f"[WorldLabs] Input is a near-duplicate ({distance}/64 bits differ) of world {world_id}; "
+                f"set reuse_similar to 'auto' to reuse it instead of generating"
             )
+            return None
+
+        print(f"[WorldLabs] Reusing world {world_id} for a near-duplicate input ({distance}/64 bits differ)")
+        return WorldLabsLoadWorld().load_world(world_id)
 
-            # Extract key information
-            world_id = world_data.get("world_id", "")
-            marble_url = world_data.get("marble_url", "")
+    def generate_world(self, image, display_name, model, is_panorama, poll_interval, max_wait_time,
+                      api_key="", text_prompt="", owner="", priority=0, timeout_percentile=0.95,
+                      prefetch="", reuse_similar="", similarity_threshold=None, cancel=None, profile=False):
+        """
+        Main function to orchestrate world generation.
+        cancel (threading.Event) lets a headless caller stop the upload and job.
+        profile is the node input consumed by the profiling wrapper (see instrument_nodes).
+        """
+        try:
+            # Get API key
+            actual_api_key = self.get_api_key(api_key)
 
-            # Download thumbnail
-            thumbnail_url = world_data.get("thumbnail_url", "")
-            if thumbnail_url:
-                thumbnail = self.download_thumbnail(thumbnail_url)
+            pixels = self.convert_image_to_array(image)
+
+            # Re-saved, resized or color-graded copies of an earlier input can reuse its world
+            reuse_similar = parse_reuse_mode(reuse_similar or os.getenv("WORLDLABS_REUSE_SIMILAR", ""))
+            phash = perceptual_hashes(pixels)[0]
+            params_key = parameters_key(model, is_panorama, text_prompt)
+            if reuse_similar != "off":
+                if similarity_threshold is None or similarity_threshold < 0:
+                    similarity_threshold = get_default_threshold()
+                similar = self.find_similar_world(phash, params_key, similarity_threshold, reuse_similar)
+                if similar is not None:
+                    return similar
+
+            content_hash = image_content_hash(pixels)
+            media_index = get_media_index()
+
+            # Set when this node is cancelled, so the upload and the queued job stop too
+            if cancel is None:
+                cancel = threading.Event()
+            progress = Progress(100)
+
+            def upload():
+                # Upload ahead of the queue; only generation itself holds a worker
+                media_asset_id, _ = self.upload_input_image(
+                    actual_api_key, Image.fromarray(pixels), cancel, progress
+                )
+                media_index.store(content_hash, actual_api_key, media_asset_id)
+                return media_asset_id
+
+            def reupload():
+                media_index.evict(content_hash, actual_api_key)
+                return upload()
+
+            # Identical input already uploaded (e.g. a prompt sweep): start from that asset
+            media_asset_id = media_index.lookup(content_hash, actual_api_key)
+            reused = media_asset_id is not None
+            if reused:
+                print(f"[WorldLabs] Reusing uploaded media asset {media_asset_id}")
             else:
-                # Create blank thumbnail
-                blank = np.zeros((256, 256, 3), dtype=np.float32)
-                thumbnail = np.expand_dims(blank, axis=0)
+                media_asset_id = upload()
+
+            # Queue the generation; the scheduler caps concurrent generations and shares
+            # capacity fairly between owners when several threads submit at once (batch runs)
+            owner = owner.strip() or os.getenv("WORLDLABS_OWNER", "") or "default"
+            scheduler = get_scheduler()
+            job_id, future = scheduler.submit(
+                # Profiled with this node when its profile input / WORLDLABS_PROFILE is on
+                profile_call(lambda: self.run_generation(
+                    actual_api_key,
+                    media_asset_id,
+                    display_name,
+                    model,
+                    is_panorama,
+                    poll_interval,
+                    max_wait_time,
+                    text_prompt,
+                    image_size=(pixels.shape[1], pixels.shape[0]),
+                    timeout_percentile=timeout_percentile,
+                    reupload=reupload if reused else None,
+                    prefetch=prefetch.strip() or os.getenv("WORLDLABS_PREFETCH", DEFAULT_PREFETCH_POLICY),
+                    cancel=cancel,
+                    progress=progress
+                )),
+                owner=owner,
+                priority=priority,
+                model=model,
+                display_name=display_name,
+                world_id_of=lambda result: result[1],
+            )
+
+            job_status = scheduler.get_job_status(job_id)
+            if job_status and job_status["status"] == "queued":
+                print(
+                    f"[WorldLabs] Job {job_id[:8]} queued for {owner} at position "
+                    f"{job_status['queue_position']} (ETA {int(job_status['eta_s'])}s)"
+                )
+
+            try:
+                world_data, world_id, marble_url, thumbnail = wait_for(future, cancel)
+            except BaseException:
+                # A job still waiting in the queue never needs to start
+                scheduler.cancel(job_id)
+                raise
+            progress.update(100)
+            get_phash_index().add(phash, params_key, world_id)
 
             print(f"[WorldLabs] World ID: {world_id}")
             print(f"[WorldLabs] Marble URL: {marble_url}")
@@ -420,23 +745,13 @@ class WorldLabsWorldInfo:
 
     def extract_urls(self, world_data):
         """Extract asset URLs from world data"""
-        assets = world_data.get("assets", {})
-
-        # Extract URLs from actual API structure
-        # Splats are under assets.splats.spz_urls
-        splats = assets.get("splats", {})
-        spz_urls = splats.get("spz_urls", {})
-        splat_100k = spz_urls.get("100k", "")
-        splat_500k = spz_urls.get("500k", "")
-        splat_full = spz_urls.get("full_res", "")
+        world = WorldData.coerce(world_data)
 
-        # Mesh is under assets.mesh.collider_mesh_url
-        mesh_data = assets.get("mesh", {})
-        mesh = mesh_data.get("collider_mesh_url", "")
-
-        # Panorama is under assets.imagery.pano_url
-        imagery = assets.get("imagery", {})
-        pano = imagery.get("pano_url", "")
+        splat_100k = world.asset_url("splat_100k")
+        splat_500k = world.asset_url("splat_500k")
+        splat_full = world.asset_url("splat_full")
+        mesh = world.asset_url("mesh")
+        pano = world.asset_url("pano")
 
         # Print info
         print("\n[WorldLabs] World Assets:")
@@ -479,6 +794,9 @@ class WorldLabsDownloadAsset:
                     "default": "worldlabs",
                     "multiline": False
                 }),
+                "profile": ("BOOLEAN", {
+                    "default": False
+                }),
             }
         }
 
@@ -488,13 +806,16 @@ class WorldLabsDownloadAsset:
     OUTPUT_NODE = True
     CATEGORY = "WorldLabs"
 
-    def download_asset(self, asset_url, filename="world_asset", subfolder="worldlabs"):
-        """Download asset from URL to ComfyUI output directory"""
+    def download_asset(self, asset_url, filename="world_asset", subfolder="worldlabs", profile=False):
+        """
+        Download asset from URL to ComfyUI output directory.
+        profile is the node input consumed by the profiling wrapper (see instrument_nodes).
+        """
         if not asset_url or not asset_url.strip():
             raise ValueError("Asset URL is empty")
 
         # Get output directory
-        output_dir = folder_paths.get_output_directory()
+        output_dir = get_output_directory()
 
         # Create subfolder if needed
         if subfolder:
@@ -502,21 +823,7 @@ class WorldLabsDownloadAsset:
             os.makedirs(output_dir, exist_ok=True)
 
         # Determine file extension from URL
-        url_lower = asset_url.lower()
-        if '.spz' in url_lower:
-            ext = '.spz'
-        elif '.ply' in url_lower:
-            ext = '.ply'
-        elif '.glb' in url_lower or '.gltf' in url_lower:
-            ext = '.glb'
-        elif '.png' in url_lower:
-            ext = '.png'
-        elif '.jpg' in url_lower or '.jpeg' in url_lower:
-            ext = '.jpg'
-        elif '.webp' in url_lower:
-            ext = '.webp'
-        else:
-            ext = '.bin'
+        ext = guess_asset_extension(asset_url)
 
         # Add extension if not present
         if not filename.endswith(ext):
@@ -524,12 +831,27 @@ class WorldLabsDownloadAsset:
 
         file_path = os.path.join(output_dir, filename)
 
+        # Already prefetched, or being prefetched: reuse that transfer
+        cached = get_asset_cache().lookup(asset_url)
+        if cached is not None:
+            print(f"[WorldLabs] Using prefetched asset for {asset_url}")
+            try:
+                copy_from_cache(wait_for(cached), file_path)
+                print(f"[WorldLabs] ✓ Asset ready ({os.path.getsize(file_path)} bytes)")
+                print(f"[WorldLabs] Saved to: {file_path}")
+                return (file_path,)
+            except Exception as e:
+                # Interrupted while waiting: stop. Failed prefetch (or evicted file): download directly
+                if not cached.done():
+                    raise
+                print(f"[WorldLabs] Prefetched copy unavailable ({e}), downloading directly")
+
         print(f"[WorldLabs] Downloading asset...")
         print(f"[WorldLabs] URL: {asset_url}")
         print(f"[WorldLabs] Destination: {file_path}")
 
         # Download file
-        response = requests.get(asset_url, stream=True)
+        response = get_rate_limiter().request("assets", "GET", asset_url, stream=True)
 
         if response.status_code != 200:
             raise Exception(f"Failed to download asset: {response.status_code} - {response.text}")
@@ -537,19 +859,29 @@ class WorldLabsDownloadAsset:
         # Get file size if available
         total_size = int(response.headers.get('content-length', 0))
 
-        # Write to file
+        # Write to a .part file so a cancelled or failed transfer never leaves a truncated asset
+        progress_bar = Progress(100)
+        part_path = file_path + ".part"
         downloaded = 0
-        with open(file_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-                    downloaded += len(chunk)
-
-                    # Show progress for large files
-                    if total_size > 0:
-                        progress = (downloaded / total_size) * 100
-                        if progress % 10 < 1:  # Print every ~10%
-                            print(f"[WorldLabs] Progress: {progress:.0f}%")
+        try:
+            with response, open(part_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=8192):
+                    check_cancelled()
+                    if chunk:
+                        f.write(chunk)
+                        downloaded += len(chunk)
+
+                        # Show progress for large files
+                        if total_size > 0:
+                            progress_bar.update_bytes(downloaded, total_size)
+                            progress = (downloaded / total_size) * 100
+                            if progress % 10 < 1:  # Print every ~10%
+                                print(f"[WorldLabs] Progress: {progress:.0f}%")
+            os.replace(part_path, file_path)
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
 
         print(f"[WorldLabs] ✓ Asset downloaded successfully ({downloaded} bytes)")
         print(f"[WorldLabs] Saved to: {file_path}")
@@ -557,12 +889,986 @@ class WorldLabsDownloadAsset:
         return (file_path,)
 
 
+class WorldLabsFetchAllAssets:
+    """
+    Node to download several world assets concurrently
+    """
+
+    ASSET_NAMES = ("splat_100k", "splat_500k", "splat_full", "mesh", "pano", "thumbnail")
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "world_data": ("WORLDLABS_WORLD",),
+                "splat_100k": ("BOOLEAN", {"default": True}),
+                "splat_500k": ("BOOLEAN", {"default": False}),
+                "splat_full": ("BOOLEAN", {"default": False}),
+                "mesh": ("BOOLEAN", {"default": True}),
+                "pano": ("BOOLEAN", {"default": True}),
+                "thumbnail": ("BOOLEAN", {"default": False}),
+            },
+            "optional": {
+                "filename_prefix": ("STRING", {
+                    "default": "",
+                    "multiline": False,
+                    "placeholder": "Defaults to the world ID"
+                }),
+                "subfolder": ("STRING", {
+                    "default": "worldlabs",
+                    "multiline": False
+                }),
+            }
+        }
+
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("manifest_json", "output_dir")
+    FUNCTION = "fetch_all"
+    OUTPUT_NODE = True
+    CATEGORY = "WorldLabs"
+
+    def fetch_all(self, world_data, splat_100k=True, splat_500k=False, splat_full=False, mesh=True,
+                  pano=True, thumbnail=False, filename_prefix="", subfolder="worldlabs"):
+        """
+        Download all selected assets concurrently through the asset cache, so wall
+        time is bounded by the largest asset rather than the sum of all of them
+        """
+        selected = {
+            "splat_100k": splat_100k,
+            "splat_500k": splat_500k,
+            "splat_full": splat_full,
+            "mesh": mesh,
+            "pano": pano,
+            "thumbnail": thumbnail,
+        }
+        world = WorldData.coerce(world_data)
+        urls = world.asset_urls
+
+        output_dir = get_output_directory()
+        if subfolder:
+            output_dir = os.path.join(output_dir, subfolder)
+        os.makedirs(output_dir, exist_ok=True)
+
+        prefix = filename_prefix.strip() or world.world_id
+
+        # Start every transfer up front; the cache's bounded pool runs them concurrently
+        cache = get_asset_cache()
+        futures = {}
+        for name in self.ASSET_NAMES:
+            if not selected[name]:
+                continue
+            if name not in urls:
+                print(f"[WorldLabs] Warning: No {name} asset available for this world")
+                continue
+            futures[name] = cache.fetch(urls[name])
+
+        print(f"[WorldLabs] Fetching {len(futures)} assets concurrently: {', '.join(futures)}")
+        start_time = time.time()
+
+        progress = Progress(len(futures))
+        manifest = []
+        for name, future in futures.items():
+            file_path = os.path.join(output_dir, f"{prefix}_{name}{guess_asset_extension(urls[name])}")
+            copy_from_cache(wait_for(future), file_path)
+            progress.update(len(manifest) + 1)
+            manifest.append({
+                "asset": name,
+                "url": urls[name],
+                "path": file_path,
+                "size": os.path.getsize(file_path),
+                "sha256": file_sha256(file_path),
+            })
+            print(f"[WorldLabs] ✓ {name}: {file_path}")
+
+        get_catalog().add_asset_paths(world.world_id, {entry["asset"]: entry["path"] for entry in manifest})
+
+        manifest_path = os.path.join(output_dir, f"{prefix}_manifest.json")
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+        total_size = sum(entry["size"] for entry in manifest)
+        print(
+            f"[WorldLabs] ✓ Fetched {len(manifest)} assets ({total_size} bytes) "
+            f"in {time.time() - start_time:.1f}s"
+        )
+        print(f"[WorldLabs] Manifest: {manifest_path}")
+
+        return (json.dumps(manifest, indent=2), output_dir)
+
+
+class WorldLabsSimplifyMesh:
+    """
+    Node to simplify a world's collider mesh and export a compact, quantized GLB
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "target_triangles": ("INT", {
+                    "default": 50000,
+                    "min": 100,
+                    "max": 10000000,
+                    "step": 100
+                }),
+                "quantize": ("BOOLEAN", {
+                    "default": True
+                }),
+            },
+            "optional": {
+                "world_data": ("WORLDLABS_WORLD",),
+                "mesh": ("WORLDLABS_MESH",),
+                "mesh_path": ("STRING", {
+                    "default": "",
+                    "multiline": False,
+                    "placeholder": "Local .glb to simplify instead of the world's collider mesh"
+                }),
+                "filename_prefix": ("STRING", {
+                    "default": "",
+                    "multiline": False,
+                    "placeholder": "Defaults to the world ID or mesh file name"
+                }),
+                "subfolder": ("STRING", {
+                    "default": "worldlabs",
+                    "multiline": False
+                }),
+                "write_viewer": ("BOOLEAN", {
+                    "default": False
+                }),
+            }
+        }
+
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("glb_path", "stats_json")
+    FUNCTION = "simplify_mesh"
+    OUTPUT_NODE = True
+    CATEGORY = "WorldLabs"
+
+    def simplify_mesh(self, target_triangles, quantize, world_data=None, mesh=None, mesh_path="", filename_prefix="",
+                      subfolder="worldlabs", write_viewer=False):
+        """Simplify to at most target_triangles and write a GLB (16-bit positions when quantize is on)"""
+        world = WorldData.coerce(world_data) if world_data is not None else None
+        mesh_path = mesh_path.strip()
+        source_path = None
+
+        if mesh is not None:
+            default_prefix = "mesh"
+        elif mesh_path:
+            source_path = mesh_path
+            default_prefix = os.path.splitext(os.path.basename(mesh_path))[0]
+        elif world is not None:
+            mesh_url = world.asset_url("mesh")
+            if not mesh_url:
+                raise ValueError(f"World {world.world_id} has no collider mesh asset")
+            print("[WorldLabs] Downloading collider mesh...")
+            source_path = wait_for(get_asset_cache().fetch(mesh_url))
+            default_prefix = world.world_id
+        else:
+            raise ValueError("Connect world_data or mesh, or set mesh_path")
+
+        start_time = time.time()
+        if mesh is None:
+            with open(source_path, "rb") as f:
+                mesh = read_glb(f.read())
+
+        simplified, resolution = simplify(mesh, target_triangles)
+        glb = write_glb(simplified, quantize=quantize)
+
+        output_dir = get_output_directory()
+        if subfolder:
+            output_dir = os.path.join(output_dir, subfolder)
+        os.makedirs(output_dir, exist_ok=True)
+
+        prefix = filename_prefix.strip() or default_prefix
+        glb_path = os.path.join(output_dir, f"{prefix}_collider_{simplified.triangle_count}.glb")
+        with open(glb_path, "wb") as f:
+            f.write(glb)
+
+        stats = {
+            "source": source_path,
+            "input_triangles": mesh.triangle_count,
+            "input_vertices": mesh.vertex_count,
+            "output_triangles": simplified.triangle_count,
+            "output_vertices": simplified.vertex_count,
+            "grid_resolution": resolution,
+            "quantized": quantize,
+            "input_bytes": os.path.getsize(source_path) if source_path else None,
+            "output_bytes": len(glb),
+            "seconds": round(time.time() - start_time, 2),
+        }
+        print(
+            f"[WorldLabs] ✓ Mesh simplified: {mesh.triangle_count} -> {simplified.triangle_count} triangles, "
+            f"{stats['output_bytes']} bytes in {stats['seconds']}s"
+        )
+        print(f"[WorldLabs] Saved to: {glb_path}")
+
+        if world is not None:
+            get_catalog().add_asset_paths(world.world_id, {f"mesh_{simplified.triangle_count}": glb_path})
+
+            if write_viewer:
+                viewer = WorldLabsViewer()
+                html_path = viewer.get_viewer_path(world, f"mesh_{simplified.triangle_count}")
+                mesh_url = os.path.relpath(glb_path, os.path.dirname(html_path)).replace(os.sep, "/")
+                with open(html_path, "w", encoding="utf-8") as f:
+                    f.write(viewer.create_mesh_viewer_html(mesh_url, world.display_name or "World Labs 3D World"))
+                print(f"[WorldLabs] Mesh viewer saved to: {html_path}")
+
+        return (glb_path, json.dumps(stats, indent=2))
+
+
+class WorldLabsVoxelizeMesh:
+    """
+    Node to turn a collider mesh into voxel occupancy grids and signed distance fields
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "resolutions": ("STRING", {
+                    "default": "128",
+                    "multiline": False,
+                    "placeholder": "Voxels along the longest axis, e.g. 64, 128, 256"
+                }),
+                "fill_interior": ("BOOLEAN", {
+                    "default": False
+                }),
+            },
+            "optional": {
+                "world_data": ("WORLDLABS_WORLD",),
+                "mesh_path": ("STRING", {
+                    "default": "",
+                    "multiline": False,
+                    "placeholder": "Local .glb to voxelize instead of the world's collider mesh"
+                }),
+            }
+        }
+
+    RETURN_TYPES = ("WORLDLABS_VOXELS", "STRING")
+    RETURN_NAMES = ("voxels", "info_json")
+    FUNCTION = "voxelize_mesh"
+    CATEGORY = "WorldLabs"
+
+    def voxelize_mesh(self, resolutions, fill_interior, world_data=None, mesh_path=""):
+        """
+        Voxelize at every resolution (missing ones in parallel processes) and
+        return the finest grid memory-mapped from its .npy cache
+        """
+        resolutions = parse_resolutions(resolutions)
+        world = WorldData.coerce(world_data) if world_data is not None else None
+        mesh_path = mesh_path.strip()
+
+        if not mesh_path:
+            if world is None:
+                raise ValueError("Connect world_data or set mesh_path")
+            mesh_url = world.asset_url("mesh")
+            if not mesh_url:
+                raise ValueError(f"World {world.world_id} has no collider mesh asset")
+            print("[WorldLabs] Downloading collider mesh...")
+            mesh_path = wait_for(get_asset_cache().fetch(mesh_url))
+
+        start_time = time.time()
+        summaries = build_voxel_caches(mesh_path, resolutions, fill_interior)
+        built = [summary["resolution"] for summary in summaries if not summary["cached"]]
+        print(
+            f"[WorldLabs] ✓ Voxel grids ready at {', '.join(str(r) for r in resolutions)} "
+            f"({len(built)} built) in {time.time() - start_time:.1f}s"
+        )
+
+        if world is not None:
+            get_catalog().add_asset_paths(world.world_id, {
+                f"sdf_{summary['resolution']}": summary["sdf_path"] for summary in summaries
+            })
+
+        voxels = load_voxel_cache(mesh_path, max(resolutions), fill_interior)
+        return (voxels, json.dumps({"source": mesh_path, "grids": summaries}, indent=2))
+
+
+class WorldLabsLoadMesh:
+    """
+    Node to decode a world's collider mesh (or a local .glb) for local processing
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {},
+            "optional": {
+                "world_data": ("WORLDLABS_WORLD",),
+                "mesh_path": ("STRING", {
+                    "default": "",
+                    "multiline": False,
+                    "placeholder": "Local .glb to load instead of the world's collider mesh"
+                }),
+            }
+        }
+
+    RETURN_TYPES = ("WORLDLABS_MESH", "STRING")
+    RETURN_NAMES = ("mesh", "info")
+    FUNCTION = "load_mesh"
+    CATEGORY = "WorldLabs"
+
+    def load_mesh(self, world_data=None, mesh_path=""):
+        """Decode a collider mesh from a local file or the world's mesh asset"""
+        mesh_path = mesh_path.strip()
+        if not mesh_path:
+            if world_data is None:
+                raise ValueError("Connect world_data or set mesh_path")
+            world = WorldData.coerce(world_data)
+            mesh_url = world.asset_url("mesh")
+            if not mesh_url:
+                raise ValueError(f"World {world.world_id} has no collider mesh asset")
+            print("[WorldLabs] Downloading collider mesh...")
+            mesh_path = wait_for(get_asset_cache().fetch(mesh_url))
+
+        with open(mesh_path, "rb") as f:
+            mesh = read_glb(f.read())
+        info = f"{mesh.triangle_count} triangles, {mesh.vertex_count} vertices"
+        print(f"[WorldLabs] Loaded {info} from {mesh_path}")
+
+        return (mesh, info)
+
+
+class WorldLabsLoadSplat:
+    """
+    Node to decode a world's splats (or a local .spz/.ply) for local processing
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {},
+            "optional": {
+                "world_data": ("WORLDLABS_WORLD",),
+                "quality": ([
+                    "100k",
+                    "500k",
+                    "full_res"
+                ], {
+                    "default": "100k"
+                }),
+                "splat_path": ("STRING", {
+                    "default": "",
+                    "multiline": False,
+                    "placeholder": "Local .spz or .ply to load instead of the world's splats"
+                }),
+            }
+        }
+
+    RETURN_TYPES = ("WORLDLABS_SPLAT", "STRING")
+    RETURN_NAMES = ("splats", "info")
+    FUNCTION = "load_splat"
+    CATEGORY = "WorldLabs"
+
+    def load_splat(self, world_data=None, quality="100k", splat_path=""):
+        """Decode splats from a local file or the world's splat at the given quality"""
+        splat_path = splat_path.strip()
+        if not splat_path:
+            if world_data is None:
+                raise ValueError("Connect world_data or set splat_path")
+            world = WorldData.coerce(world_data)
+            splat_url = world.splat_url(quality)
+            if not splat_url:
+                raise ValueError(f"World {world.world_id} has no {quality} splat asset")
+            print(f"[WorldLabs] Downloading {quality} splats...")
+            splat_path = wait_for(get_asset_cache().fetch(splat_url))
+
+        splats = load_splats(splat_path)
+        info = f"{splats.count} splats, SH degree {splats.sh_degree}"
+        print(f"[WorldLabs] Loaded {info} from {splat_path}")
+
+        return (splats, info)
+
+
+class WorldLabsSaveSplat:
+    """
+    Node to write splats as compact SPZ (or float PLY) with tunable precision
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "splats": ("WORLDLABS_SPLAT",),
+                "file_format": ([
+                    "spz",
+                    "ply"
+                ], {
+                    "default": "spz"
+                }),
+                "fractional_bits": ("INT", {
+                    "default": DEFAULT_FRACTIONAL_BITS,
+                    "min": 4,
+                    "max": 23,
+                    "step": 1
+                }),
+                "rotation_bits": ([
+                    "8",
+                    "10"
+                ], {
+                    "default": "8"
+                }),
+                "sh_degree": ("INT", {
+                    "default": 3,
+                    "min": 0,
+                    "max": 3,
+                    "step": 1
+                }),
+            },
+            "optional": {
+                "filename_prefix": ("STRING", {
+                    "default": "splats",
+                    "multiline": False
+                }),
+                "subfolder": ("STRING", {
+                    "default": "worldlabs",
+                    "multiline": False
+                }),
+            }
+        }
+
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("file_path", "stats_json")
+    FUNCTION = "save_splat"
+    OUTPUT_NODE = True
+    CATEGORY = "WorldLabs"
+
+    def save_splat(self, splats, file_format, fractional_bits, rotation_bits, sh_degree, filename_prefix="splats",
+                   subfolder="worldlabs"):
+        """
+        Encode and write splats. SPZ positions are 24-bit fixed point with
+        fractional_bits of precision; 8-bit rotations write SPZ v2, 10-bit
+        rotations write SPZ v3 (smallest-three quaternions)
+        """
+        output_dir = get_output_directory()
+        if subfolder:
+            output_dir = os.path.join(output_dir, subfolder)
+        os.makedirs(output_dir, exist_ok=True)
+
+        file_path = os.path.join(output_dir, f"{filename_prefix.strip() or 'splats'}.{file_format}")
+        part_path = file_path + ".part"
+        start_time = time.time()
+
+        stats = {"count": splats.count, "format": file_format}
+        try:
+            with open(part_path, "wb") as f:
+                if file_format == "spz":
+                    fractional_bits, sh_degree, version = write_spz(
+                        splats, f, fractional_bits=fractional_bits, rotation_bits=int(rotation_bits),
+                        sh_degree=sh_degree
+                    )
+                    stats.update(version=version, fractional_bits=fractional_bits, sh_degree=sh_degree,
+                                 rotation_bits=int(rotation_bits))
+                else:
+                    splats = splats.truncate_sh(sh_degree)
+                    write_ply(splats, f)
+                    stats.update(sh_degree=splats.sh_degree)
+            os.replace(part_path, file_path)
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+
+        stats["bytes"] = os.path.getsize(file_path)
+        stats["seconds"] = round(time.time() - start_time, 2)
+        print(
+            f"[WorldLabs] ✓ Saved {splats.count} splats ({stats['bytes']} bytes) "
+            f"in {stats['seconds']}s: {file_path}"
+        )
+
+        return (file_path, json.dumps(stats, indent=2))
+
+
+class WorldLabsComposeWorlds:
+    """
+    Node to place several worlds' splats and collider meshes into one scene
+    """
+
+    SLOTS = 4
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        optional = {}
+        for index in range(1, cls.SLOTS + 1):
+            optional[f"splats_{index}"] = ("WORLDLABS_SPLAT",)
+            optional[f"mesh_{index}"] = ("WORLDLABS_MESH",)
+            optional[f"transform_{index}"] = ("STRING", {
+                "default": "",
+                "multiline": False,
+                "placeholder": '{"translate": [0, 0, 0], "rotate": [0, 0, 0], "scale": 1}'
+            })
+
+        return {
+            "required": {
+                "dedupe_voxel_size": ("FLOAT", {
+                    "default": 0.0,
+                    "min": 0.0,
+                    "max": 10.0,
+                    "step": 0.01
+                }),
+            },
+            "optional": optional,
+        }
+
+    RETURN_TYPES = ("WORLDLABS_SPLAT", "WORLDLABS_MESH", "STRING")
+    RETURN_NAMES = ("splats", "mesh", "stats_json")
+    FUNCTION = "compose_worlds"
+    CATEGORY = "WorldLabs"
+
+    def compose_worlds(self, dedupe_voxel_size=0.0, **slots):
+        """
+        Transform every connected slot (transform_N applies to splats_N and
+        mesh_N) and merge them. With dedupe_voxel_size > 0, later slots drop
+        content in voxels already covered by earlier slots.
+        """
+        splat_items = []
+        mesh_items = []
+        for index in range(1, self.SLOTS + 1):
+            splats = slots.get(f"splats_{index}")
+            mesh = slots.get(f"mesh_{index}")
+            if splats is None and mesh is None:
+                continue
+            transform = Transform.parse(slots.get(f"transform_{index}", ""))
+            if splats is not None:
+                splat_items.append((splats, transform))
+            if mesh is not None:
+                mesh_items.append((mesh, transform))
+
+        if not splat_items and not mesh_items:
+            raise ValueError("Connect at least one splats_N or mesh_N input")
+
+        start_time = time.time()
+        stats = {"dedupe_voxel_size": dedupe_voxel_size}
+
+        composed_splats = None
+        if splat_items:
+            composed_splats = compose_splats(splat_items, dedupe_voxel_size)
+            stats.update(input_splats=sum(splats.count for splats, _ in splat_items),
+                         output_splats=composed_splats.count)
+
+        composed_mesh = None
+        if mesh_items:
+            composed_mesh = compose_meshes(mesh_items, dedupe_voxel_size)
+            stats.update(input_triangles=sum(mesh.triangle_count for mesh, _ in mesh_items),
+                         output_triangles=composed_mesh.triangle_count)
+
+        stats["seconds"] = round(time.time() - start_time, 2)
+        print(
+            f"[WorldLabs] ✓ Composed {len(splat_items)} splat sets and {len(mesh_items)} meshes "
+            f"in {stats['seconds']}s"
+        )
+
+        return (composed_splats, composed_mesh, json.dumps(stats, indent=2))
+
+
+class WorldLabsLoadWorld:
+    """
+    Node to load a previously generated world from the local catalog
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "world": ("STRING", {
+                    "default": "",
+                    "multiline": False,
+                    "placeholder": "World ID or display name"
+                }),
+            },
+            "optional": {
+                "api_key": ("STRING", {
+                    "default": "",
+                    "multiline": False
+                }),
+                "refresh": ("BOOLEAN", {
+                    "default": False
+                }),
+            }
+        }
+
+    RETURN_TYPES = ("WORLDLABS_WORLD", "STRING", "STRING", "IMAGE")
+    RETURN_NAMES = ("world_data", "world_id", "marble_url", "thumbnail")
+    FUNCTION = "load_world"
+    CATEGORY = "WorldLabs"
+
+    def get_api_key(self, api_key=""):
+        """Get API key from input or environment variable"""
+        if api_key and api_key.strip():
+            return api_key.strip()
+
+        env_key = os.getenv("WORLDLABS_API_KEY", "")
+        if not env_key:
+            raise ValueError(
+                "World not found in the local catalog and no API key to fetch it. Either:\n"
+                "1. Connect from WorldLabsAPIKey node, OR\n"
+                "2. Enter API key in this node, OR\n"
+                "3. Set WORLDLABS_API_KEY environment variable"
+            )
+
+        return env_key
+
+    def fetch_world(self, api_key, world_id):
+        """Fetch a world by ID from the API"""
+        url = f"{BASE_URL}/worlds/{quote(world_id, safe='')}"
+        headers = {
+            "WLT-Api-Key": api_key
+        }
+
+        print(f"[WorldLabs] Fetching world {world_id} from the API...")
+        response = get_rate_limiter().request("operations", "GET", url, headers=headers)
+
+        if response.status_code != 200:
+            raise Exception(f"Failed to fetch world: {response.status_code} - {response.text}")
+
+        data = response.json()
+        return WorldData.from_response(data.get("world", data))
+
+    def load_world(self, world, api_key="", refresh=False):
+        """Resolve a world from the catalog, falling back to one API fetch that is then cached"""
+        world_ref = world.strip()
+        if not world_ref:
+            raise ValueError("World ID or name is empty")
+
+        catalog = get_catalog()
+        found = catalog.get(world_ref)
+
+        if found is not None and not refresh:
+            world_data, entry = found
+            print(f"[WorldLabs] Loaded world {world_data.world_id} ({world_data.display_name}) from catalog")
+        else:
+            # Only IDs can be fetched; a name must resolve through the catalog first
+            if found is not None:
+                world_id = found[0].world_id
+            elif looks_like_world_id(world_ref):
+                world_id = world_ref
+            else:
+                raise ValueError(f"No world named '{world_ref}' in catalog")
+            world_data = self.fetch_world(self.get_api_key(api_key), world_id)
+            catalog.record_world(world_data, source="api")
+            entry = {"thumbnail_path": ""}
+
+        helper = WorldLabsGenerateWorld()
+        thumbnail_path = entry["thumbnail_path"]
+        if thumbnail_path and os.path.exists(thumbnail_path):
+            with open(thumbnail_path, "rb") as f:
+                thumbnail = helper.convert_bytes_to_image(f.read())
+        elif world_data.asset_url("thumbnail"):
+            future = get_asset_cache().fetch(world_data.asset_url("thumbnail"))
+            thumbnail = helper.load_cached_thumbnail(future)
+            if future.exception() is None:
+                catalog.set_thumbnail_path(world_data.world_id, future.result())
+        else:
+            # Create blank thumbnail
+            blank = np.zeros((256, 256, 3), dtype=np.float32)
+            thumbnail = np.expand_dims(blank, axis=0)
+
+        return (world_data, world_data.world_id, world_data.marble_url, thumbnail)
+
+
+class WorldLabsSearchWorlds:
+    """
+    Node to search the local world catalog
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {},
+            "optional": {
+                "name_contains": ("STRING", {
+                    "default": "",
+                    "multiline": False
+                }),
+                "model": ([
+                    "any",
+                    "Marble 0.1-plus",
+                    "Marble 0.1-mini"
+                ], {
+                    "default": "any"
+                }),
+                "days": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 3650,
+                    "step": 1
+                }),
+                "limit": ("INT", {
+                    "default": 20,
+                    "min": 1,
+                    "max": 1000,
+                    "step": 1
+                }),
+            }
+        }
+
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("results_json", "latest_world_id")
+    FUNCTION = "search"
+    OUTPUT_NODE = True
+    CATEGORY = "WorldLabs"
+
+    @classmethod
+    def IS_CHANGED(cls, **kwargs):
+        # The catalog grows as worlds are generated, always re-execute
+        return float("nan")
+
+    def search(self, name_contains="", model="any", days=0, limit=20):
+        """Search the catalog by display name, model and age (days=0 means any age)"""
+        since = time.time() - days * 86400 if days > 0 else None
+        results = get_catalog().search(
+            name_contains=name_contains.strip(),
+            model="" if model == "any" else model,
+            since=since,
+            limit=limit,
+        )
+
+        print(f"\n[WorldLabs] Catalog: {len(results)} worlds")
+        print("=" * 60)
+        for entry in results:
+            created = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["created_at"]))
+            print(f"  {entry['world_id']}  {created}  {entry['model']:<16} {entry['display_name']}")
+        print("=" * 60 + "\n")
+
+        latest = results[0]["world_id"] if results else ""
+        return (json.dumps(results, indent=2), latest)
+
+
+class WorldLabsSelectKeyframes:
+    """
+    Node to pick distinct keyframes from a video IMAGE batch so near-identical
+    frames don't each cost a generation
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "images": ("IMAGE",),
+                "threshold": ("INT", {
+                    "default": 10,
+                    "min": 0,
+                    "max": 64,
+                    "step": 1
+                }),
+            },
+            "optional": {
+                "match_against": ([
+                    "any keyframe",
+                    "previous keyframe"
+                ], {
+                    "default": "any keyframe"
+                }),
+            }
+        }
+
+    RETURN_TYPES = ("IMAGE", "STRING", "INT")
+    RETURN_NAMES = ("keyframes", "keyframe_map", "keyframe_count")
+    # Each keyframe is a separate list item, so Generate World runs once per keyframe
+    OUTPUT_IS_LIST = (True, False, False)
+    FUNCTION = "pick_keyframes"
+    CATEGORY = "WorldLabs"
+
+    def pick_keyframes(self, images, threshold, match_against="any keyframe"):
+        """
+        Hash every frame and keep a frame only if it differs from the existing
+        keyframes by more than threshold bits (of 64)
+        """
+        start_time = time.time()
+        hashes = perceptual_hashes(images)
+        keyframes, assignment, distances = select_keyframes(
+            hashes, threshold, match_previous_only=(match_against == "previous keyframe")
+        )
+        elapsed = max(time.time() - start_time, 1e-6)
+
+        keyframe_map = {
+            "frame_count": len(hashes),
+            "threshold": threshold,
+            "keyframes": keyframes,
+            "frame_to_keyframe": assignment.tolist(),
+            "distances": distances.tolist(),
+            "hashes": [format_hash(value) for value in hashes],
+        }
+
+        print(
+            f"[WorldLabs] Selected {len(keyframes)} keyframes from {len(hashes)} frames "
+            f"({len(hashes) / elapsed:.0f} frames/s)"
+        )
+
+        return ([images[index:index + 1] for index in keyframes], json.dumps(keyframe_map), len(keyframes))
+
+
+class WorldLabsMapFramesToWorlds:
+    """
+    Node to map every input frame to the world generated for its keyframe
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "world_data": ("WORLDLABS_WORLD",),
+                "keyframe_map": ("STRING", {
+                    "forceInput": True
+                }),
+            }
+        }
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("frame_worlds_json",)
+    # Collects the per-keyframe worlds produced by Generate World
+    INPUT_IS_LIST = True
+    FUNCTION = "map_frames"
+    OUTPUT_NODE = True
+    CATEGORY = "WorldLabs"
+
+    def map_frames(self, world_data, keyframe_map):
+        """Return one {frame, keyframe, world_id, marble_url, distance} entry per frame"""
+        keyframe_map = json.loads(keyframe_map[0])
+        worlds = [WorldData.coerce(world) for world in world_data]
+
+        if len(worlds) != len(keyframe_map["keyframes"]):
+            raise ValueError(
+                f"Expected {len(keyframe_map['keyframes'])} worlds (one per keyframe), got {len(worlds)}"
+            )
+
+        frame_worlds = []
+        for frame, (ordinal, distance) in enumerate(
+                zip(keyframe_map["frame_to_keyframe"], keyframe_map["distances"])):
+            world = worlds[ordinal]
+            frame_worlds.append({
+                "frame": frame,
+                "keyframe": keyframe_map["keyframes"][ordinal],
+                "world_id": world.world_id,
+                "marble_url": world.marble_url,
+                "distance": distance,
+            })
+
+        print(f"[WorldLabs] Mapped {len(frame_worlds)} frames to {len(worlds)} worlds")
+
+        return (json.dumps(frame_worlds, indent=2),)
+
+
+class WorldLabsRateLimitStatus:
+    """
+    Node to report client-side rate limiter metrics
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {},
+        }
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("metrics_json",)
+    FUNCTION = "get_status"
+    OUTPUT_NODE = True
+    CATEGORY = "WorldLabs"
+
+    @classmethod
+    def IS_CHANGED(cls):
+        # Metrics change continuously, always re-execute
+        return float("nan")
+
+    def get_status(self):
+        """Return limiter queue depth, wait times and throttling counts as JSON"""
+        metrics = get_rate_limiter().get_metrics()
+        metrics["generations"] = get_scheduler().get_counts()
+
+        print("\n[WorldLabs] Rate Limiter:")
+        print("=" * 60)
+        generations = metrics["generations"]
+        print(
+            f"  Generations: {generations['in_flight']}/{generations['max_concurrent']} in flight, "
+            f"{generations['queue_depth']} waiting"
+        )
+        for name, bucket in metrics["buckets"].items():
+            print(
+                f"  {name:<13} queue={bucket['queue_depth']} requests={bucket['requests']} "
+                f"throttled={bucket['throttled']} avg_wait={bucket['avg_wait_s']}s rate={bucket['rate']}/s"
+            )
+        print("=" * 60 + "\n")
+
+        return (json.dumps(metrics, indent=2),)
+
+
+class WorldLabsQueueStatus:
+    """
+    Node to report generation queue positions and ETAs
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {},
+            "optional": {
+                "job_id": ("STRING", {
+                    "default": "",
+                    "multiline": False,
+                    "placeholder": "Leave empty to list all active jobs"
+                }),
+            }
+        }
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("status_json",)
+    FUNCTION = "get_status"
+    OUTPUT_NODE = True
+    CATEGORY = "WorldLabs"
+
+    @classmethod
+    def IS_CHANGED(cls, job_id=""):
+        # Queue state changes continuously, always re-execute
+        return float("nan")
+
+    def get_status(self, job_id=""):
+        """Return active jobs (or a single job) with queue position and ETA as JSON"""
+        scheduler = get_scheduler()
+
+        if job_id and job_id.strip():
+            status = scheduler.get_job_status(job_id.strip())
+            if status is None:
+                raise ValueError(f"Unknown job ID: {job_id}")
+            jobs = [status]
+            result = status
+        else:
+            jobs = scheduler.get_status()
+            result = jobs
+
+        print("\n[WorldLabs] Generation Queue:")
+        print("=" * 60)
+        if not jobs:
+            print("  (empty)")
+        for job in jobs:
+            print(
+                f"  {job['job_id'][:8]} {job['status']:<8} pos={job['queue_position']} "
+                f"eta={int(job['eta_s'])}s owner={job['owner']} model={job['model']}"
+            )
+        print("=" * 60 + "\n")
+
+        return (json.dumps(result, indent=2),)
+
+
 # Node class mappings
 NODE_CLASS_MAPPINGS = {
     "WorldLabsAPIKey": WorldLabsAPIKey,
     "WorldLabsGenerateWorld": WorldLabsGenerateWorld,
     "WorldLabsWorldInfo": WorldLabsWorldInfo,
     "WorldLabsDownloadAsset": WorldLabsDownloadAsset,
+    "WorldLabsFetchAllAssets": WorldLabsFetchAllAssets,
+    "WorldLabsSimplifyMesh": WorldLabsSimplifyMesh,
+    "WorldLabsVoxelizeMesh": WorldLabsVoxelizeMesh,
+    "WorldLabsLoadMesh": WorldLabsLoadMesh,
+    "WorldLabsLoadSplat": WorldLabsLoadSplat,
+    "WorldLabsSaveSplat": WorldLabsSaveSplat,
+    "WorldLabsComposeWorlds": WorldLabsComposeWorlds,
+    "WorldLabsLoadWorld": WorldLabsLoadWorld,
+    "WorldLabsSearchWorlds": WorldLabsSearchWorlds,
+    "WorldLabsSelectKeyframes": WorldLabsSelectKeyframes,
+    "WorldLabsMapFramesToWorlds": WorldLabsMapFramesToWorlds,
+    "WorldLabsRateLimitStatus": WorldLabsRateLimitStatus,
+    "WorldLabsQueueStatus": WorldLabsQueueStatus,
 }
 
 # Display names
@@ -571,4 +1877,17 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "WorldLabsGenerateWorld": "Generate World (World Labs)",
     "WorldLabsWorldInfo": "World Info (World Labs)",
     "WorldLabsDownloadAsset": "Download Asset (World Labs)",
+    "WorldLabsFetchAllAssets": "Fetch All World Assets (World Labs)",
+    "WorldLabsSimplifyMesh": "Simplify Mesh (World Labs)",
+    "WorldLabsVoxelizeMesh": "Voxelize Mesh (World Labs)",
+    "WorldLabsLoadMesh": "Load Mesh (World Labs)",
+    "WorldLabsLoadSplat": "Load Splat (World Labs)",
+    "WorldLabsSaveSplat": "Save Splat (World Labs)",
+    "WorldLabsComposeWorlds": "Compose Worlds (World Labs)",
+    "WorldLabsLoadWorld": "Load World (World Labs)",
+    "WorldLabsSearchWorlds": "Search Worlds (World Labs)",
+    "WorldLabsSelectKeyframes": "Select Keyframes (World Labs)",
+    "WorldLabsMapFramesToWorlds": "Map Frames To Worlds (World Labs)",
+    "WorldLabsRateLimitStatus": "Rate Limit Status (World Labs)",
+    "WorldLabsQueueStatus": "Queue Status (World Labs)",
 }
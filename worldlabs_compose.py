@@ -0,0 +1,244 @@
+"""
+World Labs ComfyUI Nodes - Scene Composition
+Places several splat sets and meshes into one scene with vectorized transforms
+"""
+
+import json
+
+from .worldlabs_lazy import lazy_import
+from .worldlabs_mesh import MeshData, compact
+from .worldlabs_splat import SH_DIMENSIONS, SplatData
+
+np = lazy_import("numpy")
+
+
+# Real SH constants used by 3D Gaussian Splatting renderers (degrees 1-3)
+SH_C1 = 0.4886025119029199
+SH_C2 = (1.0925484305920792, -1.0925484305920792, 0.31539156525252005, -1.0925484305920792, 0.5462742152960396)
+SH_C3 = (-0.5900435899266435, 2.890611442640554, -0.4570457994644658, 0.3731763325901154,
+         -0.4570457994644658, 1.445305721320277, -0.5900435899266435)
+
+VOXEL_BIAS = 1 << 20  # voxel coordinates are packed as three 21-bit fields
+
+
+class Transform:
+    """Similarity transform: uniform scale, then rotation, then translation"""
+
+    __slots__ = ("translate", "rotation", "scale")
+
+    def __init__(self, translate=(0.0, 0.0, 0.0), rotate=(0.0, 0.0, 0.0), scale=1.0):
+        self.translate = np.asarray(translate, dtype=np.float64).reshape(3)
+        self.rotation = euler_to_matrix(rotate)
+        self.scale = float(scale)
+        if self.scale <= 0:
+            raise ValueError(f"Transform scale must be positive, got {scale}")
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Parse '{"translate": [x, y, z], "rotate": [rx, ry, rz], "scale": s}'
+        (rotation in degrees about X, then Y, then Z); empty means identity
+        """
+        text = (text or "").strip()
+        if not text:
+            return cls()
+
+        try:
+            values = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid transform JSON: {e}")
+        if not isinstance(values, dict):
+            raise ValueError("Transform must be a JSON object with translate, rotate and/or scale")
+
+        unknown = set(values) - {"translate", "rotate", "scale"}
+        if unknown:
+            raise ValueError(f"Unknown transform keys: {', '.join(sorted(unknown))} "
+                             f"(expected translate, rotate, scale)")
+
+        return cls(values.get("translate", (0, 0, 0)), values.get("rotate", (0, 0, 0)), values.get("scale", 1.0))
+
+    def apply_points(self, points):
+        return (points.astype(np.float64) @ (self.rotation * self.scale).T + self.translate).astype(np.float32)
+
+
+def euler_to_matrix(degrees):
+    rx, ry, rz = np.radians(np.asarray(degrees, dtype=np.float64).reshape(3))
+    cx, sx, cy, sy, cz, sz = np.cos(rx), np.sin(rx), np.cos(ry), np.sin(ry), np.cos(rz), np.sin(rz)
+    x = np.array([[1, 0, 0], [0, cx, -sx], [0, sx, cx]])
+    y = np.array([[cy, 0, sy], [0, 1, 0], [-sy, 0, cy]])
+    z = np.array([[cz, -sz, 0], [sz, cz, 0], [0, 0, 1]])
+    return z @ y @ x
+
+
+def matrix_to_quaternion(matrix):
+    """Rotation matrix -> unit quaternion (x, y, z, w)"""
+    m = matrix
+    trace = m[0, 0] + m[1, 1] + m[2, 2]
+    if trace > 0:
+        s = 2.0 * np.sqrt(trace + 1.0)
+        q = [(m[2, 1] - m[1, 2]) / s, (m[0, 2] - m[2, 0]) / s, (m[1, 0] - m[0, 1]) / s, 0.25 * s]
+    elif m[0, 0] > m[1, 1] and m[0, 0] > m[2, 2]:
+        s = 2.0 * np.sqrt(1.0 + m[0, 0] - m[1, 1] - m[2, 2])
+        q = [0.25 * s, (m[0, 1] + m[1, 0]) / s, (m[0, 2] + m[2, 0]) / s, (m[2, 1] - m[1, 2]) / s]
+    elif m[1, 1] > m[2, 2]:
+        s = 2.0 * np.sqrt(1.0 + m[1, 1] - m[0, 0] - m[2, 2])
+        q = [(m[0, 1] + m[1, 0]) / s, 0.25 * s, (m[1, 2] + m[2, 1]) / s, (m[0, 2] - m[2, 0]) / s]
+    else:
+        s = 2.0 * np.sqrt(1.0 + m[2, 2] - m[0, 0] - m[1, 1])
+        q = [(m[0, 2] + m[2, 0]) / s, (m[1, 2] + m[2, 1]) / s, 0.25 * s, (m[1, 0] - m[0, 1]) / s]
+    q = np.asarray(q)
+    return q / np.linalg.norm(q)
+
+
+def quaternion_multiply(a, b):
+    """Hamilton product a * b for a single quaternion a and an [N, 4] array b, both (x, y, z, w)"""
+    ax, ay, az, aw = a
+    bx, by, bz, bw = b[:, 0], b[:, 1], b[:, 2], b[:, 3]
+    return np.stack([
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+        aw * bw - ax * bx - ay * by - az * bz,
+    ], axis=1)
+
+
+def sh_basis(directions, degree):
+    """3DGS real SH basis functions of one degree at unit directions -> [K, 2 * degree + 1]"""
+    x, y, z = directions[:, 0], directions[:, 1], directions[:, 2]
+    xx, yy, zz = x * x, y * y, z * z
+    if degree == 1:
+        return np.stack([-SH_C1 * y, SH_C1 * z, -SH_C1 * x], axis=1)
+    if degree == 2:
+        return np.stack([
+            SH_C2[0] * x * y, SH_C2[1] * y * z, SH_C2[2] * (2 * zz - xx - yy),
+            SH_C2[3] * x * z, SH_C2[4] * (xx - yy),
+        ], axis=1)
+    return np.stack([
+        SH_C3[0] * y * (3 * xx - yy), SH_C3[1] * x * y * z, SH_C3[2] * y * (4 * zz - xx - yy),
+        SH_C3[3] * z * (2 * zz - 3 * xx - 3 * yy), SH_C3[4] * x * (4 * zz - xx - yy),
+        SH_C3[5] * z * (xx - yy), SH_C3[6] * x * (xx - 3 * yy),
+    ], axis=1)
+
+
+def sh_rotation_matrices(rotation, max_degree):
+    """
+    Per-degree matrices D_l with coefficients' = D_l @ coefficients for an
+    object rotated by rotation. Each degree's span is closed under rotation,
+    so the least-squares fit of Y(R^T d) against Y(d) over sample directions
+    is exact and follows the renderer's own basis and sign conventions.
+    """
+    samples = np.random.default_rng(0).normal(size=(64, 3))
+    samples /= np.linalg.norm(samples, axis=1, keepdims=True)
+    rotated = samples @ rotation  # rows are R^T d
+
+    matrices = []
+    for degree in range(1, max_degree + 1):
+        solution, *_ = np.linalg.lstsq(sh_basis(samples, degree), sh_basis(rotated, degree), rcond=None)
+        matrices.append(solution)
+    return matrices
+
+
+def voxel_keys(points, voxel_size):
+    coords = np.floor(points / voxel_size).astype(np.int64)
+    coords = np.clip(coords + VOXEL_BIAS, 0, (1 << 21) - 1)
+    return (coords[:, 0] << 42) | (coords[:, 1] << 21) | coords[:, 2]
+
+
+class VoxelDedupe:
+    """Drops points falling in voxels already occupied by earlier items"""
+
+    def __init__(self, voxel_size):
+        self.voxel_size = voxel_size
+        self.occupied = np.empty(0, dtype=np.int64)
+
+    def keep_mask(self, points):
+        keys = voxel_keys(points, self.voxel_size)
+        if len(self.occupied):
+            position = np.searchsorted(self.occupied, keys)
+            position = np.minimum(position, len(self.occupied) - 1)
+            keep = self.occupied[position] != keys
+        else:
+            keep = np.ones(len(keys), dtype=bool)
+
+        # Sort-based unique merge; keys kept here are never in occupied already
+        added = np.sort(keys[keep])
+        if len(added):
+            added = added[np.concatenate(([True], added[1:] != added[:-1]))]
+        merged = np.concatenate((self.occupied, added))
+        merged.sort()
+        self.occupied = merged
+        return keep
+
+
+def compose_splats(items, voxel_size=0.0):
+    """
+    Transform and concatenate [(SplatData, Transform)] into preallocated
+    output arrays. Covariances follow from rotating the quaternions and
+    offsetting the log scales; view-dependent color from rotating each SH
+    degree. With voxel_size > 0, splats of later items in voxels already
+    covered by earlier items are dropped.
+    """
+    total = sum(splats.count for splats, _ in items)
+    degree = max(splats.sh_degree for splats, _ in items)
+    dimensions = SH_DIMENSIONS[degree]
+
+    positions = np.empty((total, 3), dtype=np.float32)
+    scales = np.empty((total, 3), dtype=np.float32)
+    rotations = np.empty((total, 4), dtype=np.float32)
+    opacities = np.empty(total, dtype=np.float32)
+    colors = np.empty((total, 3), dtype=np.float32)
+    sh = np.zeros((total, dimensions, 3), dtype=np.float32)
+
+    dedupe = VoxelDedupe(voxel_size) if voxel_size > 0 else None
+    cursor = 0
+    for splats, transform in items:
+        moved = transform.apply_points(splats.positions)
+        keep = dedupe.keep_mask(moved) if dedupe else slice(None)
+        count = int(np.count_nonzero(keep)) if dedupe else splats.count
+        out = slice(cursor, cursor + count)
+
+        positions[out] = moved[keep]
+        scales[out] = splats.scales[keep] + np.float32(np.log(transform.scale))
+        rotations[out] = quaternion_multiply(matrix_to_quaternion(transform.rotation), splats.rotations[keep])
+        opacities[out] = splats.opacities[keep]
+        colors[out] = splats.colors[keep]
+
+        source_sh = splats.sh[keep]
+        for level, matrix in enumerate(sh_rotation_matrices(transform.rotation, splats.sh_degree), start=1):
+            block = slice(level * level - 1, (level + 1) * (level + 1) - 1)
+            sh[out, block] = np.matmul(matrix.astype(np.float32), source_sh[:, block])
+
+        cursor += count
+
+    return SplatData(positions[:cursor], scales[:cursor], rotations[:cursor], opacities[:cursor],
+                     colors[:cursor], sh[:cursor], antialiased=any(splats.antialiased for splats, _ in items))
+
+
+def compose_meshes(items, voxel_size=0.0):
+    """
+    Transform and concatenate [(MeshData, Transform)]; with voxel_size > 0,
+    triangles of later items whose centroid lands in a voxel already covered
+    by earlier items are dropped
+    """
+    total_vertices = sum(mesh.vertex_count for mesh, _ in items)
+    total_triangles = sum(mesh.triangle_count for mesh, _ in items)
+
+    positions = np.empty((total_vertices, 3), dtype=np.float32)
+    triangles = np.empty((total_triangles, 3), dtype=np.int64)
+
+    dedupe = VoxelDedupe(voxel_size) if voxel_size > 0 else None
+    vertex_cursor = 0
+    triangle_cursor = 0
+    for mesh, transform in items:
+        moved = transform.apply_points(mesh.positions)
+        faces = mesh.triangles
+        if dedupe:
+            faces = faces[dedupe.keep_mask(moved[faces].mean(axis=1))]
+
+        positions[vertex_cursor:vertex_cursor + len(moved)] = moved
+        triangles[triangle_cursor:triangle_cursor + len(faces)] = faces + vertex_cursor
+        vertex_cursor += len(moved)
+        triangle_cursor += len(faces)
+
+    positions, triangles = compact(positions, triangles[:triangle_cursor])
+    return MeshData(positions, triangles)
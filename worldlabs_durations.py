@@ -0,0 +1,157 @@
+"""
+World Labs ComfyUI Nodes - Generation Duration Model
+Records observed generation durations and derives poll timing from their percentiles
+"""
+
+import time
+import threading
+
+from .worldlabs_state import connect
+
+
+# Used until a class has MIN_SAMPLES observations: (first_poll, poll_interval, max_wait_time)
+DEFAULT_TIMINGS = {
+    "Marble 0.1-plus": (180, 15, 1200),
+    "Marble 0.1-mini": (30, 5, 300),
+}
+DEFAULT_TIMING = (60, 15, 600)
+
+MIN_SAMPLES = 5
+HISTORY_WINDOW = 200
+MIN_POLL_INTERVAL = 5
+MAX_POLL_INTERVAL = 60
+MIN_WAIT_TIME = 60
+TIMEOUT_MARGIN = 1.2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS generation_durations (
+    model TEXT NOT NULL,
+    is_panorama INTEGER NOT NULL,
+    resolution_class TEXT NOT NULL,
+    duration REAL NOT NULL,
+    recorded_at REAL NOT NULL,
+    timed_out INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS generation_durations_class
+    ON generation_durations (model, is_panorama, resolution_class, recorded_at);
+"""
+
+
+def resolution_class(width, height):
+    """Bucket an input resolution by megapixels"""
+    megapixels = (width * height) / 1_000_000
+    if megapixels <= 1.0:
+        return "<=1MP"
+    if megapixels <= 4.0:
+        return "<=4MP"
+    if megapixels <= 16.0:
+        return "<=16MP"
+    return ">16MP"
+
+
+def percentile(sorted_values, q):
+    """Linearly interpolated percentile of an ascending list, q in [0, 1]"""
+    if not sorted_values:
+        raise ValueError("percentile of empty sequence")
+
+    position = (len(sorted_values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+class DurationStore:
+    """
+    Local store of generation durations keyed by model, panorama flag and input resolution.
+    Lookups fall back from the exact class to (model, panorama) and then to the model alone.
+
+    Generations that hit their timeout are recorded too, as censored samples:
+    the true duration is at least the time waited. Percentiles treat them as
+    that lower bound, so slow classes push the derived timeout up instead of
+    being dropped and leaving it biased low.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.conn = connect()
+        self.conn.executescript(SCHEMA)
+
+        # Tables created before timeouts were recorded lack the column
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(generation_durations)")}
+        if "timed_out" not in columns:
+            self.conn.execute(
+                "ALTER TABLE generation_durations ADD COLUMN timed_out INTEGER NOT NULL DEFAULT 0"
+            )
+
+    def record(self, model, is_panorama, width, height, duration, timed_out=False):
+        """
+        Record one generation: seconds from start_generation to done, or with
+        timed_out=True the seconds waited before giving up (a lower bound)
+        """
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO generation_durations "
+                "(model, is_panorama, resolution_class, duration, recorded_at, timed_out) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (model, int(bool(is_panorama)), resolution_class(width, height), float(duration), time.time(),
+                 int(bool(timed_out)))
+            )
+
+    def get_durations(self, model, is_panorama, width, height):
+        """
+        Recent durations (ascending) for the most specific class with enough
+        samples; timed-out generations count at the time they were waited for
+        """
+        queries = [
+            ("model = ? AND is_panorama = ? AND resolution_class = ?",
+             (model, int(bool(is_panorama)), resolution_class(width, height))),
+            ("model = ? AND is_panorama = ?", (model, int(bool(is_panorama)))),
+            ("model = ?", (model,)),
+        ]
+
+        with self.lock:
+            for where, params in queries:
+                rows = self.conn.execute(
+                    f"SELECT duration FROM generation_durations WHERE {where} "
+                    f"ORDER BY recorded_at DESC LIMIT ?",
+                    params + (HISTORY_WINDOW,)
+                ).fetchall()
+                if len(rows) >= MIN_SAMPLES:
+                    return sorted(row[0] for row in rows)
+
+        return []
+
+    def get_timing(self, model, is_panorama, width, height, timeout_percentile=0.95):
+        """
+        Derive (first_poll, poll_interval, max_wait_time) in seconds.
+        The first poll lands just before the fastest typical completion (p10),
+        polls then spread the p10-p90 window over ~8 checks, and the timeout is
+        the chosen percentile plus a safety margin.
+        """
+        durations = self.get_durations(model, is_panorama, width, height)
+        if not durations:
+            return DEFAULT_TIMINGS.get(model, DEFAULT_TIMING)
+
+        p10 = percentile(durations, 0.10)
+        p90 = percentile(durations, 0.90)
+        p_timeout = percentile(durations, min(max(timeout_percentile, 0.0), 1.0))
+
+        first_poll = max(MIN_POLL_INTERVAL, int(p10 * 0.9))
+        poll_interval = int(min(MAX_POLL_INTERVAL, max(MIN_POLL_INTERVAL, (p90 - p10) / 8)))
+        max_wait_time = max(MIN_WAIT_TIME, int(p_timeout * TIMEOUT_MARGIN), first_poll + poll_interval)
+
+        return first_poll, poll_interval, max_wait_time
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_duration_store():
+    """Process-wide duration store, created on first use"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = DurationStore()
+        return _store
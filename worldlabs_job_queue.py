@@ -0,0 +1,371 @@
+"""
+World Labs ComfyUI Nodes - Generation Job Scheduler
+Persistent priority queue with fair share across owners and a bounded worker pool
+
+The worker pool is the process-wide cap on concurrent generations. Fair share
+only decides between jobs queued at the same time, i.e. when several threads
+submit generations (the batch runner, scripts calling the node directly).
+ComfyUI executes one prompt at a time and a Generate World node waits for its
+own job, so there the queue never holds more than one ComfyUI job.
+"""
+
+import time
+import uuid
+import heapq
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .worldlabs_state import connect, env_int
+from .worldlabs_progress import OperationCancelled, is_cancellation
+
+
+# Fallback durations (seconds) used for ETAs until a model has history
+DEFAULT_MODEL_DURATIONS = {
+    "Marble 0.1-plus": 300.0,
+    "Marble 0.1-mini": 45.0,
+}
+DEFAULT_DURATION = 120.0
+HISTORY_WINDOW = 50
+
+DEFAULT_WORKERS = 4
+DEFAULT_PER_OWNER_LIMIT = 2
+# Finished jobs older than this are deleted, except each model's recent successes used for ETAs
+DEFAULT_HISTORY_DAYS = 30
+PRUNE_EVERY = 100  # finished jobs between prunes
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    model TEXT NOT NULL,
+    display_name TEXT,
+    status TEXT NOT NULL,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    world_id TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+CREATE INDEX IF NOT EXISTS jobs_model_finished ON jobs (model, status, finished_at);
+"""
+
+
+class JobScheduler:
+    """
+    In-process scheduler for generation jobs.
+    Jobs are persisted to SQLite so queue state and historical durations survive
+    restarts; the callables themselves live in memory, so jobs left queued or
+    running by a previous process are marked "abandoned" on startup.
+
+    Dispatch order: highest priority first, then the owner with the fewest
+    running jobs (fair share), then the owner served least recently, then FIFO.
+    """
+
+    def __init__(self, max_workers=DEFAULT_WORKERS, per_owner_limit=DEFAULT_PER_OWNER_LIMIT,
+                 history_days=DEFAULT_HISTORY_DAYS):
+        self.max_workers = max_workers
+        self.per_owner_limit = per_owner_limit
+        self.history_days = history_days
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="worldlabs-job")
+        self.lock = threading.RLock()
+        self.conn = connect()
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(
+            "UPDATE jobs SET status = 'abandoned', finished_at = ? WHERE status IN ('queued', 'running')",
+            (time.time(),)
+        )
+        self.prune()
+
+        # In-memory view of active jobs: job_id -> dict
+        self.jobs = {}
+        self.running_by_owner = {}
+        self.last_dispatch_by_owner = {}
+        self.finished_since_prune = 0
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build a scheduler using WORLDLABS_MAX_CONCURRENT_GENERATIONS /
+        WORLDLABS_SCHEDULER_PER_OWNER / WORLDLABS_JOB_HISTORY_DAYS overrides
+        """
+        return cls(
+            max_workers=env_int("WORLDLABS_MAX_CONCURRENT_GENERATIONS", DEFAULT_WORKERS, 1),
+            per_owner_limit=env_int("WORLDLABS_SCHEDULER_PER_OWNER", DEFAULT_PER_OWNER_LIMIT, 1),
+            history_days=env_int("WORLDLABS_JOB_HISTORY_DAYS", DEFAULT_HISTORY_DAYS, 0),
+        )
+
+    def submit(self, fn, owner="default", priority=0, model="", display_name="", world_id_of=None):
+        """
+        Queue fn() as a job; returns (job_id, Future) resolving to fn's result.
+        world_id_of(result) extracts the world ID recorded in the job history.
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        future = Future()
+
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO jobs (job_id, owner, priority, model, display_name, status, enqueued_at) "
+                "VALUES (?, ?, ?, ?, ?, 'queued', ?)",
+                (job_id, owner, int(priority), model, display_name, now)
+            )
+            self.jobs[job_id] = {
+                "job_id": job_id,
+                "owner": owner,
+                "priority": int(priority),
+                "model": model,
+                "display_name": display_name,
+                "status": "queued",
+                "enqueued_at": now,
+                "started_at": None,
+                "fn": fn,
+                "world_id_of": world_id_of,
+                "future": future,
+            }
+            self._dispatch()
+
+        return job_id, future
+
+    def _queued_order(self):
+        """Queued jobs sorted in the order they would be dispatched"""
+        queued = [job for job in self.jobs.values() if job["status"] == "queued"]
+        return sorted(queued, key=lambda job: (
+            -job["priority"],
+            self.running_by_owner.get(job["owner"], 0),
+            self.last_dispatch_by_owner.get(job["owner"], 0.0),
+            job["enqueued_at"],
+        ))
+
+    def _dispatch(self):
+        """Start queued jobs while worker and per-owner capacity allow (lock held)"""
+        while True:
+            running = sum(self.running_by_owner.values())
+            if running >= self.max_workers:
+                return
+
+            candidates = [
+                job for job in self._queued_order()
+                if self.running_by_owner.get(job["owner"], 0) < self.per_owner_limit
+            ]
+            if not candidates:
+                return
+
+            job = candidates[0]
+            now = time.time()
+            job["status"] = "running"
+            job["started_at"] = now
+            self.running_by_owner[job["owner"]] = self.running_by_owner.get(job["owner"], 0) + 1
+            self.last_dispatch_by_owner[job["owner"]] = now
+            self.conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ? WHERE job_id = ?",
+                (now, job["job_id"])
+            )
+            self.executor.submit(self._run, job)
+
+    def cancel(self, job_id):
+        """Drop a job that is still queued; returns False if it already started or finished"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job["status"] != "queued":
+                return False
+
+            del self.jobs[job_id]
+            self.conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE job_id = ?",
+                (time.time(), job_id)
+            )
+
+        job["future"].set_exception(OperationCancelled(f"Job {job_id} was cancelled while queued"))
+        return True
+
+    def _run(self, job):
+        future = job["future"]
+        world_id = None
+        error = None
+
+        try:
+            result = job["fn"]()
+            if job["world_id_of"] is not None:
+                world_id = job["world_id_of"](result)
+        except BaseException as e:
+            error = e
+
+        with self.lock:
+            if is_cancellation(error):
+                status = "cancelled"
+            else:
+                status = "failed" if error is not None else "done"
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, world_id = ?, error = ? WHERE job_id = ?",
+                (status, time.time(), world_id, str(error) if error is not None else None, job["job_id"])
+            )
+            self.running_by_owner[job["owner"]] -= 1
+            if not self.running_by_owner[job["owner"]]:
+                del self.running_by_owner[job["owner"]]
+            del self.jobs[job["job_id"]]
+            self._dispatch()
+
+            self.finished_since_prune += 1
+            if self.finished_since_prune >= PRUNE_EVERY:
+                self.finished_since_prune = 0
+                self.prune()
+
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def prune(self):
+        """
+        Delete finished jobs older than history_days (0 keeps everything),
+        keeping each model's HISTORY_WINDOW most recent successes for ETAs
+        """
+        if self.history_days <= 0:
+            return
+
+        cutoff = time.time() - self.history_days * 86400
+        with self.lock:
+            deleted = self.conn.execute(
+                "DELETE FROM jobs WHERE status NOT IN ('queued', 'running') AND finished_at < ? "
+                "AND job_id NOT IN ("
+                "  SELECT job_id FROM ("
+                "    SELECT job_id, ROW_NUMBER() OVER (PARTITION BY model ORDER BY finished_at DESC) AS n "
+                "    FROM jobs WHERE status = 'done'"
+                "  ) WHERE n <= ?"
+                ")",
+                (cutoff, HISTORY_WINDOW)
+            ).rowcount
+        if deleted:
+            print(f"[WorldLabs] Pruned {deleted} finished jobs older than {self.history_days} days")
+
+    def get_counts(self):
+        """Running and queued job counts against the concurrency cap"""
+        with self.lock:
+            running = sum(self.running_by_owner.values())
+            return {
+                "max_concurrent": self.max_workers,
+                "in_flight": running,
+                "queue_depth": len(self.jobs) - running,
+            }
+
+    def estimate_duration(self, model):
+        """Median duration of the model's recent successful jobs"""
+        rows = self.conn.execute(
+            "SELECT finished_at - started_at FROM jobs "
+            "WHERE model = ? AND status = 'done' AND started_at IS NOT NULL "
+            "ORDER BY finished_at DESC LIMIT ?",
+            (model, HISTORY_WINDOW)
+        ).fetchall()
+
+        durations = sorted(row[0] for row in rows if row[0] is not None)
+        if not durations:
+            return DEFAULT_MODEL_DURATIONS.get(model, DEFAULT_DURATION)
+
+        return durations[len(durations) // 2]
+
+    def get_status(self):
+        """
+        Snapshot of active jobs with queue position and ETA (seconds from now).
+        ETAs simulate the worker pool using per-model historical durations;
+        per-owner limits are ignored, so they are optimistic under contention.
+        """
+        now = time.time()
+
+        with self.lock:
+            running = [job for job in self.jobs.values() if job["status"] == "running"]
+            queued = self._queued_order()
+            estimates = {}
+            for job in running + queued:
+                if job["model"] not in estimates:
+                    estimates[job["model"]] = self.estimate_duration(job["model"])
+
+            # Worker availability times, seeded with the running jobs' expected finish
+            free_at = [
+                max(now, job["started_at"] + estimates[job["model"]]) for job in running
+            ]
+            free_at += [now] * max(0, self.max_workers - len(free_at))
+            heapq.heapify(free_at)
+
+            status = []
+            for job in running:
+                finish = job["started_at"] + estimates[job["model"]]
+                status.append(self._describe(job, 0, max(0.0, finish - now)))
+
+            for position, job in enumerate(queued, start=1):
+                start = heapq.heappop(free_at)
+                finish = start + estimates[job["model"]]
+                heapq.heappush(free_at, finish)
+                status.append(self._describe(job, position, finish - now))
+
+        return status
+
+    def _describe(self, job, position, eta):
+        return {
+            "job_id": job["job_id"],
+            "owner": job["owner"],
+            "priority": job["priority"],
+            "model": job["model"],
+            "display_name": job["display_name"],
+            "status": job["status"],
+            "queue_position": position,
+            "eta_s": round(eta, 1),
+        }
+
+    def get_job_status(self, job_id):
+        """Status of a single job, including finished jobs from the persistent history"""
+        for entry in self.get_status():
+            if entry["job_id"] == job_id:
+                return entry
+
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+
+        return {
+            "job_id": row["job_id"],
+            "owner": row["owner"],
+            "priority": row["priority"],
+            "model": row["model"],
+            "display_name": row["display_name"],
+            "status": row["status"],
+            "queue_position": 0,
+            "eta_s": 0.0,
+            "world_id": row["world_id"],
+            "error": row["error"],
+        }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Process-wide scheduler, created on first use"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = JobScheduler.from_env()
+        return _scheduler
+
+
+def register_routes():
+    """Expose GET /worldlabs/queue on the ComfyUI server when running inside ComfyUI"""
+    try:
+        from aiohttp import web
+        from server import PromptServer
+    except ImportError:
+        return
+
+    @PromptServer.instance.routes.get("/worldlabs/queue")
+    async def worldlabs_queue(request):
+        job_id = request.query.get("job_id", "")
+        if job_id:
+            status = get_scheduler().get_job_status(job_id)
+            if status is None:
+                return web.json_response({"error": "unknown job_id"}, status=404)
+            return web.json_response(status)
+
+        return web.json_response({"jobs": get_scheduler().get_status()})
@@ -0,0 +1,105 @@
+"""
+World Labs ComfyUI Nodes - Media Asset Index
+Maps input image content hashes to already-uploaded media assets
+"""
+
+import time
+import hashlib
+import threading
+
+from .worldlabs_state import connect, env_int
+
+
+# How long an uploaded media asset is assumed to stay usable (seconds)
+DEFAULT_TTL = 24 * 60 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS media_assets (
+    content_hash TEXT NOT NULL,
+    account TEXT NOT NULL,
+    media_asset_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (content_hash, account)
+);
+CREATE INDEX IF NOT EXISTS media_assets_expires ON media_assets (expires_at);
+"""
+
+
+def image_content_hash(pixels):
+    """SHA-256 of a uint8 [H, W, C] array, including its shape"""
+    digest = hashlib.sha256()
+    digest.update(repr(pixels.shape).encode("ascii"))
+    digest.update(pixels if pixels.flags.c_contiguous else pixels.tobytes())
+    return digest.hexdigest()
+
+
+def account_key(api_key):
+    """Media assets belong to an account; key by a digest instead of storing the API key"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+class MediaAssetIndex:
+    """
+    SQLite index of (content hash, account) -> media_asset_id with expiry.
+    Prompt sweeps over the same input image reuse the first upload.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.conn = connect()
+        self.conn.executescript(SCHEMA)
+
+    @classmethod
+    def from_env(cls):
+        """Build an index using the WORLDLABS_MEDIA_ASSET_TTL override (0 disables reuse)"""
+        return cls(ttl=env_int("WORLDLABS_MEDIA_ASSET_TTL", DEFAULT_TTL, 0))
+
+    def lookup(self, content_hash, api_key):
+        """Return a live media_asset_id for this image and account, or None"""
+        if self.ttl <= 0:
+            return None
+
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT media_asset_id FROM media_assets "
+                "WHERE content_hash = ? AND account = ? AND expires_at > ?",
+                (content_hash, account_key(api_key), time.time())
+            ).fetchone()
+
+        return row[0] if row else None
+
+    def store(self, content_hash, api_key, media_asset_id):
+        if self.ttl <= 0:
+            return
+
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO media_assets "
+                "(content_hash, account, media_asset_id, created_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (content_hash, account_key(api_key), media_asset_id, now, now + self.ttl)
+            )
+            self.conn.execute("DELETE FROM media_assets WHERE expires_at <= ?", (now,))
+
+    def evict(self, content_hash, api_key):
+        """Forget an asset the API no longer accepts"""
+        with self.lock:
+            self.conn.execute(
+                "DELETE FROM media_assets WHERE content_hash = ? AND account = ?",
+                (content_hash, account_key(api_key))
+            )
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_media_index():
+    """Process-wide media asset index, created on first use"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = MediaAssetIndex.from_env()
+        return _index
@@ -0,0 +1,470 @@
+"""
+World Labs ComfyUI Nodes - Mesh Processing
+GLB reading/writing, vectorized quadric-error simplification and quantized glTF export
+"""
+
+import json
+import struct
+
+from .worldlabs_lazy import lazy_import
+
+np = lazy_import("numpy")
+
+
+GLB_MAGIC = 0x46546C67
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+
+MODE_TRIANGLES = 4
+
+COMPONENT_DTYPES = {
+    5120: "i1",
+    5121: "u1",
+    5122: "<i2",
+    5123: "<u2",
+    5125: "<u4",
+    5126: "<f4",
+}
+TYPE_SIZES = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4, "MAT4": 16}
+
+# Extensions whose data this reader can't decode
+UNSUPPORTED_EXTENSIONS = ("KHR_draco_mesh_compression", "EXT_meshopt_compression")
+
+MAX_RESOLUTION = 4096
+EIGEN_TOLERANCE = 1e-3  # quadric directions weaker than this (relative) are treated as flat
+
+
+class MeshData:
+    """Triangle mesh as float32 positions [V, 3] and int64 triangles [F, 3]"""
+
+    __slots__ = ("positions", "triangles")
+
+    def __init__(self, positions, triangles):
+        self.positions = positions
+        self.triangles = triangles
+
+    @property
+    def vertex_count(self):
+        return len(self.positions)
+
+    @property
+    def triangle_count(self):
+        return len(self.triangles)
+
+
+# ---------------------------------------------------------------------------
+# GLB reading
+# ---------------------------------------------------------------------------
+
+def parse_glb(data):
+    """Split a GLB file into (gltf json, binary chunk)"""
+    magic, version, length = struct.unpack_from("<III", data, 0)
+    if magic != GLB_MAGIC:
+        raise ValueError("Not a GLB file (bad magic)")
+    if version != 2:
+        raise ValueError(f"Unsupported GLB version: {version}")
+
+    gltf = None
+    binary = b""
+    offset = 12
+    while offset < min(length, len(data)):
+        chunk_length, chunk_type = struct.unpack_from("<II", data, offset)
+        chunk = data[offset + 8:offset + 8 + chunk_length]
+        if chunk_type == CHUNK_JSON:
+            gltf = json.loads(bytes(chunk).decode("utf-8"))
+        elif chunk_type == CHUNK_BIN and not binary:
+            binary = chunk
+        offset += 8 + chunk_length
+
+    if gltf is None:
+        raise ValueError("GLB file has no JSON chunk")
+
+    return gltf, binary
+
+
+def read_accessor(gltf, binary, index):
+    """Accessor contents as an [count, components] array (normalized integers become floats)"""
+    accessor = gltf["accessors"][index]
+    if "sparse" in accessor or "bufferView" not in accessor:
+        raise ValueError("Sparse accessors are not supported")
+
+    dtype = np.dtype(COMPONENT_DTYPES[accessor["componentType"]])
+    components = TYPE_SIZES[accessor["type"]]
+    count = accessor["count"]
+
+    view = gltf["bufferViews"][accessor["bufferView"]]
+    if view.get("buffer", 0) != 0:
+        raise ValueError("External buffers are not supported")
+
+    offset = view.get("byteOffset", 0) + accessor.get("byteOffset", 0)
+    stride = view.get("byteStride") or dtype.itemsize * components
+    values = np.ndarray(
+        (count, components), dtype=dtype, buffer=binary, offset=offset, strides=(stride, dtype.itemsize)
+    )
+
+    if accessor.get("normalized") and dtype.kind in "iu":
+        scale = float(np.iinfo(dtype).max)
+        return np.maximum(values.astype(np.float32) / scale, -1.0)
+
+    return np.array(values)
+
+
+def node_matrix(node):
+    """Local 4x4 transform of a glTF node"""
+    if "matrix" in node:
+        return np.array(node["matrix"], dtype=np.float64).reshape(4, 4).T
+
+    x, y, z, w = node.get("rotation", (0.0, 0.0, 0.0, 1.0))
+    rotation = np.array([
+        [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+        [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+        [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+    ])
+
+    matrix = np.eye(4)
+    matrix[:3, :3] = rotation * np.asarray(node.get("scale", (1.0, 1.0, 1.0)))
+    matrix[:3, 3] = node.get("translation", (0.0, 0.0, 0.0))
+    return matrix
+
+
+def read_glb(data):
+    """
+    Merge every triangle primitive in the default scene into one MeshData,
+    with node transforms applied
+    """
+    gltf, binary = parse_glb(data)
+
+    unsupported = [name for name in gltf.get("extensionsRequired", []) if name in UNSUPPORTED_EXTENSIONS]
+    if unsupported:
+        raise ValueError(f"Compressed GLB input is not supported ({', '.join(unsupported)})")
+
+    nodes = gltf.get("nodes", [])
+    scenes = gltf.get("scenes", [])
+    if scenes:
+        roots = scenes[gltf.get("scene", 0)].get("nodes", [])
+    else:
+        children = {child for node in nodes for child in node.get("children", [])}
+        roots = [index for index in range(len(nodes)) if index not in children]
+
+    positions = []
+    triangles = []
+    vertex_offset = 0
+
+    stack = [(index, np.eye(4)) for index in roots]
+    while stack:
+        index, parent = stack.pop()
+        node = nodes[index]
+        world = parent @ node_matrix(node)
+        stack.extend((child, world) for child in node.get("children", []))
+
+        if "mesh" not in node:
+            continue
+
+        for primitive in gltf["meshes"][node["mesh"]]["primitives"]:
+            if primitive.get("mode", MODE_TRIANGLES) != MODE_TRIANGLES:
+                continue
+
+            local = read_accessor(gltf, binary, primitive["attributes"]["POSITION"]).astype(np.float64)
+            if "indices" in primitive:
+                indices = read_accessor(gltf, binary, primitive["indices"]).reshape(-1, 3).astype(np.int64)
+            else:
+                indices = np.arange(len(local), dtype=np.int64).reshape(-1, 3)
+
+            positions.append(local @ world[:3, :3].T + world[:3, 3])
+            triangles.append(indices + vertex_offset)
+            vertex_offset += len(local)
+
+    if not positions:
+        raise ValueError("GLB file contains no triangle meshes")
+
+    return MeshData(np.concatenate(positions).astype(np.float32), np.concatenate(triangles))
+
+
+# ---------------------------------------------------------------------------
+# Simplification
+# ---------------------------------------------------------------------------
+
+def face_quadrics(positions, triangles):
+    """Area-weighted plane quadrics per face as [F, 10]: A (6 upper terms), b (3), c"""
+    v0 = positions[triangles[:, 0]].astype(np.float64)
+    v1 = positions[triangles[:, 1]].astype(np.float64)
+    v2 = positions[triangles[:, 2]].astype(np.float64)
+
+    normals = np.cross(v1 - v0, v2 - v0)
+    double_area = np.linalg.norm(normals, axis=1)
+    valid = double_area > 0
+    normals[valid] /= double_area[valid, None]
+    distance = -np.einsum("ij,ij->i", normals, v0)
+    weight = 0.5 * double_area
+
+    nx, ny, nz = normals.T
+    return np.stack([
+        nx * nx, nx * ny, nx * nz, ny * ny, ny * nz, nz * nz,
+        nx * distance, ny * distance, nz * distance, distance * distance,
+    ], axis=1) * weight[:, None]
+
+
+def accumulate(groups, values, count):
+    """Sum rows of values [N, K] into count groups"""
+    return np.stack([np.bincount(groups, weights=values[:, k], minlength=count) for k in range(values.shape[1])],
+                    axis=1)
+
+
+def optimal_positions(quadrics, means):
+    """
+    Minimize each cluster's quadric error, solving A x = -b around the cluster
+    mean with a truncated pseudo-inverse, so flat or ridge-like clusters
+    (rank-deficient A) stay on their surface instead of shooting off
+    """
+    a = np.empty((len(quadrics), 3, 3))
+    a[:, 0, 0], a[:, 0, 1], a[:, 0, 2] = quadrics[:, 0], quadrics[:, 1], quadrics[:, 2]
+    a[:, 1, 0], a[:, 1, 1], a[:, 1, 2] = quadrics[:, 1], quadrics[:, 3], quadrics[:, 4]
+    a[:, 2, 0], a[:, 2, 1], a[:, 2, 2] = quadrics[:, 2], quadrics[:, 4], quadrics[:, 5]
+    b = quadrics[:, 6:9]
+
+    eigenvalues, eigenvectors = np.linalg.eigh(a)
+    largest = eigenvalues[:, -1:]
+    keep = eigenvalues > EIGEN_TOLERANCE * largest
+    inverse = np.where(keep, 1.0 / np.where(keep, eigenvalues, 1.0), 0.0)
+
+    residual = -b - np.einsum("nij,nj->ni", a, means)
+    projected = np.einsum("nji,nj->ni", eigenvectors, residual) * inverse
+    return means + np.einsum("nij,nj->ni", eigenvectors, projected)
+
+
+def cluster_vertices(positions, triangles, origin, size, resolution):
+    """Snap vertices to a resolution^3 grid; returns (cluster per vertex, cluster count, surviving triangles)"""
+    cell = size / resolution
+    coords = np.clip(((positions - origin) / cell).astype(np.int64), 0, resolution - 1)
+    keys = (coords[:, 0] * resolution + coords[:, 1]) * resolution + coords[:, 2]
+    _, clusters = np.unique(keys, return_inverse=True)
+    clusters = clusters.reshape(-1)
+
+    remapped = clusters[triangles]
+    a, b, c = remapped.T
+    remapped = remapped[(a != b) & (b != c) & (a != c)]
+
+    # Triangles collapsed onto the same three clusters are kept once
+    ordered = np.sort(remapped, axis=1)
+    rows = np.ascontiguousarray(ordered).view([("a", np.int64), ("b", np.int64), ("c", np.int64)]).ravel()
+    _, first = np.unique(rows, return_index=True)
+    remapped = remapped[np.sort(first)]
+
+    return clusters, int(clusters.max()) + 1 if len(clusters) else 0, remapped
+
+
+def compact(positions, triangles):
+    """Drop unreferenced vertices and renumber"""
+    used, inverse = np.unique(triangles, return_inverse=True)
+    return positions[used], inverse.reshape(triangles.shape)
+
+
+def spatial_order(positions, triangles):
+    """
+    Sort triangles along a Morton curve and number vertices by first use, so
+    index and vertex data are local (GPU cache friendly, compress well)
+    """
+    centroids = positions[triangles].mean(axis=1)
+    low = centroids.min(axis=0)
+    extent = max(float((centroids.max(axis=0) - low).max()), 1e-12)
+    grid = ((centroids - low) / extent * 1023).astype(np.uint64)
+
+    def spread(v):
+        v = (v | (v << np.uint64(16))) & np.uint64(0x030000FF)
+        v = (v | (v << np.uint64(8))) & np.uint64(0x0300F00F)
+        v = (v | (v << np.uint64(4))) & np.uint64(0x030C30C3)
+        return (v | (v << np.uint64(2))) & np.uint64(0x09249249)
+
+    morton = spread(grid[:, 0]) | (spread(grid[:, 1]) << np.uint64(1)) | (spread(grid[:, 2]) << np.uint64(2))
+    triangles = triangles[np.argsort(morton, kind="stable")]
+
+    _, first_use = np.unique(triangles.ravel(), return_index=True)
+    order = np.argsort(first_use)
+    remap = np.empty(len(order), dtype=np.int64)
+    remap[order] = np.arange(len(order))
+
+    return positions[order], remap[triangles]
+
+
+def simplify(mesh, target_triangles):
+    """
+    Quadric-error simplification by vertex clustering: pick the finest grid
+    that meets target_triangles, then place each cluster's vertex at the
+    position minimizing the summed plane quadrics of its original faces.
+    Every step is a vectorized pass over the whole mesh.
+    Returns (simplified MeshData, grid resolution or 0 if unchanged).
+    """
+    positions, triangles = compact(mesh.positions, mesh.triangles)
+    if len(triangles) <= target_triangles:
+        positions, triangles = spatial_order(positions, triangles)
+        return MeshData(positions, triangles), 0
+
+    origin = positions.min(axis=0).astype(np.float64)
+    size = max(float((positions.max(axis=0) - origin).max()), 1e-12) * (1 + 1e-6)
+
+    # Triangle count grows with grid resolution; find the finest grid within target
+    low, high = 1, MAX_RESOLUTION
+    best = cluster_vertices(positions, triangles, origin, size, 1) + (1,)
+    while low <= high:
+        middle = (low + high) // 2
+        result = cluster_vertices(positions, triangles, origin, size, middle)
+        if len(result[2]) <= target_triangles:
+            best = result + (middle,)
+            low = middle + 1
+        else:
+            high = middle - 1
+
+    clusters, cluster_count, new_triangles, resolution = best
+    if len(new_triangles) == 0:
+        raise ValueError(f"Target of {target_triangles} triangles is too small for this mesh")
+
+    vertex_quadrics = np.zeros((len(positions), 10))
+    quadrics = face_quadrics(positions, triangles)
+    for corner in range(3):
+        vertex_quadrics += accumulate(triangles[:, corner], quadrics, len(positions))
+
+    counts = np.bincount(clusters, minlength=cluster_count)[:, None]
+    means = accumulate(clusters, positions.astype(np.float64), cluster_count) / np.maximum(counts, 1)
+    new_positions = optimal_positions(accumulate(clusters, vertex_quadrics, cluster_count), means)
+
+    # Keep each vertex near its own cell so degenerate quadrics can't produce spikes
+    cell = size / resolution
+    new_positions = np.clip(new_positions, means - cell, means + cell).astype(np.float32)
+
+    new_positions, new_triangles = compact(new_positions, new_triangles)
+    new_positions, new_triangles = spatial_order(new_positions, new_triangles)
+    return MeshData(new_positions, new_triangles), resolution
+
+
+def vertex_normals(positions, triangles):
+    """Area-weighted unit vertex normals"""
+    v0, v1, v2 = (positions[triangles[:, k]].astype(np.float64) for k in range(3))
+    face_normals = np.cross(v1 - v0, v2 - v0)
+
+    normals = np.zeros((len(positions), 3))
+    for corner in range(3):
+        normals += accumulate(triangles[:, corner], face_normals, len(positions))
+
+    length = np.linalg.norm(normals, axis=1, keepdims=True)
+    return normals / np.where(length > 0, length, 1.0)
+
+
+# ---------------------------------------------------------------------------
+# GLB writing
+# ---------------------------------------------------------------------------
+
+class GlbBuilder:
+    """Accumulates 4-byte aligned buffer views and accessors for a single-buffer GLB"""
+
+    def __init__(self):
+        self.binary = bytearray()
+        self.buffer_views = []
+        self.accessors = []
+
+    def add_accessor(self, array, component_type, accessor_type, count, target, stride=None, normalized=False,
+                     bounds=None):
+        while len(self.binary) % 4:
+            self.binary.append(0)
+
+        view = {"buffer": 0, "byteOffset": len(self.binary), "byteLength": array.nbytes, "target": target}
+        if stride:
+            view["byteStride"] = stride
+        self.binary.extend(array.tobytes())
+        self.buffer_views.append(view)
+
+        accessor = {
+            "bufferView": len(self.buffer_views) - 1,
+            "componentType": component_type,
+            "count": count,
+            "type": accessor_type,
+        }
+        if normalized:
+            accessor["normalized"] = True
+        if bounds is not None:
+            accessor["min"], accessor["max"] = bounds
+        self.accessors.append(accessor)
+        return len(self.accessors) - 1
+
+
+def write_glb(mesh, quantize=True, normals=True):
+    """
+    Encode a MeshData as GLB bytes. With quantize, positions are stored as
+    16-bit integers (dequantized by the node transform) and normals as
+    normalized bytes, per KHR_mesh_quantization.
+    """
+    positions = mesh.positions.astype(np.float64)
+    count = len(positions)
+    builder = GlbBuilder()
+    attributes = {}
+    node = {"mesh": 0}
+
+    if quantize:
+        origin = positions.min(axis=0)
+        extent = max(float((positions.max(axis=0) - origin).max()), 1e-12)
+        scale = extent / 65535.0
+
+        quantized = np.zeros((count, 4), dtype="<u2")
+        quantized[:, :3] = np.round((positions - origin) / scale)
+        attributes["POSITION"] = builder.add_accessor(
+            quantized, 5123, "VEC3", count, ARRAY_BUFFER, stride=8,
+            bounds=(quantized[:, :3].min(axis=0).tolist(), quantized[:, :3].max(axis=0).tolist())
+        )
+        # Uniform scale, so normals keep their direction
+        node["translation"] = origin.tolist()
+        node["scale"] = [scale, scale, scale]
+    else:
+        values = positions.astype("<f4")
+        attributes["POSITION"] = builder.add_accessor(
+            values, 5126, "VEC3", count, ARRAY_BUFFER,
+            bounds=(values.min(axis=0).tolist(), values.max(axis=0).tolist())
+        )
+
+    if normals:
+        unit = vertex_normals(mesh.positions, mesh.triangles)
+        if quantize:
+            packed = np.zeros((count, 4), dtype="i1")
+            packed[:, :3] = np.round(unit * 127)
+            attributes["NORMAL"] = builder.add_accessor(packed, 5120, "VEC3", count, ARRAY_BUFFER, stride=4,
+                                                        normalized=True)
+        else:
+            attributes["NORMAL"] = builder.add_accessor(unit.astype("<f4"), 5126, "VEC3", count, ARRAY_BUFFER)
+
+    # 0xFFFF is reserved (primitive restart), so 16-bit indices allow up to 65535 vertices
+    if count <= 65535:
+        indices = builder.add_accessor(mesh.triangles.astype("<u2").ravel(), 5123, "SCALAR",
+                                       mesh.triangles.size, ELEMENT_ARRAY_BUFFER)
+    else:
+        indices = builder.add_accessor(mesh.triangles.astype("<u4").ravel(), 5125, "SCALAR",
+                                       mesh.triangles.size, ELEMENT_ARRAY_BUFFER)
+
+    while len(builder.binary) % 4:
+        builder.binary.append(0)
+
+    gltf = {
+        "asset": {"version": "2.0", "generator": "World Labs ComfyUI Nodes"},
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        "nodes": [node],
+        "meshes": [{"primitives": [{"attributes": attributes, "indices": indices, "mode": MODE_TRIANGLES}]}],
+        "accessors": builder.accessors,
+        "bufferViews": builder.buffer_views,
+        "buffers": [{"byteLength": len(builder.binary)}],
+    }
+    if quantize:
+        gltf["extensionsUsed"] = ["KHR_mesh_quantization"]
+        gltf["extensionsRequired"] = ["KHR_mesh_quantization"]
+
+    json_bytes = json.dumps(gltf, separators=(",", ":")).encode("utf-8")
+    json_bytes += b" " * (-len(json_bytes) % 4)
+
+    total = 12 + 8 + len(json_bytes) + 8 + len(builder.binary)
+    return b"".join([
+        struct.pack("<III", GLB_MAGIC, 2, total),
+        struct.pack("<II", len(json_bytes), CHUNK_JSON),
+        json_bytes,
+        struct.pack("<II", len(builder.binary), CHUNK_BIN),
+        bytes(builder.binary),
+    ])
@@ -0,0 +1,157 @@
+"""
+World Labs ComfyUI Nodes - Shared Operation Polling
+One background poller per operation, shared by every caller waiting on it
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from .worldlabs_progress import WAIT_SLICE, check_cancelled
+
+
+# Finished operations kept so late duplicate waiters return immediately
+COMPLETED_CACHE_SIZE = 64
+
+
+class SharedOperation:
+    """A single operation's poller and the future its waiters block on"""
+
+    def __init__(self, operation_id, fetch, poll_interval, first_poll_delay):
+        self.operation_id = operation_id
+        self.fetch = fetch
+        self.poll_interval = poll_interval
+        self.first_poll_delay = first_poll_delay
+        self.future = Future()
+        self.subscribers = 0
+        self.progress = None
+        self.stop = threading.Event()
+        self.thread = None
+
+
+class OperationRegistry:
+    """
+    Process-wide registry of in-flight operations.
+    The first waiter on an operation starts its poller; later waiters on the
+    same operation_id subscribe to the same future, so N waiters cost one
+    request stream. The poller stops once the operation is done or the last
+    waiter gives up.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.operations = {}
+        self.completed = OrderedDict()
+
+    def wait(self, operation_id, fetch, poll_interval, timeout, first_poll_delay=0, cancel=None, on_progress=None):
+        """
+        Block until the operation reports done and return its final status payload.
+        fetch() returns the operation's current status dict (one GET).
+        Raises TimeoutError if this waiter's timeout elapses first. The wait
+        checks for cancellation (see check_cancelled) every WAIT_SLICE seconds
+        and reports the operation's progress percentage to on_progress.
+        """
+        with self.lock:
+            if operation_id in self.completed:
+                return self.completed[operation_id]
+
+            operation = self.operations.get(operation_id)
+            if operation is None:
+                operation = SharedOperation(operation_id, fetch, poll_interval, first_poll_delay)
+                self.operations[operation_id] = operation
+                operation.thread = threading.Thread(
+                    target=self._poll, args=(operation,),
+                    name=f"worldlabs-poll-{operation_id[:8]}", daemon=True
+                )
+                operation.thread.start()
+            else:
+                # Poll at the pace of the most eager waiter
+                operation.poll_interval = min(operation.poll_interval, poll_interval)
+                print(f"[WorldLabs] Joining existing poller for operation {operation_id}")
+            operation.subscribers += 1
+
+        deadline = time.monotonic() + timeout
+        reported = None
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"World generation timed out after {timeout} seconds. "
+                        f"Operation ID: {operation_id}"
+                    )
+                try:
+                    return operation.future.result(timeout=min(WAIT_SLICE, remaining))
+                except FutureTimeoutError:
+                    # Also the builtin TimeoutError since Python 3.11; re-raise the poller's own
+                    if operation.future.done():
+                        raise
+
+                check_cancelled(cancel)
+                if on_progress is not None and operation.progress != reported:
+                    reported = operation.progress
+                    on_progress(reported)
+        finally:
+            self._unsubscribe(operation)
+
+    def _unsubscribe(self, operation):
+        with self.lock:
+            operation.subscribers -= 1
+            if operation.subscribers <= 0:
+                operation.stop.set()
+                if self.operations.get(operation.operation_id) is operation:
+                    del self.operations[operation.operation_id]
+
+    def _poll(self, operation):
+        start_time = time.time()
+        last_progress = -1
+
+        try:
+            if operation.stop.wait(operation.first_poll_delay):
+                return
+
+            while not operation.stop.is_set():
+                data = operation.fetch()
+
+                # Show progress if available
+                if "progress" in data and data["progress"] != last_progress:
+                    last_progress = data["progress"]
+                    print(f"[WorldLabs] Progress: {last_progress}%")
+                    if isinstance(last_progress, (int, float)):
+                        operation.progress = last_progress
+
+                if data.get("done", False):
+                    with self.lock:
+                        self.completed[operation.operation_id] = data
+                        while len(self.completed) > COMPLETED_CACHE_SIZE:
+                            self.completed.popitem(last=False)
+                    operation.future.set_result(data)
+                    return
+
+                print(f"[WorldLabs] Waiting... ({int(time.time() - start_time)}s elapsed)")
+                operation.stop.wait(operation.poll_interval)
+        except Exception as e:
+            operation.future.set_exception(e)
+        finally:
+            with self.lock:
+                if self.operations.get(operation.operation_id) is operation:
+                    del self.operations[operation.operation_id]
+
+    def get_active(self):
+        """Operation IDs currently being polled with their waiter counts"""
+        with self.lock:
+            return {op_id: op.subscribers for op_id, op in self.operations.items()}
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_operation_registry():
+    """Process-wide operation registry, created on first use"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = OperationRegistry()
+        return _registry
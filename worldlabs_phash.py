@@ -0,0 +1,141 @@
+"""
+World Labs ComfyUI Nodes - Perceptual Hashing
+Batched 64-bit DCT perceptual hashes and Hamming distances for IMAGE batches
+"""
+
+import math
+
+from .worldlabs_lazy import lazy_import
+
+np = lazy_import("numpy")
+
+
+HASH_BITS = 64
+HASH_SIZE = 8     # low-frequency DCT block kept per image (8x8 = 64 bits)
+DCT_SIZE = 32     # images are area-resampled to this size before the DCT
+SAMPLE_SIZE = 128  # frames are strided down to roughly this size first
+CHUNK_SIZE = 64    # frames hashed per NumPy pass, bounding memory on long clips
+
+LUMA_WEIGHTS = (0.299, 0.587, 0.114)
+
+_dct_matrix = None
+_popcount_table = None
+
+
+def get_dct_matrix():
+    """Orthonormal DCT-II matrix of size DCT_SIZE, built on first use"""
+    global _dct_matrix
+    if _dct_matrix is None:
+        k = np.arange(DCT_SIZE)[:, None]
+        i = np.arange(DCT_SIZE)[None, :]
+        matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * DCT_SIZE)) * math.sqrt(2.0 / DCT_SIZE)
+        matrix[0] /= math.sqrt(2.0)
+        _dct_matrix = matrix.astype(np.float32)
+    return _dct_matrix
+
+
+def _bin_mean(values, size, axis):
+    """Area-average values along axis into size bins (any input length)"""
+    length = values.shape[axis]
+    edges = (np.arange(size) * length) // size
+    sums = np.add.reduceat(values, edges, axis=axis)
+
+    counts = np.maximum(np.diff(np.append(edges, length)), 1)
+    shape = [1] * values.ndim
+    shape[axis] = size
+    return sums / counts.reshape(shape).astype(np.float32)
+
+
+def _to_grayscale(images):
+    """[N, H, W, C] floats -> [N, H, W] luma"""
+    if images.shape[-1] >= 3:
+        return images[..., :3] @ np.asarray(LUMA_WEIGHTS, dtype=np.float32)
+    return images[..., 0]
+
+
+def perceptual_hashes(images, chunk_size=CHUNK_SIZE):
+    """
+    64-bit perceptual hash of every image in a batch
+    Input: [B, H, W, C] tensor or array with values 0.0-1.0 (or a single [H, W, C] image)
+    Output: [B] uint64 array
+    """
+    if len(images.shape) == 3:
+        images = images[None]
+
+    count = images.shape[0]
+    height, width = images.shape[1], images.shape[2]
+    step_y = max(1, height // SAMPLE_SIZE)
+    step_x = max(1, width // SAMPLE_SIZE)
+    dct = get_dct_matrix()
+
+    hashes = np.empty(count, dtype=np.uint64)
+    for start in range(0, count, chunk_size):
+        # Stride before converting so GPU tensors only transfer the sampled pixels
+        chunk = images[start:start + chunk_size, ::step_y, ::step_x]
+        if hasattr(chunk, "cpu"):
+            chunk = chunk.cpu().numpy()
+        chunk = np.asarray(chunk, dtype=np.float32)
+
+        gray = _to_grayscale(chunk)
+        small = _bin_mean(_bin_mean(gray, DCT_SIZE, 1), DCT_SIZE, 2)
+        coeffs = dct @ small @ dct.T
+
+        low = coeffs[:, :HASH_SIZE, :HASH_SIZE].reshape(len(chunk), HASH_BITS)
+        # Median of the AC terms; the DC term only tracks overall brightness
+        bits = low > np.median(low[:, 1:], axis=1, keepdims=True)
+        hashes[start:start + len(chunk)] = np.packbits(bits, axis=1).view(">u8").ravel()
+
+    return hashes
+
+
+def popcount(values):
+    """Number of set bits in each element of a uint64 array"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+
+    # NumPy < 2.0: per-byte lookup table
+    global _popcount_table
+    if _popcount_table is None:
+        _popcount_table = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+    values = np.ascontiguousarray(values, dtype=np.uint64)
+    return _popcount_table[values.view(np.uint8)].reshape(values.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+
+def hamming_distances(hashes, target):
+    """Hamming distance from each hash in an array to a single hash"""
+    return popcount(np.bitwise_xor(hashes, np.uint64(target)))
+
+
+def format_hash(value):
+    return f"{int(value):016x}"
+
+
+def select_keyframes(hashes, threshold, match_previous_only=False):
+    """
+    Greedily pick keyframes from a sequence of hashes: a frame becomes a new
+    keyframe unless it is within threshold bits of an existing keyframe (or
+    only the most recent one when match_previous_only is set).
+    Returns (keyframe frame indices, per-frame keyframe ordinal, per-frame distance).
+    """
+    count = len(hashes)
+    keyframe_hashes = np.empty(count, dtype=np.uint64)
+    keyframes = []
+    assignment = np.empty(count, dtype=np.int64)
+    distances = np.zeros(count, dtype=np.int64)
+
+    for index in range(count):
+        value = hashes[index]
+        if keyframes:
+            first = len(keyframes) - 1 if match_previous_only else 0
+            candidate_distances = hamming_distances(keyframe_hashes[first:len(keyframes)], value)
+            best = int(np.argmin(candidate_distances))
+            if candidate_distances[best] <= threshold:
+                assignment[index] = first + best
+                distances[index] = candidate_distances[best]
+                continue
+
+        keyframe_hashes[len(keyframes)] = value
+        assignment[index] = len(keyframes)
+        keyframes.append(index)
+
+    return keyframes, assignment, distances
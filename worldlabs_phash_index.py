@@ -0,0 +1,144 @@
+"""
+World Labs ComfyUI Nodes - Perceptual Hash Index
+Finds previously generated worlds whose input image was a near-duplicate
+(re-saved, resized or slightly color-graded) of a new input
+"""
+
+import time
+import hashlib
+import threading
+
+from .worldlabs_lazy import lazy_import
+from .worldlabs_state import connect, env_int
+from .worldlabs_phash import hamming_distances
+
+np = lazy_import("numpy")
+
+
+DEFAULT_THRESHOLD = 6
+REUSE_MODES = ("off", "suggest", "auto")
+INITIAL_CAPACITY = 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS phash_index (
+    phash INTEGER NOT NULL,
+    params INTEGER NOT NULL,
+    world_id TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS phash_index_world ON phash_index (world_id);
+"""
+
+
+def to_signed(value):
+    """uint64 -> int64 for SQLite INTEGER storage"""
+    value = int(value)
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def parameters_key(model, is_panorama, text_prompt=""):
+    """64-bit key of the generation parameters a world can only be reused under"""
+    text = f"{model}\0{bool(is_panorama)}\0{text_prompt.strip()}"
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big", signed=True)
+
+
+def parse_reuse_mode(mode):
+    mode = (mode or "").strip().lower()
+    if mode not in REUSE_MODES:
+        if mode:
+            print(f"[WorldLabs] Warning: Unknown reuse mode '{mode}' (expected one of {', '.join(REUSE_MODES)})")
+        return "suggest"
+    return mode
+
+
+class PerceptualHashIndex:
+    """
+    In-memory arrays of (perceptual hash, parameters key) -> world ID, backed
+    by a SQLite table that is appended to and loaded once at startup.
+    Queries are a single vectorized XOR/popcount over the hash array, well
+    under a millisecond for tens of thousands of entries.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.conn = connect()
+        self.conn.executescript(SCHEMA)
+
+        rows = self.conn.execute("SELECT phash, params, world_id FROM phash_index ORDER BY rowid").fetchall()
+        self.count = len(rows)
+        capacity = max(INITIAL_CAPACITY, self.count * 2)
+        self.hashes = np.zeros(capacity, dtype=np.uint64)
+        self.params = np.zeros(capacity, dtype=np.int64)
+        self.world_ids = [row["world_id"] for row in rows]
+
+        if rows:
+            self.hashes[:self.count] = np.array([row["phash"] for row in rows], dtype=np.int64).view(np.uint64)
+            self.params[:self.count] = [row["params"] for row in rows]
+
+    def _grow(self):
+        capacity = len(self.hashes) * 2
+        hashes = np.zeros(capacity, dtype=np.uint64)
+        params = np.zeros(capacity, dtype=np.int64)
+        hashes[:self.count] = self.hashes[:self.count]
+        params[:self.count] = self.params[:self.count]
+        self.hashes, self.params = hashes, params
+
+    def add(self, phash, params_key, world_id):
+        """Record that the image with this hash produced world_id under these parameters"""
+        with self.lock:
+            if self.count == len(self.hashes):
+                self._grow()
+            self.hashes[self.count] = phash
+            self.params[self.count] = params_key
+            self.world_ids.append(world_id)
+            self.count += 1
+
+            self.conn.execute(
+                "INSERT INTO phash_index (phash, params, world_id, created_at) VALUES (?, ?, ?, ?)",
+                (to_signed(phash), params_key, world_id, time.time())
+            )
+
+    def find(self, phash, params_key, threshold=DEFAULT_THRESHOLD):
+        """Closest (world_id, distance) within threshold bits, or None"""
+        with self.lock:
+            if self.count == 0:
+                return None
+
+            distances = hamming_distances(self.hashes[:self.count], phash).astype(np.int64)
+            # Worlds generated with other parameters are never candidates
+            distances[self.params[:self.count] != params_key] = 65
+
+            # Latest entry wins ties, so re-generated worlds are preferred
+            best = self.count - 1 - int(np.argmin(distances[::-1]))
+            if distances[best] > threshold:
+                return None
+            return self.world_ids[best], int(distances[best])
+
+    def forget(self, world_id):
+        """Drop every entry for a world (e.g. one that no longer exists)"""
+        with self.lock:
+            keep = [index for index in range(self.count) if self.world_ids[index] != world_id]
+            self.hashes[:len(keep)] = self.hashes[keep]
+            self.params[:len(keep)] = self.params[keep]
+            self.world_ids = [self.world_ids[index] for index in keep]
+            self.count = len(keep)
+
+            self.conn.execute("DELETE FROM phash_index WHERE world_id = ?", (world_id,))
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_phash_index():
+    """Process-wide perceptual hash index, created on first use"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = PerceptualHashIndex()
+        return _index
+
+
+def get_default_threshold():
+    """Hamming threshold used when a node doesn't set one (WORLDLABS_SIMILARITY_THRESHOLD overrides)"""
+    return env_int("WORLDLABS_SIMILARITY_THRESHOLD", DEFAULT_THRESHOLD, 0)
@@ -0,0 +1,282 @@
+"""
+World Labs ComfyUI Nodes - Profiling
+Opt-in cProfile and tracemalloc reports for each node invocation
+"""
+
+import io
+import os
+import time
+import functools
+import itertools
+import threading
+
+from .worldlabs_lazy import lazy_import
+from .worldlabs_state import get_output_directory
+
+tracemalloc = lazy_import("tracemalloc")
+
+
+REPORT_FUNCTIONS = 30   # functions listed by cumulative time
+REPORT_LINES = 20       # source lines listed by allocated size
+SAMPLE_INTERVAL = 0.2   # seconds between traced-memory samples
+
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_owned = False
+_sequence = itertools.count(1)
+# The profile session of the node invocation running on this thread, if any
+_local = threading.local()
+
+
+def should_profile(node_name):
+    """
+    WORLDLABS_PROFILE=1 profiles every node; a comma-separated list of node
+    class names (e.g. WorldLabsGenerateWorld,WorldLabsDownloadAsset) only those
+    """
+    setting = os.getenv("WORLDLABS_PROFILE", "").strip()
+    if not setting or setting.lower() in ("0", "false", "off"):
+        return False
+    if setting.lower() in ("1", "true", "on", "all"):
+        return True
+    return node_name in {part.strip() for part in setting.split(",")}
+
+
+def get_profile_directory():
+    """Report directory (WORLDLABS_PROFILE_DIR overrides output/worldlabs/profiles)"""
+    return os.getenv("WORLDLABS_PROFILE_DIR", "") or os.path.join(get_output_directory(), "worldlabs", "profiles")
+
+
+def start_tracing():
+    """Start tracemalloc for the first concurrent profiled call (unless something else already traces)"""
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_owned = True
+        _tracing_users += 1
+
+
+def stop_tracing():
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+
+def take_snapshot():
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ))
+
+
+class PeakSampler:
+    """
+    Samples traced memory in the background and keeps a snapshot from the
+    highest point seen, so allocations can be attributed to lines at the peak
+    rather than only at the end
+    """
+
+    def __init__(self):
+        self.baseline = take_snapshot()
+        self.start_size = tracemalloc.get_traced_memory()[0]
+        self.peak_size = self.start_size
+        self.peak_snapshot = self.baseline
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="worldlabs-profile", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def _run(self):
+        while not self.stop_event.wait(SAMPLE_INTERVAL):
+            self.sample()
+
+    def sample(self):
+        size = tracemalloc.get_traced_memory()[0]
+        if size > self.peak_size:
+            self.peak_size = size
+            self.peak_snapshot = take_snapshot()
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+        end_size = tracemalloc.get_traced_memory()[0]
+        self.sample()
+        return end_size
+
+
+class ProfileSession:
+    """Profilers of one node invocation: its own thread's plus one per worker call (see profile_call)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.worker_profilers = []
+
+    def add(self, profiler):
+        with self.lock:
+            self.worker_profilers.append(profiler)
+
+
+def profile_call(function):
+    """
+    Wrap a callable that a profiled node hands to another thread (a scheduler
+    job, an upload slot request) so its time is merged into the node's report.
+    Returns function unchanged when the calling thread isn't being profiled.
+    """
+    session = getattr(_local, "session", None)
+    if session is None:
+        return function
+
+    import cProfile
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        previous = getattr(_local, "session", None)
+        _local.session = session
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            profiler = None
+        try:
+            return function(*args, **kwargs)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                session.add(profiler)
+            _local.session = previous
+
+    return wrapper
+
+
+def format_bytes(size):
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size} B"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def write_report(label, started, wall, cpu, error, profiler, session, sampler, end_size):
+    """Write <time>_<label>_<n>.txt (and the raw .prof for pstats/snakeviz); returns the .txt path"""
+    directory = get_profile_directory()
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(started))}_"
+                                   f"{label}_{os.getpid()}-{next(_sequence)}")
+
+    lines = [
+        label,
+        f"started: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started))}",
+        f"wall: {wall:.3f}s  process cpu: {cpu:.3f}s",
+        f"traced memory: peak +{format_bytes(sampler.peak_size - sampler.start_size)} over start "
+        f"(sampled every {SAMPLE_INTERVAL}s), end {'+' if end_size >= sampler.start_size else ''}"
+        f"{format_bytes(end_size - sampler.start_size)}",
+        f"result: {'ok' if error is None else f'raised {type(error).__name__}: {error}'}",
+        "",
+    ]
+
+    with session.lock:
+        profilers = ([profiler] if profiler is not None else []) + session.worker_profilers
+        workers = len(session.worker_profilers)
+    lines.append(f"== Top functions by cumulative time (node thread + {workers} worker calls) ==")
+
+    if profilers:
+        import pstats
+
+        stream = io.StringIO()
+        stats = pstats.Stats(*profilers, stream=stream)
+        stats.dump_stats(stem + ".prof")
+        stats.sort_stats("cumulative").print_stats(REPORT_FUNCTIONS)
+        lines.append(stream.getvalue().strip())
+    else:
+        lines.append("(cProfile unavailable: another profiler is active)")
+
+    lines += ["", "== Allocations at peak by line (vs. start) =="]
+    stats = [stat for stat in sampler.peak_snapshot.compare_to(sampler.baseline, "lineno") if stat.size_diff > 0]
+    for rank, stat in enumerate(stats[:REPORT_LINES], start=1):
+        frame = stat.traceback[0]
+        lines.append(f"{rank:3}. {frame.filename}:{frame.lineno}: +{format_bytes(stat.size_diff)} "
+                     f"({stat.count_diff:+} blocks)")
+        source = stat.traceback.format()[-1].strip() if stat.traceback.format() else ""
+        if source and not source.startswith("File "):
+            lines.append(f"       {source}")
+    if not stats:
+        lines.append("(no allocations above the starting level)")
+
+    report_path = stem + ".txt"
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return report_path
+
+
+def run_profiled(label, function, args, kwargs):
+    import cProfile
+
+    start_tracing()
+    sampler = PeakSampler()
+    sampler.start()
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        profiler = None
+
+    # Work this call hands to other threads (see profile_call) joins the same report
+    session = ProfileSession()
+    previous = getattr(_local, "session", None)
+    _local.session = session
+
+    started = time.time()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    error = None
+    try:
+        return function(*args, **kwargs)
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        _local.session = previous
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        try:
+            end_size = sampler.stop()
+            report_path = write_report(label, started, wall, cpu, error, profiler, session, sampler, end_size)
+            print(f"[WorldLabs] Profile of {label} ({wall:.2f}s): {report_path}")
+        except Exception as e:
+            print(f"[WorldLabs] Warning: Failed to write profile for {label}: {e}")
+        finally:
+            stop_tracing()
+
+
+def profiled(node_name, function):
+    """
+    Wrap a node's FUNCTION. Profiling is off unless WORLDLABS_PROFILE selects
+    the node or the call passes profile=True (the node input); when off, the
+    wrapper only checks those two and calls through.
+    """
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        requested = kwargs.pop("profile", False)
+        if not (requested or should_profile(node_name)):
+            return function(*args, **kwargs)
+        return run_profiled(f"{node_name}.{function.__name__}", function, args, kwargs)
+
+    return wrapper
+
+
+def instrument_nodes(node_classes):
+    """Wrap every node class's FUNCTION method with profiled()"""
+    for node_name, node_class in node_classes.items():
+        method = getattr(node_class, node_class.FUNCTION)
+        original = getattr(method, "__wrapped__", method)
+        setattr(node_class, node_class.FUNCTION, profiled(node_name, original))
@@ -0,0 +1,133 @@
+"""
+World Labs ComfyUI Nodes - Progress and Cancellation
+ComfyUI progress bars and interrupt checks that do nothing when running headless
+"""
+
+import time
+import threading
+import importlib
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+
+WAIT_SLICE = 0.25  # longest a wait goes without checking for cancellation
+
+_comfy_modules = {}
+_comfy_lock = threading.Lock()
+
+
+class OperationCancelled(Exception):
+    """Raised in worker threads when the node waiting on their result was cancelled"""
+
+
+def get_comfy_module(name):
+    """comfy.* module when running inside ComfyUI, else None (looked up once)"""
+    with _comfy_lock:
+        if name not in _comfy_modules:
+            try:
+                _comfy_modules[name] = importlib.import_module(name)
+            except ImportError:
+                _comfy_modules[name] = None
+        return _comfy_modules[name]
+
+
+def check_cancelled(cancel=None):
+    """
+    Raise if Cancel was pressed in ComfyUI (its interrupt exception, which
+    reaches the node through any future it waits on) or if cancel, a
+    threading.Event set when the waiting node gave up, is set
+    """
+    model_management = get_comfy_module("comfy.model_management")
+    if model_management is not None:
+        model_management.throw_exception_if_processing_interrupted()
+    if cancel is not None and cancel.is_set():
+        raise OperationCancelled("Cancelled")
+
+
+def is_cancellation(error):
+    """True for OperationCancelled and ComfyUI's interrupt (Cancel pressed) exception"""
+    if isinstance(error, OperationCancelled):
+        return True
+    model_management = get_comfy_module("comfy.model_management")
+    interrupt = getattr(model_management, "InterruptProcessingException", None)
+    return interrupt is not None and isinstance(error, interrupt)
+
+
+def wait_for(future, cancel=None, timeout=None):
+    """
+    future.result() that wakes every WAIT_SLICE seconds to check for
+    cancellation. If the wait is aborted (ComfyUI Cancel, Ctrl+C headless)
+    cancel is set so the worker producing the result stops too.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    try:
+        while True:
+            remaining = WAIT_SLICE if deadline is None else min(WAIT_SLICE, deadline - time.monotonic())
+            try:
+                return future.result(timeout=max(0.0, remaining))
+            except FutureTimeoutError:
+                # Since Python 3.11 this is also the builtin TimeoutError the result may carry
+                if future.done() or (deadline is not None and time.monotonic() >= deadline):
+                    raise
+            check_cancelled(cancel)
+    except BaseException:
+        if cancel is not None and not future.done():
+            cancel.set()
+        raise
+
+
+class CancellableReader:
+    """
+    File-like request body over bytes, checked for cancellation on every read
+    so an upload stops within one block; its length keeps Content-Length set
+    """
+
+    def __init__(self, data, cancel=None, on_progress=None):
+        self.view = memoryview(data)
+        self.offset = 0
+        self.cancel = cancel
+        self.on_progress = on_progress
+
+    def __len__(self):
+        return len(self.view)
+
+    def read(self, size=-1):
+        check_cancelled(self.cancel)
+
+        end = len(self.view) if size is None or size < 0 else min(len(self.view), self.offset + size)
+        data = self.view[self.offset:end].tobytes()
+        self.offset = end
+
+        if self.on_progress is not None and data:
+            self.on_progress(self.offset, len(self.view))
+        return data
+
+
+def cancellable_chunks(chunks, cancel=None, on_progress=None):
+    """Pass chunks through (e.g. a streamed upload body), checking for cancellation before each"""
+    sent = 0
+    for chunk in chunks:
+        check_cancelled(cancel)
+        sent += len(chunk)
+        if on_progress is not None:
+            on_progress(sent, None)
+        yield chunk
+
+
+class Progress:
+    """The running node's ComfyUI progress bar; a no-op headless"""
+
+    def __init__(self, total=100):
+        utils = get_comfy_module("comfy.utils")
+        self.total = total
+        self.bar = utils.ProgressBar(total) if utils is not None else None
+
+    def update(self, value, total=None):
+        if self.bar is None:
+            return
+        total = total or self.total
+        self.bar.update_absolute(min(value, total), total)
+
+    def update_bytes(self, done, total):
+        """Transfer progress in bytes, scaled onto the bar (ignored when the size is unknown)"""
+        if total:
+            self.update(round(done * self.total / total))
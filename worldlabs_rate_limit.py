@@ -0,0 +1,254 @@
+"""
+World Labs ComfyUI Nodes - Client-side Rate Limiting
+Process-wide token buckets for API traffic
+"""
+
+import os
+import time
+import threading
+
+from .worldlabs_lazy import lazy_import
+
+requests = lazy_import("requests")
+
+
+# Default (requests per second, burst) for each endpoint bucket.
+# Override with WORLDLABS_RATE_<BUCKET>="rate,burst", e.g. WORLDLABS_RATE_OPERATIONS="0.5,2"
+DEFAULT_BUCKETS = {
+    "generate": (0.5, 2),
+    "media_assets": (1.0, 4),
+    "operations": (2.0, 5),
+    "assets": (4.0, 8),
+}
+
+DEFAULT_MAX_RETRIES = 5
+THROTTLE_STATUS_CODES = (429, 503)
+# Server errors retried for idempotent requests only; a POST that failed with one
+# may still have been acted on (e.g. a paid generation started), so it is not resent
+RETRY_SERVER_ERRORS = (502, 503, 504)
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+
+
+def parse_retry_after(value, default=None):
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds"""
+    if not value:
+        return default
+
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    from email.utils import parsedate_to_datetime
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if retry_at is None:
+        return default
+
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that adapts its rate to server throttling.
+    A throttled response halves the refill rate and blocks the bucket until
+    the Retry-After deadline; every successful request recovers the rate
+    gradually back towards its configured value.
+    """
+
+    def __init__(self, name, rate, burst):
+        self.name = name
+        self.base_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = self.base_rate / 16.0
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.blocked_until = 0.0
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+        # Metrics
+        self.waiting = 0
+        self.max_waiting = 0
+        self.acquired = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _refill(self, now):
+        elapsed = now - self.last_refill
+        self.last_refill = now
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+
+    def acquire(self):
+        """Block until a token is available; returns the time spent waiting"""
+        start = time.monotonic()
+
+        with self.lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+        try:
+            while True:
+                with self.lock:
+                    now = time.monotonic()
+                    self._refill(now)
+
+                    if now < self.blocked_until:
+                        delay = self.blocked_until - now
+                    elif self.tokens >= 1.0:
+                        self.tokens -= 1.0
+                        break
+                    else:
+                        delay = (1.0 - self.tokens) / self.rate
+
+                time.sleep(min(delay, 1.0))
+        finally:
+            waited = time.monotonic() - start
+            with self.lock:
+                self.waiting -= 1
+                self.acquired += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+
+        return waited
+
+    def throttle(self, retry_after):
+        """Back off after a throttled response"""
+        with self.lock:
+            self.throttled += 1
+            self.rate = max(self.min_rate, self.rate / 2.0)
+            self.tokens = 0.0
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+    def recover(self):
+        """Additively restore the rate after a successful request"""
+        with self.lock:
+            if self.rate < self.base_rate:
+                self.rate = min(self.base_rate, self.rate + self.base_rate / 16.0)
+
+    def get_metrics(self):
+        with self.lock:
+            return {
+                "rate": round(self.rate, 4),
+                "base_rate": self.base_rate,
+                "burst": self.capacity,
+                "queue_depth": self.waiting,
+                "max_queue_depth": self.max_waiting,
+                "requests": self.acquired,
+                "throttled": self.throttled,
+                "total_wait_s": round(self.total_wait, 3),
+                "avg_wait_s": round(self.total_wait / self.acquired, 3) if self.acquired else 0.0,
+                "max_wait_s": round(self.max_wait, 3),
+                "blocked_for_s": round(max(0.0, self.blocked_until - time.monotonic()), 3),
+            }
+
+
+class RateLimiter:
+    """
+    Process-wide limiter for World Labs API traffic, one token bucket per endpoint.
+    Concurrent generations are capped by the job scheduler (worldlabs_job_queue).
+    """
+
+    def __init__(self, buckets=None, max_retries=DEFAULT_MAX_RETRIES):
+        buckets = buckets or DEFAULT_BUCKETS
+        self.buckets = {
+            name: TokenBucket(name, rate, burst)
+            for name, (rate, burst) in buckets.items()
+        }
+        self.max_retries = max_retries
+
+    @classmethod
+    def from_env(cls):
+        """Build a limiter using WORLDLABS_RATE_* overrides"""
+        buckets = {}
+        for name, (rate, burst) in DEFAULT_BUCKETS.items():
+            override = os.getenv(f"WORLDLABS_RATE_{name.upper()}", "")
+            if override:
+                rate_str, _, burst_str = override.partition(",")
+                try:
+                    new_rate = float(rate_str)
+                    new_burst = float(burst_str) if burst_str else burst
+                except ValueError:
+                    new_rate = new_burst = 0.0
+                # Only replace the defaults once both values are valid
+                if new_rate > 0 and new_burst >= 1:
+                    rate, burst = new_rate, new_burst
+                else:
+                    print(f"[WorldLabs] Warning: Ignoring invalid WORLDLABS_RATE_{name.upper()}={override!r}")
+            buckets[name] = (rate, burst)
+
+        return cls(buckets)
+
+    @staticmethod
+    def should_retry(method, response):
+        """
+        Idempotent requests are retried on 429 and 502/503/504. Other methods
+        only on a 429 with Retry-After, where the server rejected the request
+        outright, so a generation is never submitted twice.
+        """
+        if method.upper() in IDEMPOTENT_METHODS:
+            return response.status_code == 429 or response.status_code in RETRY_SERVER_ERRORS
+        return response.status_code == 429 and bool(response.headers.get("Retry-After"))
+
+    def request(self, bucket, method, url, **kwargs):
+        """
+        Send an HTTP request through the named bucket.
+        Retryable responses (see should_retry) are resent after the server's
+        Retry-After delay (exponential backoff without one); the last response is returned if retries are exhausted.
+        Throttled responses (429/503) slow the bucket down either way.
+        """
+        token_bucket = self.buckets[bucket]
+        attempt = 0
+
+        while True:
+            token_bucket.acquire()
+            response = requests.request(method, url, **kwargs)
+            retryable = self.should_retry(method, response)
+
+            if response.status_code not in THROTTLE_STATUS_CODES and not retryable:
+                token_bucket.recover()
+                return response
+
+            # Exponential fallback when the server does not say how long to wait
+            retry_after = parse_retry_after(
+                response.headers.get("Retry-After"),
+                default=min(60.0, 2.0 ** attempt)
+            )
+            if response.status_code in THROTTLE_STATUS_CODES:
+                token_bucket.throttle(retry_after)
+
+            if not retryable or attempt >= self.max_retries:
+                return response
+
+            attempt += 1
+            print(
+                f"[WorldLabs] {'Rate limited' if response.status_code == 429 else 'Server error'} "
+                f"on {bucket} ({response.status_code}), "
+                f"retrying in {retry_after:.1f}s (attempt {attempt}/{self.max_retries})"
+            )
+            response.close()
+            if response.status_code not in THROTTLE_STATUS_CODES:
+                # Only throttling blocks the bucket; back off this request alone
+                time.sleep(retry_after)
+
+    def get_metrics(self):
+        """Snapshot of queue depth, wait times and throttling per bucket"""
+        return {"buckets": {name: bucket.get_metrics() for name, bucket in self.buckets.items()}}
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Process-wide rate limiter shared by every node, created on first use"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter.from_env()
+        return _limiter
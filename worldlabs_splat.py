@@ -0,0 +1,376 @@
+"""
+World Labs ComfyUI Nodes - Gaussian Splats
+Decoded splat data (the WORLDLABS_SPLAT type) with PLY/SPZ readers and
+SPZ/PLY writers
+"""
+
+import io
+import gzip
+import math
+import struct
+
+from .worldlabs_lazy import lazy_import
+
+np = lazy_import("numpy")
+
+
+SPZ_MAGIC = 0x5053474E  # "NGSP"
+SPZ_FLAG_ANTIALIASED = 0x1
+
+# SPZ fixed quantization constants
+COLOR_SCALE = 0.15
+SH1_BITS = 5
+SH_REST_BITS = 4
+
+# SH coefficients per color channel beyond the DC term, by degree
+SH_DIMENSIONS = {0: 0, 1: 3, 2: 8, 3: 15}
+
+DEFAULT_FRACTIONAL_BITS = 12
+DEFAULT_ROTATION_BITS = 8
+ROTATION_BITS = (8, 10)  # 8: SPZ v2 (xyz bytes), 10: SPZ v3 (smallest three)
+CHUNK_POINTS = 1 << 16    # points encoded per pass while streaming to gzip
+
+
+def sh_degree_for(dimensions):
+    for degree, count in SH_DIMENSIONS.items():
+        if count == dimensions:
+            return degree
+    raise ValueError(f"Unsupported number of SH coefficients: {dimensions}")
+
+
+class SplatData:
+    """
+    Gaussian splats in PLY conventions: positions [N, 3], log scales [N, 3],
+    unit quaternions [N, 4] as (x, y, z, w), opacity logits [N], SH DC colors
+    [N, 3] and higher-order SH [N, coefficients, 3] (float32 throughout)
+    """
+
+    __slots__ = ("positions", "scales", "rotations", "opacities", "colors", "sh", "antialiased")
+
+    def __init__(self, positions, scales, rotations, opacities, colors, sh=None, antialiased=False):
+        self.positions = positions
+        self.scales = scales
+        self.rotations = rotations
+        self.opacities = opacities
+        self.colors = colors
+        self.sh = sh if sh is not None else np.zeros((len(positions), 0, 3), dtype=np.float32)
+        self.antialiased = antialiased
+
+    @property
+    def count(self):
+        return len(self.positions)
+
+    @property
+    def sh_degree(self):
+        return sh_degree_for(self.sh.shape[1])
+
+    def truncate_sh(self, degree):
+        """Copy keeping SH coefficients up to degree (no-op if already at or below it)"""
+        if degree >= self.sh_degree:
+            return self
+        return SplatData(self.positions, self.scales, self.rotations, self.opacities, self.colors,
+                         self.sh[:, :SH_DIMENSIONS[degree]], self.antialiased)
+
+    def select(self, mask_or_indices):
+        """Subset of splats (boolean mask or index array)"""
+        return SplatData(
+            self.positions[mask_or_indices], self.scales[mask_or_indices], self.rotations[mask_or_indices],
+            self.opacities[mask_or_indices], self.colors[mask_or_indices], self.sh[mask_or_indices],
+            self.antialiased,
+        )
+
+    def __repr__(self):
+        return f"SplatData(count={self.count}, sh_degree={self.sh_degree})"
+
+
+def normalize_quaternions(rotations):
+    length = np.linalg.norm(rotations, axis=1, keepdims=True)
+    return (rotations / np.where(length > 0, length, 1.0)).astype(np.float32)
+
+
+def sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def inverse_sigmoid(y):
+    y = np.clip(y, 1e-6, 1 - 1e-6)
+    return np.log(y / (1.0 - y))
+
+
+def to_uint8(values):
+    return np.clip(np.round(values), 0, 255).astype(np.uint8)
+
+
+# ---------------------------------------------------------------------------
+# PLY
+# ---------------------------------------------------------------------------
+
+PLY_TYPES = {
+    "char": "i1", "uchar": "u1", "short": "<i2", "ushort": "<u2", "int": "<i4", "uint": "<u4",
+    "float": "<f4", "double": "<f8",
+    "int8": "i1", "uint8": "u1", "int16": "<i2", "uint16": "<u2", "int32": "<i4", "uint32": "<u4",
+    "float32": "<f4", "float64": "<f8",
+}
+
+
+def read_ply(data):
+    """Decode a binary little-endian 3D Gaussian Splatting PLY"""
+    header_end = data.find(b"end_header\n")
+    if not data.startswith(b"ply") or header_end < 0:
+        raise ValueError("Not a PLY file")
+
+    count = 0
+    fields = []
+    in_vertex = False
+    for line in data[:header_end].decode("ascii", "replace").splitlines():
+        parts = line.split()
+        if not parts:
+            continue
+        if parts[0] == "format" and parts[1] != "binary_little_endian":
+            raise ValueError(f"Unsupported PLY format: {parts[1]} (expected binary_little_endian)")
+        if parts[0] == "element":
+            in_vertex = parts[1] == "vertex"
+            if in_vertex:
+                count = int(parts[2])
+        elif parts[0] == "property" and in_vertex:
+            if parts[1] == "list":
+                raise ValueError("PLY list properties are not supported for splats")
+            fields.append((parts[2], PLY_TYPES[parts[1]]))
+
+    vertices = np.frombuffer(data, dtype=np.dtype(fields), count=count, offset=header_end + len("end_header\n"))
+    names = vertices.dtype.names
+
+    def columns(*keys):
+        return np.stack([vertices[key].astype(np.float32) for key in keys], axis=1)
+
+    rest = sorted((name for name in names if name.startswith("f_rest_")), key=lambda name: int(name[7:]))
+    dimensions = len(rest) // 3
+    sh_degree_for(dimensions)
+    # PLY stores higher-order SH channel-major: all red coefficients, then green, then blue
+    sh = columns(*rest).reshape(count, 3, dimensions).transpose(0, 2, 1) if rest else None
+
+    return SplatData(
+        positions=columns("x", "y", "z"),
+        scales=columns("scale_0", "scale_1", "scale_2"),
+        # PLY quaternions are (w, x, y, z)
+        rotations=normalize_quaternions(columns("rot_1", "rot_2", "rot_3", "rot_0")),
+        opacities=vertices["opacity"].astype(np.float32),
+        colors=columns("f_dc_0", "f_dc_1", "f_dc_2"),
+        sh=np.ascontiguousarray(sh) if sh is not None else None,
+    )
+
+
+def write_ply(splats, f):
+    """Write float32 binary PLY in the standard 3D Gaussian Splatting layout"""
+    dimensions = splats.sh.shape[1]
+    names = (
+        ["x", "y", "z", "nx", "ny", "nz", "f_dc_0", "f_dc_1", "f_dc_2"]
+        + [f"f_rest_{i}" for i in range(dimensions * 3)]
+        + ["opacity", "scale_0", "scale_1", "scale_2", "rot_0", "rot_1", "rot_2", "rot_3"]
+    )
+    header = ["ply", "format binary_little_endian 1.0", f"element vertex {splats.count}"]
+    header += [f"property float {name}" for name in names]
+    header.append("end_header\n")
+    f.write("\n".join(header).encode("ascii"))
+
+    for start in range(0, splats.count, CHUNK_POINTS):
+        end = min(start + CHUNK_POINTS, splats.count)
+        rotations = splats.rotations[start:end]
+        block = np.concatenate([
+            splats.positions[start:end],
+            np.zeros((end - start, 3), dtype=np.float32),
+            splats.colors[start:end],
+            splats.sh[start:end].transpose(0, 2, 1).reshape(end - start, dimensions * 3),
+            splats.opacities[start:end, None],
+            splats.scales[start:end],
+            rotations[:, 3:4],
+            rotations[:, :3],
+        ], axis=1)
+        f.write(block.astype("<f4").tobytes())
+
+
+# ---------------------------------------------------------------------------
+# SPZ
+# ---------------------------------------------------------------------------
+
+def unpack_rotations_v2(packed):
+    xyz = packed.reshape(-1, 3).astype(np.float32) / 127.5 - 1.0
+    w = np.sqrt(np.maximum(0.0, 1.0 - np.sum(xyz * xyz, axis=1, keepdims=True)))
+    return np.concatenate([xyz, w], axis=1)
+
+
+def pack_rotations_v2(rotations):
+    # q and -q are the same rotation; store xyz of the w >= 0 form
+    sign = np.where(rotations[:, 3:4] < 0, -1.0, 1.0)
+    return to_uint8((rotations[:, :3] * sign) * 127.5 + 127.5)
+
+
+def unpack_rotations_v3(packed):
+    """Smallest three: 2-bit largest index, then 3 x (sign bit + 9-bit magnitude)"""
+    words = packed.reshape(-1, 4).astype(np.uint32)
+    words = words[:, 0] | (words[:, 1] << 8) | (words[:, 2] << 16) | (words[:, 3] << 24)
+    largest = (words >> 30).astype(np.int64)
+    mask = (1 << 9) - 1
+
+    rotations = np.zeros((len(words), 4), dtype=np.float32)
+    remaining = words.copy()
+    squares = np.zeros(len(words), dtype=np.float32)
+    for component in (3, 2, 1, 0):
+        present = largest != component
+        magnitude = (remaining & mask).astype(np.float32) * (math.sqrt(0.5) / mask)
+        negative = ((remaining >> 9) & 1).astype(bool)
+        value = np.where(negative, -magnitude, magnitude)
+        rotations[present, component] = value[present]
+        squares += np.where(present, value * value, 0.0)
+        remaining = np.where(present, remaining >> 10, remaining)
+
+    rotations[np.arange(len(words)), largest] = np.sqrt(np.maximum(0.0, 1.0 - squares))
+    return rotations
+
+
+def pack_rotations_v3(rotations):
+    largest = np.argmax(np.abs(rotations), axis=1)
+    negate = rotations[np.arange(len(rotations)), largest] < 0
+    mask = (1 << 9) - 1
+
+    words = largest.astype(np.uint32)
+    for component in range(4):
+        present = largest != component
+        value = rotations[:, component]
+        negative = ((value < 0) ^ negate).astype(np.uint32)
+        magnitude = np.minimum(
+            (mask * (np.abs(value) / math.sqrt(0.5)) + 0.5).astype(np.uint32), mask
+        )
+        words = np.where(present, (words << 10) | (negative << 9) | magnitude, words)
+
+    return words.astype("<u4").view(np.uint8).reshape(-1, 4)
+
+
+def quantize_sh(values, bits):
+    bucket = 1 << (8 - bits)
+    quantized = np.round(values * 128.0 + 128.0).astype(np.int32)
+    quantized = (quantized + bucket // 2) // bucket * bucket
+    return np.clip(quantized, 0, 255).astype(np.uint8)
+
+
+def read_spz(data):
+    """Decode a (gzipped) SPZ file, versions 2 and 3"""
+    raw = gzip.decompress(data) if data[:2] == b"\x1f\x8b" else data
+    magic, version, count, sh_degree, fractional_bits, flags, _ = struct.unpack_from("<IIIBBBB", raw, 0)
+    if magic != SPZ_MAGIC:
+        raise ValueError("Not an SPZ file (bad magic)")
+    if version not in (2, 3):
+        raise ValueError(f"Unsupported SPZ version: {version}")
+
+    dimensions = SH_DIMENSIONS[sh_degree]
+    offset = 16
+
+    def take(length):
+        nonlocal offset
+        chunk = np.frombuffer(raw, dtype=np.uint8, count=length, offset=offset)
+        offset += length
+        return chunk
+
+    position_bytes = take(count * 9).reshape(-1, 3).astype(np.int32)
+    fixed = position_bytes[:, 0] | (position_bytes[:, 1] << 8) | (position_bytes[:, 2] << 16)
+    fixed = np.where(fixed & 0x800000, fixed - (1 << 24), fixed)
+    positions = (fixed.astype(np.float32) / (1 << fractional_bits)).reshape(count, 3)
+
+    opacities = inverse_sigmoid(take(count).astype(np.float32) / 255.0).astype(np.float32)
+    colors = ((take(count * 3).astype(np.float32) / 255.0 - 0.5) / COLOR_SCALE).reshape(count, 3)
+    scales = (take(count * 3).astype(np.float32) / 16.0 - 10.0).reshape(count, 3)
+
+    if version == 2:
+        rotations = unpack_rotations_v2(take(count * 3))
+    else:
+        rotations = unpack_rotations_v3(take(count * 4))
+
+    sh = ((take(count * dimensions * 3).astype(np.float32) - 128.0) / 128.0).reshape(count, dimensions, 3)
+
+    return SplatData(positions, scales, normalize_quaternions(rotations), opacities, colors, sh,
+                     antialiased=bool(flags & SPZ_FLAG_ANTIALIASED))
+
+
+def max_fractional_bits(splats):
+    """Most fractional bits whose 24-bit fixed point range still covers every position"""
+    extent = float(np.abs(splats.positions).max()) if splats.count else 0.0
+    bits = 23
+    while bits > 0 and extent * (1 << bits) >= (1 << 23) - 1:
+        bits -= 1
+    return bits
+
+
+def write_spz(splats, f, fractional_bits=DEFAULT_FRACTIONAL_BITS, rotation_bits=DEFAULT_ROTATION_BITS,
+              sh_degree=3, compresslevel=6):
+    """
+    Encode splats as SPZ into a binary file object. Sections are quantized
+    CHUNK_POINTS at a time and streamed through gzip, so memory stays bounded.
+    Returns the effective (fractional_bits, sh_degree, version).
+    """
+    if rotation_bits not in ROTATION_BITS:
+        raise ValueError(f"rotation_bits must be one of {ROTATION_BITS}")
+
+    splats = splats.truncate_sh(sh_degree)
+    sh_degree = splats.sh_degree
+    version = 3 if rotation_bits == 10 else 2
+
+    fitted = max_fractional_bits(splats)
+    if fractional_bits > fitted:
+        print(f"[WorldLabs] Positions exceed the 24-bit range at {fractional_bits} fractional bits, using {fitted}")
+        fractional_bits = fitted
+
+    count = splats.count
+    flags = SPZ_FLAG_ANTIALIASED if splats.antialiased else 0
+    scale = float(1 << fractional_bits)
+    sh1_count = min(3, splats.sh.shape[1])
+
+    def chunks():
+        for start in range(0, count, CHUNK_POINTS):
+            yield slice(start, min(start + CHUNK_POINTS, count))
+
+    with gzip.GzipFile(fileobj=f, mode="wb", compresslevel=compresslevel, mtime=0) as stream:
+        stream.write(struct.pack("<IIIBBBB", SPZ_MAGIC, version, count, sh_degree, fractional_bits, flags, 0))
+
+        for part in chunks():
+            fixed = np.round(splats.positions[part].astype(np.float64) * scale).astype(np.int32).reshape(-1)
+            stream.write((fixed.astype("<i4").view(np.uint8).reshape(-1, 4)[:, :3]).tobytes())
+
+        for part in chunks():
+            stream.write(to_uint8(sigmoid(splats.opacities[part].astype(np.float64)) * 255.0).tobytes())
+
+        for part in chunks():
+            stream.write(to_uint8(splats.colors[part] * (COLOR_SCALE * 255.0) + 0.5 * 255.0).tobytes())
+
+        for part in chunks():
+            stream.write(to_uint8((splats.scales[part] + 10.0) * 16.0).tobytes())
+
+        for part in chunks():
+            rotations = normalize_quaternions(splats.rotations[part])
+            packed = pack_rotations_v3(rotations) if version == 3 else pack_rotations_v2(rotations)
+            stream.write(packed.tobytes())
+
+        for part in chunks():
+            sh = splats.sh[part]
+            # Degree-1 coefficients keep more precision than higher degrees
+            stream.write(np.concatenate([
+                quantize_sh(sh[:, :sh1_count], SH1_BITS),
+                quantize_sh(sh[:, sh1_count:], SH_REST_BITS),
+            ], axis=1).tobytes())
+
+    return fractional_bits, sh_degree, version
+
+
+def load_splats(path):
+    """Read a .spz or .ply file into SplatData"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data.startswith(b"ply"):
+        return read_ply(data)
+    return read_spz(data)
+
+
+def encode_spz(splats, **options):
+    """SPZ bytes for splats (see write_spz for options)"""
+    buffer = io.BytesIO()
+    write_spz(splats, buffer, **options)
+    return buffer.getvalue()
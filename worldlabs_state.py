@@ -0,0 +1,70 @@
+"""
+World Labs ComfyUI Nodes - Local State
+Location and connection helpers for the package's on-disk state (SQLite, indexes)
+and the output directory nodes write to
+"""
+
+import os
+import sqlite3
+
+
+STATE_DB_NAME = "worldlabs.db"
+
+_output_dir_override = None
+
+
+def env_int(name, default, minimum=None):
+    """Integer environment override; an unset or invalid value falls back to default"""
+    value = os.getenv(name, "").strip()
+    if not value:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        print(f"[WorldLabs] Warning: Ignoring invalid {name}={value!r}")
+        return default
+    return number if minimum is None else max(minimum, number)
+
+
+def get_state_dir():
+    """Directory for persistent package state (WORLDLABS_STATE_DIR overrides)"""
+    state_dir = os.getenv("WORLDLABS_STATE_DIR", "")
+    if not state_dir:
+        state_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "state")
+
+    os.makedirs(state_dir, exist_ok=True)
+    return state_dir
+
+
+def set_output_directory(path):
+    """Use path instead of ComfyUI's output directory (e.g. for headless runs)"""
+    global _output_dir_override
+    _output_dir_override = os.path.abspath(path) if path else None
+
+
+def get_output_directory():
+    """
+    Directory nodes save files to: an explicit override, then WORLDLABS_OUTPUT_DIR,
+    then ComfyUI's output directory (folder_paths is only imported in that case)
+    """
+    output_dir = _output_dir_override or os.getenv("WORLDLABS_OUTPUT_DIR", "")
+    if not output_dir:
+        import folder_paths
+        output_dir = folder_paths.get_output_directory()
+
+    os.makedirs(output_dir, exist_ok=True)
+    return output_dir
+
+
+def connect(db_name=STATE_DB_NAME):
+    """Open a SQLite connection in the state directory, shareable across threads"""
+    conn = sqlite3.connect(
+        os.path.join(get_state_dir(), db_name),
+        timeout=30,
+        check_same_thread=False,
+        isolation_level=None,
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
@@ -0,0 +1,184 @@
+"""
+World Labs ComfyUI Nodes - Panorama Tiles
+Multi-resolution equirectangular tile pyramids for Photo Sphere Viewer's tiles adapter
+"""
+
+import os
+import json
+import math
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from .worldlabs_lazy import lazy_import
+from .worldlabs_state import env_int
+
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
+
+
+PYRAMID_VERSION = 1
+DEFAULT_TILE_SIZE = 512
+DEFAULT_QUALITY = 85
+BASE_WIDTH = 2048  # low-resolution full panorama shown while tiles load
+MIN_COLS = 4       # coarsest tiled level is 4x2 tiles
+
+
+def get_tile_workers():
+    """Tile encoding processes (WORLDLABS_TILE_WORKERS overrides)"""
+    default = min(8, os.cpu_count() or 1)
+    return env_int("WORLDLABS_TILE_WORKERS", default, 1)
+
+
+def plan_levels(width, tile_size=DEFAULT_TILE_SIZE):
+    """
+    Pyramid levels as (width, cols, rows), coarsest first. Every level is 2:1
+    with a power-of-two column count; the last level keeps the full width.
+    """
+    top_cols = MIN_COLS
+    while top_cols * tile_size < width:
+        top_cols *= 2
+
+    levels = []
+    cols = MIN_COLS
+    while cols <= top_cols:
+        level_width = cols * tile_size if cols < top_cols else (width // cols) * cols
+        levels.append((level_width, cols, cols // 2))
+        cols *= 2
+
+    return levels
+
+
+def zoom_ranges(count):
+    """Split Photo Sphere Viewer's 0-100 zoom range evenly across levels"""
+    return [[round(i * 100 / count), round((i + 1) * 100 / count)] for i in range(count)]
+
+
+def encode_tile_row(task):
+    """
+    Resample one row of tiles for a level from the memory-mapped source and
+    save each tile as JPEG. Runs in a worker process.
+    """
+    source_path, level_dir, level_width, cols, rows, row, quality = task
+
+    pano = np.load(source_path, mmap_mode="r")
+    source_height, source_width = pano.shape[:2]
+    tile = level_width // cols
+
+    # Source rows covered by this tile row (fractional, resampled exactly via box)
+    y0 = row * source_height / rows
+    y1 = (row + 1) * source_height / rows
+    top = int(math.floor(y0))
+    bottom = min(source_height, int(math.ceil(y1)))
+
+    band = Image.fromarray(np.ascontiguousarray(pano[top:bottom]))
+    band = band.resize((level_width, tile), Image.LANCZOS, box=(0, y0 - top, source_width, y1 - top))
+
+    for col in range(cols):
+        band.crop((col * tile, 0, (col + 1) * tile, tile)).save(
+            os.path.join(level_dir, f"{col}_{row}.jpg"), format="JPEG", quality=quality
+        )
+
+    return cols
+
+
+def run_tasks(tasks, workers):
+    """Encode tile rows in a process pool, falling back to threads where processes can't start"""
+    # multiprocessing is slow to import; only load it when tiles are built
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
+
+    # Only failures to start or keep the worker processes fall back; task errors propagate
+    try:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    except (ImportError, NotImplementedError, OSError) as e:
+        print(f"[WorldLabs] Process pool unavailable ({e}), encoding tiles with threads")
+    else:
+        with executor:
+            try:
+                # Submitting spawns the worker processes
+                futures = [executor.submit(encode_tile_row, task) for task in tasks]
+            except OSError as e:
+                executor.shutdown(cancel_futures=True)
+                print(f"[WorldLabs] Process pool unavailable ({e}), encoding tiles with threads")
+            else:
+                try:
+                    return sum(future.result() for future in futures)
+                except BrokenProcessPool as e:
+                    print(f"[WorldLabs] Process pool failed ({e}), encoding tiles with threads")
+
+    # PIL releases the GIL while resampling and encoding
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="worldlabs-tiles") as executor:
+        return sum(executor.map(encode_tile_row, tasks))
+
+
+def build_tile_pyramid(pano_path, out_dir, tile_size=DEFAULT_TILE_SIZE, quality=DEFAULT_QUALITY, workers=None):
+    """
+    Build (or reuse) a tile pyramid for an equirectangular panorama in out_dir.
+    Returns the pyramid config: base image, and per-level width/cols/rows/zoomRange.
+    """
+    config_path = os.path.join(out_dir, "tiles.json")
+    source_name = os.path.basename(pano_path)
+
+    if os.path.exists(config_path):
+        with open(config_path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        if (config.get("version") == PYRAMID_VERSION and config.get("source") == source_name
+                and config.get("tile_size") == tile_size and config.get("quality") == quality):
+            print(f"[WorldLabs] Reusing panorama tiles in {out_dir}")
+            return config
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    with Image.open(pano_path) as pil_image:
+        pil_image = pil_image.convert("RGB")
+        width = pil_image.width
+        if pil_image.height * 2 != width:
+            # Equirectangular panoramas are 2:1; correct small deviations
+            pil_image = pil_image.resize((width, width // 2), Image.LANCZOS)
+
+        base_width = min(width, BASE_WIDTH)
+        pil_image.resize((base_width, base_width // 2), Image.LANCZOS).save(
+            os.path.join(out_dir, "base.jpg"), format="JPEG", quality=quality
+        )
+        pano = np.asarray(pil_image)
+
+    levels = plan_levels(width, tile_size)
+    ranges = zoom_ranges(len(levels))
+
+    # Workers memory-map the decoded panorama instead of each decoding the source
+    scratch_dir = tempfile.mkdtemp(prefix="scratch_", dir=out_dir)
+    try:
+        source_path = os.path.join(scratch_dir, "pano.npy")
+        np.save(source_path, pano)
+        del pano
+
+        tasks = []
+        # Largest levels first so the longest tasks start early
+        for index in reversed(range(len(levels))):
+            level_width, cols, rows = levels[index]
+            level_dir = os.path.join(out_dir, str(index))
+            os.makedirs(level_dir, exist_ok=True)
+            tasks.extend((source_path, level_dir, level_width, cols, rows, row, quality) for row in range(rows))
+
+        tile_count = run_tasks(tasks, workers or get_tile_workers())
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    config = {
+        "version": PYRAMID_VERSION,
+        "source": source_name,
+        "tile_size": tile_size,
+        "quality": quality,
+        "base": "base.jpg",
+        "levels": [
+            {"width": level_width, "cols": cols, "rows": rows, "zoomRange": zoom_range}
+            for (level_width, cols, rows), zoom_range in zip(levels, ranges)
+        ],
+    }
+
+    with open(config_path, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+    print(f"[WorldLabs] Built {len(levels)} panorama levels ({tile_count} tiles) in {out_dir}")
+    return config
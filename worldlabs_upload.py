@@ -0,0 +1,169 @@
+"""
+World Labs ComfyUI Nodes - Upload Pipeline
+Pre-provisioned media-asset upload slots and streaming JPEG encoding
+"""
+
+import time
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .worldlabs_state import env_int
+from .worldlabs_profiling import profile_call
+
+
+DEFAULT_POOL_SIZE = 2
+# Signed upload URLs expire; don't hand out slots older than this
+DEFAULT_SLOT_MAX_AGE = 600
+
+
+class UploadSlotPool:
+    """
+    Hands out (media_asset_id, upload_url, required_headers) slots.
+    acquire() returns a Future so the prepare_upload round-trip overlaps with
+    image encoding. Pre-provisioned slots are media assets on the account, so
+    the pool is only topped up in the background once a batch is evident: a
+    second acquire within max_age of the previous one, or batch mode set by the
+    caller. A one-off generation prepares exactly one slot. Slots that expire
+    unused are logged, and the acquire that finds them doesn't refill the pool.
+    """
+
+    def __init__(self, size=DEFAULT_POOL_SIZE, max_age=DEFAULT_SLOT_MAX_AGE):
+        self.size = size
+        self.max_age = max_age
+        self.batch = False
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="worldlabs-upload")
+        self.lock = threading.Lock()
+        # api_key -> list of (prepared_at, slot)
+        self.slots = {}
+        self.refilling = {}
+        self.last_acquired = {}
+
+    @classmethod
+    def from_env(cls):
+        """Build a pool using the WORLDLABS_UPLOAD_POOL_SIZE override (0 disables pre-provisioning)"""
+        return cls(size=env_int("WORLDLABS_UPLOAD_POOL_SIZE", DEFAULT_POOL_SIZE, 0))
+
+    def set_batch_mode(self, enabled=True):
+        """Pre-provision from the first acquire (callers that know many generations follow)"""
+        self.batch = bool(enabled)
+
+    def acquire(self, api_key, prepare):
+        """Return a Future resolving to a fresh upload slot; prepare(api_key) creates one"""
+        now = time.time()
+
+        with self.lock:
+            slots = self.slots.get(api_key, [])
+            available = [entry for entry in slots if now - entry[0] < self.max_age]
+            expired = len(slots) - len(available)
+            slot = available.pop(0)[1] if available else None
+            self.slots[api_key] = available
+
+            previous = self.last_acquired.get(api_key)
+            self.last_acquired[api_key] = now
+            # Slots outlived the gap between generations: provisioning more would only waste them
+            in_batch = not expired and (self.batch or (previous is not None and now - previous < self.max_age))
+
+        if expired:
+            print(
+                f"[WorldLabs] Discarded {expired} pre-provisioned upload slot(s) older than {self.max_age}s; "
+                f"their media assets stay unused. Not pre-provisioning until generations come faster."
+            )
+
+        if slot is not None:
+            print(f"[WorldLabs] Using pre-provisioned media asset {slot[0]}")
+            future = Future()
+            future.set_result(slot)
+        else:
+            future = self.executor.submit(profile_call(prepare), api_key)
+
+        if in_batch:
+            self._refill(api_key, prepare)
+        return future
+
+    def _refill(self, api_key, prepare):
+        with self.lock:
+            missing = self.size - len(self.slots.get(api_key, [])) - self.refilling.get(api_key, 0)
+            if missing <= 0:
+                return
+            self.refilling[api_key] = self.refilling.get(api_key, 0) + missing
+
+        for _ in range(missing):
+            self.executor.submit(self._provision, api_key, prepare)
+
+    def _provision(self, api_key, prepare):
+        try:
+            slot = prepare(api_key)
+        except Exception as e:
+            print(f"[WorldLabs] Warning: Failed to pre-provision upload slot: {e}")
+            slot = None
+
+        with self.lock:
+            self.refilling[api_key] -= 1
+            if slot is not None:
+                self.slots.setdefault(api_key, []).append((time.time(), slot))
+
+
+class JpegEncodeStream:
+    """
+    Encodes a PIL image to JPEG on a background thread.
+    Iterating yields encoded chunks as soon as they are produced, so an upload
+    can start before encoding finishes; getvalue() returns the complete bytes.
+    """
+
+    def __init__(self, pil_image, quality=95):
+        self.chunks = queue.Queue()
+        self.parts = []
+        self.error = None
+        self.finished = False
+        self.thread = threading.Thread(
+            target=self._encode, args=(pil_image, quality), name="worldlabs-jpeg", daemon=True
+        )
+        self.thread.start()
+
+    # File-like interface for PIL's encoder
+    def write(self, data):
+        self.chunks.put(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def _encode(self, pil_image, quality):
+        try:
+            pil_image.save(self, format="JPEG", quality=quality)
+        except BaseException as e:
+            self.error = e
+        finally:
+            self.chunks.put(None)
+
+    def __iter__(self):
+        while not self.finished:
+            chunk = self.chunks.get()
+            if chunk is None:
+                self.finished = True
+                break
+            self.parts.append(chunk)
+            yield chunk
+
+        if self.error is not None:
+            raise self.error
+
+    def getvalue(self):
+        """Wait for encoding to finish and return the full JPEG bytes"""
+        for _ in self:
+            pass
+        return b"".join(self.parts)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_upload_pool():
+    """Process-wide upload slot pool, created on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = UploadSlotPool.from_env()
+        return _pool
@@ -4,8 +4,16 @@ Provides web-based viewers for splats, meshes, and panoramas
 """
 
 import os
-import webbrowser
-import folder_paths
+import json
+
+from .worldlabs_lazy import lazy_import
+from .worldlabs_world import WorldData
+from .worldlabs_state import get_output_directory
+from .worldlabs_asset_cache import get_asset_cache
+from .worldlabs_progress import wait_for
+from .worldlabs_tiles import DEFAULT_QUALITY, DEFAULT_TILE_SIZE, build_tile_pyramid
+
+webbrowser = lazy_import("webbrowser")
 
 
 class WorldLabsViewer:
@@ -42,23 +50,16 @@ class WorldLabsViewer:
 
     def get_asset_url(self, world_data, quality, viewer_type):
         """Get the appropriate asset URL based on quality and viewer type"""
-        assets = world_data.get("assets", {})
+        world = WorldData.coerce(world_data)
 
         if viewer_type == "splat":
-            # Splats are under assets.splats.spz_urls
-            splats = assets.get("splats", {})
-            spz_urls = splats.get("spz_urls", {})
-            return spz_urls.get(quality, "")
+            return world.splat_url(quality)
 
         elif viewer_type == "mesh":
-            # Mesh is under assets.mesh.collider_mesh_url
-            mesh = assets.get("mesh", {})
-            return mesh.get("collider_mesh_url", "")
+            return world.asset_url("mesh")
 
         elif viewer_type == "panorama":
-            # Panorama is under assets.imagery.pano_url
-            imagery = assets.get("imagery", {})
-            return imagery.get("pano_url", "")
+            return world.asset_url("pano")
 
         return ""
 
@@ -425,28 +426,32 @@ class WorldLabsViewer:
 </html>
 """
 
-    def display_world(self, world_data, quality, viewer_type):
-        """Generate HTML viewer and save to file, then open in browser"""
-        marble_url = world_data.get("world_marble_url", "")
-        world_id = world_data.get("world_id", "")
-        world_name = world_data.get("display_name", "World Labs 3D World")
+    def get_viewer_path(self, world_data, label):
+        """Path of a viewer page in the output directory's worldlabs_viewers subfolder"""
+        world_name = world_data.display_name or "World Labs 3D World"
 
         # Get output directory and create viewer subfolder
-        output_dir = folder_paths.get_output_directory()
+        output_dir = get_output_directory()
         viewer_dir = os.path.join(output_dir, "worldlabs_viewers")
         os.makedirs(viewer_dir, exist_ok=True)
 
         # Generate filename
         safe_name = "".join(c for c in world_name if c.isalnum() or c in (' ', '-', '_')).strip()
         safe_name = safe_name.replace(' ', '_')
-        html_filename = f"{safe_name}_{viewer_type}_{quality}_{world_id[:8]}.html"
-        html_path = os.path.join(viewer_dir, html_filename)
+        return os.path.join(viewer_dir, f"{safe_name}_{label}_{world_data.world_id[:8]}.html")
+
+    def write_viewer(self, world_data, quality, viewer_type):
+        """Generate HTML viewer and save it to the output directory; returns the file path"""
+        world_data = WorldData.coerce(world_data)
+        marble_url = world_data.marble_url
+        world_name = world_data.display_name or "World Labs 3D World"
+        html_path = self.get_viewer_path(world_data, f"{viewer_type}_{quality}")
 
         asset_url = self.get_asset_url(world_data, quality, viewer_type)
 
         if not asset_url:
             print(f"\n[WorldLabs] Warning: No asset URL found for {viewer_type} at quality {quality}")
-            print(f"[WorldLabs] Available assets: {world_data.get('assets', {}).keys()}")
+            print(f"[WorldLabs] Available assets: {', '.join(world_data.asset_urls) or 'none'}")
 
             # Create error page with Marble link
             html = f"""
@@ -540,7 +545,9 @@ class WorldLabsViewer:
         print(f"\n   📁 Saved to: {html_path}")
         print("=" * 70 + "\n")
 
-        # Open in browser
+        return html_path
+
+    def open_in_browser(self, html_path, viewer_type):
         try:
             webbrowser.open('file://' + os.path.abspath(html_path))
             print(f"[WorldLabs] Opening {viewer_type} viewer in your default browser...")
@@ -548,15 +555,181 @@ class WorldLabsViewer:
             print(f"[WorldLabs] Could not auto-open browser: {e}")
             print(f"[WorldLabs] Please open manually: {html_path}")
 
+    def display_world(self, world_data, quality, viewer_type):
+        """Generate HTML viewer and save to file, then open in browser"""
+        html_path = self.write_viewer(world_data, quality, viewer_type)
+
+        # Open in browser
+        self.open_in_browser(html_path, viewer_type)
+
         return {}
 
 
+class WorldLabsPanoramaTiles(WorldLabsViewer):
+    """
+    Node to build a multi-resolution tile pyramid from a world's panorama and
+    open it in a tiled Photo Sphere Viewer page
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "world_data": ("WORLDLABS_WORLD",),
+                "tile_size": ([
+                    "256",
+                    "512",
+                    "1024"
+                ], {
+                    "default": str(DEFAULT_TILE_SIZE)
+                }),
+                "jpeg_quality": ("INT", {
+                    "default": DEFAULT_QUALITY,
+                    "min": 50,
+                    "max": 100,
+                    "step": 1
+                }),
+            },
+            "optional": {
+                "open_browser": ("BOOLEAN", {
+                    "default": True
+                }),
+            }
+        }
+
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("viewer_path", "tiles_dir")
+    FUNCTION = "build_tiles"
+    OUTPUT_NODE = True
+    CATEGORY = "WorldLabs"
+
+    def create_tiled_panorama_viewer_html(self, tiles_url, config, world_name):
+        """Create HTML for Photo Sphere Viewer with the equirectangular tiles adapter"""
+        panorama = {
+            "baseUrl": f"{tiles_url}/{config['base']}",
+            "levels": config["levels"],
+        }
+        return f"""
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>World Labs Panorama Viewer - {world_name}</title>
+    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/@photo-sphere-viewer/core@5.7.3/index.min.css"/>
+    <style>
+        body {{
+            margin: 0;
+            padding: 0;
+            overflow: hidden;
+            font-family: Arial, sans-serif;
+        }}
+        #viewer {{
+            width: 100vw;
+            height: 100vh;
+        }}
+        #info {{
+            position: absolute;
+            top: 10px;
+            left: 10px;
+            background: rgba(0, 0, 0, 0.7);
+            color: white;
+            padding: 10px 15px;
+            border-radius: 5px;
+            font-size: 14px;
+            z-index: 100;
+        }}
+    </style>
+</head>
+<body>
+    <div id="viewer"></div>
+    <div id="info">
+        <strong>{world_name}</strong><br>
+        360° Panorama ({len(config["levels"])} tiled levels)<br>
+        <small>Drag to look around | Scroll to zoom</small>
+    </div>
+
+    <!-- Pinned together: Photo Sphere Viewer 5.7 is built against three 0.161 -->
+    <script type="importmap">
+        {{
+            "imports": {{
+                "three": "https://cdn.jsdelivr.net/npm/three@0.161.0/build/three.module.js",
+                "@photo-sphere-viewer/core": "https://cdn.jsdelivr.net/npm/@photo-sphere-viewer/core@5.7.3/index.module.js",
+                "@photo-sphere-viewer/equirectangular-tiles-adapter": "https://cdn.jsdelivr.net/npm/@photo-sphere-viewer/equirectangular-tiles-adapter@5.7.3/index.module.js"
+            }}
+        }}
+    </script>
+
+    <script type="module">
+        import {{ Viewer }} from '@photo-sphere-viewer/core';
+        import {{ EquirectangularTilesAdapter }} from '@photo-sphere-viewer/equirectangular-tiles-adapter';
+
+        const panorama = {json.dumps(panorama)};
+        // Only tiles in view at the current zoom level are requested
+        panorama.tileUrl = (col, row, level) => `{tiles_url}/${{level}}/${{col}}_${{row}}.jpg`;
+
+        const viewer = new Viewer({{
+            container: document.querySelector('#viewer'),
+            adapter: EquirectangularTilesAdapter,
+            panorama: panorama,
+            navbar: [
+                'zoom',
+                'fullscreen',
+            ],
+            defaultZoomLvl: 0,
+            mousewheel: true,
+            mousemove: true,
+            loadingTxt: 'Loading panorama...',
+        }});
+
+        viewer.addEventListener('ready', () => {{
+            console.log('Panorama loaded successfully');
+        }});
+    </script>
+</body>
+</html>
+"""
+
+    def build_tiles(self, world_data, tile_size, jpeg_quality, open_browser=True):
+        """Download the panorama once, build its tile pyramid and write the tiled viewer page"""
+        world_data = WorldData.coerce(world_data)
+        pano_url = world_data.asset_url("pano")
+        if not pano_url:
+            raise ValueError(f"World {world_data.world_id} has no panorama asset")
+
+        print("[WorldLabs] Downloading panorama...")
+        pano_path = wait_for(get_asset_cache().fetch(pano_url))
+
+        tiles_dir = os.path.join(get_output_directory(), "worldlabs_tiles", world_data.world_id)
+        config = build_tile_pyramid(pano_path, tiles_dir, tile_size=int(tile_size), quality=jpeg_quality)
+
+        html_path = self.get_viewer_path(world_data, "panorama_tiles")
+        tiles_url = os.path.relpath(tiles_dir, os.path.dirname(html_path)).replace(os.sep, "/")
+        world_name = world_data.display_name or "World Labs 3D World"
+        with open(html_path, 'w', encoding='utf-8') as f:
+            f.write(self.create_tiled_panorama_viewer_html(tiles_url, config, world_name))
+
+        print(f"[WorldLabs] Tiled panorama viewer saved to: {html_path}")
+        # Browsers restrict WebGL textures on file:// pages; serving the folder always works
+        print(
+            f"[WorldLabs] If tiles don't appear, serve the output folder: "
+            f"python -m http.server --directory \"{get_output_directory()}\""
+        )
+
+        if open_browser:
+            self.open_in_browser(html_path, "tiled panorama")
+
+        return (html_path, tiles_dir)
+
+
 # Node class mappings
 NODE_CLASS_MAPPINGS = {
     "WorldLabsViewer": WorldLabsViewer,
+    "WorldLabsPanoramaTiles": WorldLabsPanoramaTiles,
 }
 
 # Display names
 NODE_DISPLAY_NAME_MAPPINGS = {
     "WorldLabsViewer": "3D Viewer (World Labs)",
+    "WorldLabsPanoramaTiles": "Panorama Tiles (World Labs)",
 }
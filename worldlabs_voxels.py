@@ -0,0 +1,383 @@
+"""
+World Labs ComfyUI Nodes - Voxels
+Collider mesh -> voxel occupancy grid and signed distance field, cached as .npy
+"""
+
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from .worldlabs_lazy import lazy_import
+from .worldlabs_mesh import read_glb
+from .worldlabs_state import env_int
+
+np = lazy_import("numpy")
+
+
+VOXEL_CACHE_VERSION = 1
+MAX_RESOLUTION = 512
+SAMPLES_PER_VOXEL = 2        # surface samples per voxel edge, so no voxel a triangle crosses is skipped
+CHUNK_POINTS = 1 << 22       # surface samples generated per pass
+CHUNK_LINES = 1 << 14        # lines per pass of the numpy distance transform
+FAR = 1e12                   # stands in for "no site" in squared distances
+
+
+def get_voxel_workers():
+    """Voxelization processes (WORLDLABS_VOXEL_WORKERS overrides)"""
+    default = min(4, os.cpu_count() or 1)
+    return env_int("WORLDLABS_VOXEL_WORKERS", default, 1)
+
+
+def parse_resolutions(text):
+    """'64, 128' -> [64, 128] (voxels along the longest axis)"""
+    resolutions = []
+    for part in str(text).replace(";", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            resolution = int(part)
+        except ValueError:
+            raise ValueError(f"Invalid voxel resolution: {part!r}")
+        if not 2 <= resolution <= MAX_RESOLUTION:
+            raise ValueError(f"Voxel resolution must be between 2 and {MAX_RESOLUTION}, got {resolution}")
+        if resolution not in resolutions:
+            resolutions.append(resolution)
+
+    if not resolutions:
+        raise ValueError("Give at least one voxel resolution")
+    return resolutions
+
+
+class VoxelGrid:
+    """
+    Occupancy (bool) and signed distance (float32, world units, negative
+    inside) over a regular grid. Voxel (i, j, k) is centred at
+    origin + (i + 0.5, j + 0.5, k + 0.5) * voxel_size.
+    """
+
+    __slots__ = ("occupancy", "sdf", "origin", "voxel_size")
+
+    def __init__(self, occupancy, sdf, origin, voxel_size):
+        self.occupancy = occupancy
+        self.sdf = sdf
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.voxel_size = float(voxel_size)
+
+    @property
+    def shape(self):
+        return tuple(self.occupancy.shape)
+
+    def voxel_indices(self, points):
+        """World points [N, 3] -> integer voxel indices [N, 3], clamped to the grid"""
+        indices = np.floor((np.asarray(points, dtype=np.float64) - self.origin) / self.voxel_size).astype(np.int64)
+        return np.clip(indices, 0, np.array(self.shape) - 1)
+
+    def sample(self, points):
+        """Signed distance at world points [N, 3] (nearest voxel)"""
+        i, j, k = self.voxel_indices(points).T
+        return np.asarray(self.sdf[i, j, k])
+
+    def __repr__(self):
+        return f"VoxelGrid(shape={self.shape}, voxel_size={self.voxel_size:.4g})"
+
+
+# ---------------------------------------------------------------------------
+# Voxelization
+# ---------------------------------------------------------------------------
+
+def barycentric_lattice(steps):
+    """Barycentric weights [(steps + 1) * (steps + 2) / 2, 3] covering a triangle"""
+    i, j = np.meshgrid(np.arange(steps + 1), np.arange(steps + 1), indexing="ij")
+    keep = i + j <= steps
+    u = i[keep] / steps
+    v = j[keep] / steps
+    return np.stack([1.0 - u - v, u, v], axis=1)
+
+
+def surface_voxels(positions, triangles, origin, voxel_size, shape):
+    """
+    Mark every voxel a triangle passes through. Triangles are sampled on a
+    barycentric lattice finer than half a voxel; triangles needing the same
+    lattice are processed together in one vectorized pass.
+    """
+    occupancy = np.zeros(shape, dtype=bool)
+    flat = occupancy.reshape(-1)
+    limits = np.array(shape) - 1
+
+    corners = positions[triangles].astype(np.float64)  # [F, 3 vertices, 3]
+    edges = np.stack([
+        np.linalg.norm(corners[:, 1] - corners[:, 0], axis=1),
+        np.linalg.norm(corners[:, 2] - corners[:, 1], axis=1),
+        np.linalg.norm(corners[:, 0] - corners[:, 2], axis=1),
+    ], axis=1).max(axis=1)
+    steps = np.maximum(1, np.ceil(edges * SAMPLES_PER_VOXEL / voxel_size)).astype(np.int64)
+
+    for step in np.unique(steps):
+        weights = barycentric_lattice(int(step))
+        group = corners[steps == step]
+        per_chunk = max(1, CHUNK_POINTS // len(weights))
+        for start in range(0, len(group), per_chunk):
+            points = np.einsum("pv,fvc->fpc", weights, group[start:start + per_chunk]).reshape(-1, 3)
+            index = np.clip(np.floor((points - origin) / voxel_size).astype(np.int64), 0, limits)
+            flat[np.ravel_multi_index(index.T, shape)] = True
+
+    return occupancy
+
+
+def fill_enclosed(occupancy):
+    """Mark free voxels that can't reach the grid border as occupied"""
+    try:
+        from scipy import ndimage
+        return ndimage.binary_fill_holes(occupancy)
+    except ImportError:
+        pass
+
+    # Flood the outside from the border, one 6-connected dilation per pass
+    free = ~occupancy
+    outside = np.zeros_like(occupancy)
+    for axis in range(3):
+        for end in (0, -1):
+            border = [slice(None)] * 3
+            border[axis] = end
+            outside[tuple(border)] = free[tuple(border)]
+
+    while True:
+        grown = outside.copy()
+        grown[1:] |= outside[:-1]
+        grown[:-1] |= outside[1:]
+        grown[:, 1:] |= outside[:, :-1]
+        grown[:, :-1] |= outside[:, 1:]
+        grown[:, :, 1:] |= outside[:, :, :-1]
+        grown[:, :, :-1] |= outside[:, :, 1:]
+        grown &= free
+        if np.array_equal(grown, outside):
+            return ~outside
+        outside = grown
+
+
+# ---------------------------------------------------------------------------
+# Distance transform
+# ---------------------------------------------------------------------------
+
+def squared_distance_lines(f):
+    """
+    Exact 1D squared distance transform (Felzenszwalb & Huttenlocher) of
+    every row of f [L, n] at once: min over y of (x - y)^2 + f[y]. The lower
+    envelope of parabolas is built for all rows in lockstep; rows that need
+    to pop more parabolas at a step keep looping while the others wait.
+    """
+    lines, n = f.shape
+    rows = np.arange(lines)
+    v = np.zeros((lines, n), dtype=np.int64)
+    z = np.empty((lines, n + 1))
+    z[:, 0] = -np.inf
+    z[:, 1] = np.inf
+    k = np.zeros(lines, dtype=np.int64)
+
+    for q in range(1, n):
+        fq = f[:, q] + q * q
+        active = rows
+        while True:
+            vk = v[active, k[active]]
+            s = (fq[active] - (f[active, vk] + vk * vk)) / (2.0 * (q - vk))
+            pop = s <= z[active, k[active]]
+            if not pop.any():
+                break
+            k[active[pop]] -= 1
+            active = active[pop]
+
+        vk = v[rows, k]
+        s = (fq - (f[rows, vk] + vk * vk)) / (2.0 * (q - vk))
+        k += 1
+        v[rows, k] = q
+        z[rows, k] = s
+        z[rows, k + 1] = np.inf
+
+    out = np.empty_like(f)
+    k[:] = 0
+    for q in range(n):
+        while True:
+            behind = z[rows, k + 1] < q
+            if not behind.any():
+                break
+            k[behind] += 1
+        vk = v[rows, k]
+        out[:, q] = (q - vk) ** 2 + f[rows, vk]
+
+    return out
+
+
+def squared_distance_transform(sites):
+    """Squared Euclidean distance (in voxels) from every voxel to the nearest True voxel"""
+    distance = np.where(sites, 0.0, FAR)
+    for axis in range(distance.ndim):
+        moved = np.moveaxis(distance, axis, -1)
+        lines = np.ascontiguousarray(moved).reshape(-1, moved.shape[-1])
+        for start in range(0, len(lines), CHUNK_LINES):
+            lines[start:start + CHUNK_LINES] = squared_distance_lines(lines[start:start + CHUNK_LINES])
+        distance = np.moveaxis(lines.reshape(moved.shape), -1, axis)
+    return distance
+
+
+def distance_transform(sites):
+    """Euclidean distance (in voxels) to the nearest True voxel; scipy when installed, numpy otherwise"""
+    if not sites.any():
+        return np.full(sites.shape, np.inf)
+    try:
+        from scipy import ndimage
+        return ndimage.distance_transform_edt(~sites)
+    except ImportError:
+        return np.sqrt(squared_distance_transform(sites))
+
+
+def signed_distance(occupancy, voxel_size):
+    """Distance to the nearest occupied voxel outside, minus distance to the nearest free voxel inside"""
+    outside = distance_transform(occupancy)
+    inside = distance_transform(~occupancy)
+    return ((np.where(occupancy, -inside, outside)) * voxel_size).astype(np.float32)
+
+
+def voxelize(mesh, resolution, fill_interior=False):
+    """
+    Voxelize a mesh with `resolution` cubic voxels along its longest axis
+    (plus one voxel of padding per side) and compute its SDF
+    """
+    low = mesh.positions.min(axis=0).astype(np.float64)
+    high = mesh.positions.max(axis=0).astype(np.float64)
+    voxel_size = float((high - low).max()) / resolution or 1.0
+    origin = low - voxel_size
+    # floor + 1 voxels cover the mesh, plus one voxel of padding on each side
+    shape = tuple(int(n) for n in np.floor((high - low) / voxel_size).astype(np.int64) + 3)
+
+    occupancy = surface_voxels(mesh.positions, mesh.triangles, origin, voxel_size, shape)
+    if fill_interior:
+        occupancy = fill_enclosed(occupancy)
+
+    return VoxelGrid(occupancy, signed_distance(occupancy, voxel_size), origin, voxel_size)
+
+
+# ---------------------------------------------------------------------------
+# .npy cache next to the mesh
+# ---------------------------------------------------------------------------
+
+def cache_paths(mesh_path, resolution, fill_interior):
+    stem = f"{os.path.splitext(mesh_path)[0]}.voxels{resolution}{'_filled' if fill_interior else ''}"
+    return f"{stem}.json", f"{stem}.occupancy.npy", f"{stem}.sdf.npy"
+
+
+def source_signature(mesh_path):
+    stat = os.stat(mesh_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def save_array(path, array):
+    part_path = path + ".part"
+    try:
+        with open(part_path, "wb") as f:
+            np.save(f, array)
+        os.replace(part_path, path)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+
+
+def load_voxel_cache(mesh_path, resolution, fill_interior=False):
+    """Memory-map a cached grid, or None if missing or built from a different file"""
+    meta_path, occupancy_path, sdf_path = cache_paths(mesh_path, resolution, fill_interior)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != VOXEL_CACHE_VERSION or meta.get("source") != source_signature(mesh_path):
+            return None
+        return VoxelGrid(np.load(occupancy_path, mmap_mode="r"), np.load(sdf_path, mmap_mode="r"),
+                         meta["origin"], meta["voxel_size"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def build_voxel_cache(task):
+    """
+    Voxelize one resolution and write the .npy cache (the metadata file goes
+    last, so a partial cache is never picked up). Runs in a worker process;
+    returns a summary dict.
+    """
+    mesh_path, resolution, fill_interior = task
+    meta_path, occupancy_path, sdf_path = cache_paths(mesh_path, resolution, fill_interior)
+
+    grid = load_voxel_cache(mesh_path, resolution, fill_interior)
+    cached = grid is not None
+    if not cached:
+        with open(mesh_path, "rb") as f:
+            grid = voxelize(read_glb(f.read()), resolution, fill_interior)
+        save_array(occupancy_path, grid.occupancy)
+        save_array(sdf_path, grid.sdf)
+
+        meta = {
+            "version": VOXEL_CACHE_VERSION,
+            "source": source_signature(mesh_path),
+            "resolution": resolution,
+            "fill_interior": fill_interior,
+            "shape": list(grid.shape),
+            "origin": grid.origin.tolist(),
+            "voxel_size": grid.voxel_size,
+        }
+        with open(meta_path + ".part", "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(meta_path + ".part", meta_path)
+
+    return {
+        "resolution": resolution,
+        "shape": list(grid.shape),
+        "voxel_size": grid.voxel_size,
+        "origin": grid.origin.tolist(),
+        "occupied": int(np.count_nonzero(grid.occupancy)),
+        "occupancy_path": occupancy_path,
+        "sdf_path": sdf_path,
+        "cached": cached,
+    }
+
+
+def build_voxel_caches(mesh_path, resolutions, fill_interior=False, workers=None):
+    """Build every missing resolution (in parallel processes where possible); returns summaries in order"""
+    tasks = [(mesh_path, resolution, fill_interior) for resolution in resolutions]
+    missing = [task for task in tasks if load_voxel_cache(*task) is None]
+    workers = min(workers or get_voxel_workers(), len(missing))
+
+    if workers > 1:
+        # multiprocessing is slow to import; only load it when grids are built
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+
+        # Only failures to start or keep the worker processes fall back; build errors propagate
+        pool_error = None
+        try:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        except (ImportError, NotImplementedError, OSError) as e:
+            pool_error = e
+        else:
+            with executor:
+                try:
+                    # Submitting spawns the worker processes
+                    futures = [executor.submit(build_voxel_cache, task) for task in missing]
+                except OSError as e:
+                    executor.shutdown(cancel_futures=True)
+                    pool_error = e
+                else:
+                    try:
+                        for future in futures:
+                            future.result()
+                    except BrokenProcessPool as e:
+                        pool_error = e
+
+        if pool_error is not None:
+            print(f"[WorldLabs] Process pool unavailable ({pool_error}), voxelizing with threads")
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="worldlabs-voxels") as executor:
+                list(executor.map(build_voxel_cache, missing))
+
+    # Everything is cached now (or built here when running serially); reload memory-mapped
+    summaries = [build_voxel_cache(task) for task in tasks]
+    for task, summary in zip(tasks, summaries):
+        summary["cached"] = task not in missing
+    return summaries
@@ -0,0 +1,197 @@
+"""
+World Labs ComfyUI Nodes - World Data
+Typed, validated representation of a generated world (the WORLDLABS_WORLD type)
+"""
+
+import re
+import json
+
+
+COMPACT_VERSION = 1
+
+# World IDs are opaque tokens (UUID-like): no spaces, and at least one digit
+WORLD_ID_PATTERN = re.compile(r"(?=.*[0-9])[A-Za-z0-9_-]{8,}")
+
+# Asset names in the order used by compact serialization
+ASSET_NAMES = ("thumbnail", "pano", "splat_100k", "splat_500k", "splat_full", "mesh")
+
+# spz_urls keys returned by the API for each splat quality
+SPLAT_QUALITIES = {
+    "100k": "splat_100k",
+    "500k": "splat_500k",
+    "full_res": "splat_full",
+}
+
+
+def _get_dict(data, key, context):
+    value = data.get(key)
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        raise ValueError(f"Invalid world data: '{context}{key}' should be an object, got {type(value).__name__}")
+    return value
+
+
+def _get_str(data, key, context=""):
+    value = data.get(key)
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid world data: '{context}{key}' should be a string, got {type(value).__name__}")
+    return value
+
+
+def looks_like_world_id(value):
+    """True if value could be a world ID rather than a display name"""
+    return WORLD_ID_PATTERN.fullmatch(value) is not None
+
+
+class WorldData:
+    """
+    A generated world, parsed and validated once from the API response.
+    Asset URLs are resolved up front so consumers don't re-walk the nested
+    response. The original response stays available through get()/[] and
+    to_dict(), so code written against the raw dict keeps working.
+    """
+
+    __slots__ = ("world_id", "display_name", "model", "marble_url", "caption", "asset_urls", "_raw")
+
+    def __init__(self, world_id, display_name="", model="", marble_url="", caption="", asset_urls=None,
+                 raw=None):
+        self.world_id = world_id
+        self.display_name = display_name
+        self.model = model
+        self.marble_url = marble_url
+        self.caption = caption
+        self.asset_urls = asset_urls or {}
+        self._raw = raw
+
+    @classmethod
+    def from_response(cls, data):
+        """Parse and validate the world object from a completed operation's response"""
+        if not isinstance(data, dict):
+            raise ValueError(f"Invalid world data: expected an object, got {type(data).__name__}")
+
+        world_id = _get_str(data, "world_id")
+        if not world_id:
+            raise ValueError(f"Invalid world data: missing 'world_id'. Received keys: {list(data.keys())}")
+
+        assets = _get_dict(data, "assets", "")
+        splats = _get_dict(assets, "splats", "assets.")
+        spz_urls = _get_dict(splats, "spz_urls", "assets.splats.")
+        mesh = _get_dict(assets, "mesh", "assets.")
+        imagery = _get_dict(assets, "imagery", "assets.")
+
+        asset_urls = {
+            "thumbnail": _get_str(assets, "thumbnail_url", "assets.") or _get_str(data, "thumbnail_url"),
+            "pano": _get_str(imagery, "pano_url", "assets.imagery."),
+            "mesh": _get_str(mesh, "collider_mesh_url", "assets.mesh."),
+        }
+        for quality, name in SPLAT_QUALITIES.items():
+            asset_urls[name] = _get_str(spz_urls, quality, "assets.splats.spz_urls.")
+
+        return cls(
+            world_id=world_id,
+            display_name=_get_str(data, "display_name"),
+            model=_get_str(data, "model"),
+            # The API has used both names for the Marble viewer link
+            marble_url=_get_str(data, "world_marble_url") or _get_str(data, "marble_url"),
+            caption=_get_str(assets, "caption", "assets."),
+            asset_urls={name: url for name, url in asset_urls.items() if url},
+            raw=data,
+        )
+
+    @classmethod
+    def coerce(cls, world_data):
+        """Accept a WorldData or a raw world dict (e.g. from older workflows)"""
+        if isinstance(world_data, cls):
+            return world_data
+        return cls.from_response(world_data)
+
+    def asset_url(self, name):
+        """URL of an asset by name ("splat_100k", "mesh", "pano", ...), or "" if unavailable"""
+        return self.asset_urls.get(name, "")
+
+    def splat_url(self, quality):
+        """URL of the splat at an API quality level ("100k", "500k", "full_res")"""
+        return self.asset_urls.get(SPLAT_QUALITIES.get(quality, ""), "")
+
+    # Dict compatibility with the raw API response
+    def to_dict(self):
+        """The world as an API-shaped dict (the original response when available)"""
+        if self._raw is not None:
+            return self._raw
+
+        urls = self.asset_urls
+        return {
+            "world_id": self.world_id,
+            "display_name": self.display_name,
+            "model": self.model,
+            "world_marble_url": self.marble_url,
+            "assets": {
+                "caption": self.caption,
+                "thumbnail_url": urls.get("thumbnail", ""),
+                "splats": {"spz_urls": {
+                    quality: urls.get(name, "") for quality, name in SPLAT_QUALITIES.items()
+                }},
+                "mesh": {"collider_mesh_url": urls.get("mesh", "")},
+                "imagery": {"pano_url": urls.get("pano", "")},
+            },
+        }
+
+    def get(self, key, default=None):
+        return self.to_dict().get(key, default)
+
+    def __getitem__(self, key):
+        return self.to_dict()[key]
+
+    def __contains__(self, key):
+        return key in self.to_dict()
+
+    # Compact serialization for caches and journals
+    def to_compact(self):
+        """Positional list of the parsed fields (the raw response is not included)"""
+        return [
+            COMPACT_VERSION,
+            self.world_id,
+            self.display_name,
+            self.model,
+            self.marble_url,
+            self.caption,
+            [self.asset_urls.get(name, "") for name in ASSET_NAMES],
+        ]
+
+    @classmethod
+    def from_compact(cls, compact):
+        version, world_id, display_name, model, marble_url, caption, urls = compact
+        if version != COMPACT_VERSION:
+            raise ValueError(f"Unsupported compact world data version: {version}")
+
+        return cls(
+            world_id=world_id,
+            display_name=display_name,
+            model=model,
+            marble_url=marble_url,
+            caption=caption,
+            asset_urls={name: url for name, url in zip(ASSET_NAMES, urls) if url},
+        )
+
+    def dumps(self):
+        """Compact JSON string"""
+        return json.dumps(self.to_compact(), separators=(",", ":"))
+
+    @classmethod
+    def loads(cls, text):
+        return cls.from_compact(json.loads(text))
+
+    def __eq__(self, other):
+        if not isinstance(other, WorldData):
+            return NotImplemented
+        return self.to_compact() == other.to_compact()
+
+    def __hash__(self):
+        # Equal worlds share a world_id, so this stays consistent with __eq__
+        return hash(self.world_id)
+
+    def __repr__(self):
+        return f"WorldData(world_id={self.world_id!r}, display_name={self.display_name!r}, model={self.model!r})"